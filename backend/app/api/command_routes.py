@@ -1,9 +1,15 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import Dict, Any
+from fastapi import APIRouter, HTTPException, Request, BackgroundTasks
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ValidationError
+from typing import Dict, Any, List, AsyncIterator, Optional
+from app.config import settings
+from app.db.neo4j_client import ConcurrencyConflict
+from app.services.rule_engine import rule_context
 import app.dependencies as deps
 from uuid import uuid4
+import json
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -11,11 +17,268 @@ router = APIRouter()
 class CommandRequest(BaseModel):
     aggregate_id: str | None = None
     params: Dict[str, Any]
+    expected_version: int | None = None  # 낙관적 동시성 제어 (새 Aggregate 는 0)
+
+class BulkCommandRecord(BaseModel):
+    """일괄 실행 NDJSON 한 줄"""
+    command: str
+    aggregate_id: str | None = None
+    params: Dict[str, Any] = {}
+
+@router.post("/bulk")
+async def execute_commands_bulk(
+    request: Request,
+    batch_size: Optional[int] = None
+):
+    """
+    Command 일괄 실행 (NDJSON 스트림 입력 → NDJSON 스트림 결과)
+    
+    입력 한 줄: {"command": "PlaceOrder", "aggregate_id": "...", "params": {...}}
+    batch_size 개씩 모아 Aggregate 타입별 UNWIND 로 한 트랜잭션에 기록하고,
+    레코드별 결과 {"index", "status", "aggregate_id", "event", "rules" | "error"} 를 배치 단위로 돌려준다.
+    마지막 줄은 {"summary": {...}}.
+    본문은 도착하는 대로 줄 단위로 읽어 배치가 찰 때마다 기록하므로 메모리는 배치 크기에 비례한다.
+    command_bulk_max_line_bytes 보다 긴 줄을 만나면 오류 줄을 보내고 읽기를 멈춘다.
+    """
+    size = batch_size or settings.command_bulk_batch_size
+    if size < 1:
+        raise HTTPException(status_code=400, detail="batch_size must be >= 1")
+    await deps.command_registry.ensure_loaded(deps.neo4j_client)
+    return _DuplexStreamingResponse(
+        _ingest_commands(request.stream(), size, settings.command_bulk_max_line_bytes),
+        media_type="application/x-ndjson"
+    )
+
+class _DuplexStreamingResponse(StreamingResponse):
+    """요청 본문을 읽으면서 결과를 보내는 스트리밍 응답
+
+    StreamingResponse 는 연결 종료를 감지하려고 receive() 를 함께 호출해 본문 메시지를 가로채므로
+    여기서는 응답만 보내고, 본문과 연결 종료(ClientDisconnect)는 생성기가 request.stream() 으로 받는다.
+    """
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+class LineTooLong(ValueError):
+    """NDJSON 한 줄이 command_bulk_max_line_bytes 초과"""
+
+async def _iter_lines(chunks: AsyncIterator[bytes], max_line_bytes: int) -> AsyncIterator[bytes]:
+    """본문 청크 스트림 → 줄 단위 (청크 경계에 걸친 줄은 이어 붙인다)"""
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        lines = buffer.split(b"\n")
+        buffer = lines.pop()
+        for line in lines:
+            if len(line) > max_line_bytes:
+                raise LineTooLong(len(line))
+            yield line
+        if len(buffer) > max_line_bytes:
+            raise LineTooLong(len(buffer))
+    if buffer:
+        yield buffer
+
+def _ndjson(obj: Dict[str, Any]) -> str:
+    return json.dumps(obj, ensure_ascii=False, default=str) + "\n"
+
+async def _ingest_commands(
+    chunks: AsyncIterator[bytes],
+    batch_size: int,
+    max_line_bytes: int
+) -> AsyncIterator[str]:
+    started = time.perf_counter()
+    pending: List[Dict[str, Any]] = []
+    counts = {'success': 0, 'error': 0}
+    index = 0
+
+    lines = _iter_lines(chunks, max_line_bytes)
+    while True:
+        try:
+            line = await lines.__anext__()
+        except StopAsyncIteration:
+            break
+        except LineTooLong:
+            counts['error'] += 1
+            yield _ndjson({'index': index, 'status': 'error', 'error': f"record exceeds {max_line_bytes} bytes"})
+            break
+        if not line.strip():
+            continue
+        record_index, index = index, index + 1
+
+        try:
+            record = BulkCommandRecord.model_validate_json(line)
+        except ValidationError as e:
+            counts['error'] += 1
+            yield _ndjson({'index': record_index, 'status': 'error', 'error': f"invalid record: {e.errors()[0]['msg']}"})
+            continue
+
+        route = deps.command_registry.resolve(record.command)
+        if not route:
+            counts['error'] += 1
+            yield _ndjson({'index': record_index, 'status': 'error', 'error': "Command not found"})
+            continue
+
+        agg_id = record.aggregate_id or str(uuid4())
+        pending.append({
+            'index': record_index,
+            'type_name': route.aggregate_type,
+            'instance_id': agg_id,
+            'event_type': route.event,
+            'properties': {**record.params, 'id': agg_id},
+            'payload_json': json.dumps(record.params)
+        })
+
+        if len(pending) >= batch_size:
+            for result in await _flush_commands(pending):
+                counts[result['status']] += 1
+                yield _ndjson(result)
+            pending = []
+
+    if pending:
+        for result in await _flush_commands(pending):
+            counts[result['status']] += 1
+            yield _ndjson(result)
+
+    elapsed = time.perf_counter() - started
+    total = counts['success'] + counts['error']
+    yield _ndjson({'summary': {
+        'total': total,
+        **counts,
+        'batch_size': batch_size,
+        'elapsed_ms': round(elapsed * 1000, 2),
+        'commands_per_second': round(counts['success'] / elapsed, 1) if elapsed > 0 else None
+    }})
+
+async def _flush_commands(pending: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """배치 하나를 Aggregate 타입별로 묶어 단일 트랜잭션으로 기록"""
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for row in pending:
+        groups.setdefault(row['type_name'], []).append({
+            k: v for k, v in row.items() if k != 'type_name'
+        })
+
+    try:
+        written = await deps.neo4j_client.execute_command_batch(groups)
+    except Exception as e:
+        logger.error(f"Command 일괄 실행 실패 ({len(pending)}건): {e}")
+        return [
+            {'index': row['index'], 'status': 'error', 'aggregate_id': row['instance_id'], 'error': str(e)}
+            for row in pending
+        ]
+
+    # 커밋된 이벤트를 입력 순서대로 구독자(Read Model 등)에 전달
+    committed = [row for row in pending if row['index'] in written]
+    events = [
+        {**written[row['index']]['event'], 'aggregate_type': row['type_name']}
+        for row in committed
+    ]
+    await deps.event_pipeline.publish(events)
+
+    # 이벤트별 룰 평가 (발동/실패한 룰만 결과에 포함)
+    rule_results = await deps.rule_engine.evaluate_batch([
+        rule_context(event, row['type_name'], written[row['index']]['instance'])
+        for event, row in zip(events, committed)
+    ])
+    fired = {
+        row['index']: [r.model_dump() for r in results if r.status != 'skipped']
+        for row, results in zip(committed, rule_results)
+    }
+
+    # 배치에서 frequency 경계를 넘은 Aggregate 스냅샷
+    versions: Dict[str, List[int]] = {}
+    for row in committed:
+        versions.setdefault(row['instance_id'], []).append(written[row['index']]['event']['sequence'])
+    for agg_id, sequences in versions.items():
+        await deps.snapshot_service.maybe_snapshot(agg_id, min(sequences) - 1, max(sequences))
+
+    results = []
+    for row in pending:
+        if row['index'] in written:
+            results.append({
+                'index': row['index'],
+                'status': 'success',
+                'aggregate_id': row['instance_id'],
+                'event': row['event_type'],
+                'sequence': written[row['index']]['event']['sequence'],
+                'rules': fired[row['index']]
+            })
+        else:
+            results.append({
+                'index': row['index'],
+                'status': 'error',
+                'aggregate_id': row['instance_id'],
+                'error': "Aggregate type not found"
+            })
+    return results
+
+async def run_command(
+    command_name: str,
+    aggregate_id: str,
+    params: Dict[str, Any],
+    expected_version: Optional[int] = None,
+    background_tasks: Optional[BackgroundTasks] = None
+) -> Dict[str, Any]:
+    """Command 하나 실행 (HTTP 요청과 Policy saga 공용)
+
+    Command 나 Aggregate 타입이 없으면 LookupError, 버전 충돌은 ConcurrencyConflict.
+    background_tasks 가 없으면 스냅샷을 바로 저장한다.
+    """
+    # Command가 속한 Aggregate 찾기 (레지스트리 캐시, Neo4j 조회 없음)
+    await deps.command_registry.ensure_loaded(deps.neo4j_client)
+    route = deps.command_registry.resolve(command_name)
+
+    if not route:
+        raise LookupError("Command not found")
+
+    agg_type = route.aggregate_type
+
+    # 이벤트 이름 (Command → Event 매핑은 레지스트리에서)
+    event_name = route.event
+
+    # 인스턴스 생성/갱신 + 이벤트 추가 (단일 트랜잭션)
+    written = await deps.neo4j_client.execute_command(
+        type_name=agg_type,
+        instance_id=aggregate_id,
+        event_type=event_name,
+        properties=params,
+        payload=params,
+        expected_version=expected_version
+    )
+    if not written:
+        raise LookupError("Aggregate type not found")
+
+    # 커밋된 이벤트를 구독자(Read Model, Policy 등)에 전달
+    event = {**written['event'], 'aggregate_type': agg_type}
+    await deps.event_pipeline.publish([event])
+
+    # when 이 이 이벤트인 룰 실행
+    rule_results = await deps.rule_engine.evaluate(rule_context(event, agg_type, written['instance']))
+
+    # frequency 경계를 넘었으면 스냅샷 저장 (HTTP 요청이면 응답 후)
+    version = written['event']['sequence']
+    if background_tasks is not None:
+        background_tasks.add_task(deps.snapshot_service.maybe_snapshot, aggregate_id, version - 1, version)
+    else:
+        await deps.snapshot_service.maybe_snapshot(aggregate_id, version - 1, version)
+
+    return {
+        "status": "success",
+        "aggregate_id": aggregate_id,
+        "aggregate_type": agg_type,
+        "event": event_name,
+        "version": version,
+        "instance": written['instance'],
+        "domain_event": written['event'],
+        "rules": [r.model_dump() for r in rule_results]
+    }
 
 @router.post("/{command_name}")
 async def execute_command(
     command_name: str,
-    request: CommandRequest
+    request: CommandRequest,
+    background_tasks: BackgroundTasks
 ):
     """
     Command 실행
@@ -25,42 +288,22 @@ async def execute_command(
     try:
         # Aggregate ID 생성 (없으면)
         agg_id = request.aggregate_id or str(uuid4())
-        
-        # Command가 속한 Aggregate 찾기
-        query = """
-        MATCH (cmd:Command {name: $cmd_name})<-[:HAS_COMMAND]-(ot:ObjectType)
-        RETURN ot.name as aggregate_type
-        """
-        result = await deps.neo4j_client.execute(query, {'cmd_name': command_name})
-
-        if not result:
-            raise HTTPException(status_code=404, detail="Command not found")
-
-        agg_type = result[0]['aggregate_type']
-
-        # 인스턴스 생성 (간단 구현)
-        await deps.neo4j_client.create_instance(
-            type_name=agg_type,
-            instance_id=agg_id,
-            properties=request.params
-        )
-
-        # 이벤트 생성 (Command → Event 매핑은 실제론 더 복잡)
-        event_name = command_name.replace("Place", "Placed").replace("Create", "Created")
-        await deps.neo4j_client.create_event(
-            event_type=event_name,
-            aggregate_id=agg_id,
-            payload=request.params
+        return await run_command(
+            command_name,
+            agg_id,
+            request.params,
+            expected_version=request.expected_version,
+            background_tasks=background_tasks
         )
-        
-        return {
-            "status": "success",
-            "aggregate_id": agg_id,
-            "event": event_name
-        }
-        
-    except HTTPException:
-        raise
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ConcurrencyConflict as e:
+        raise HTTPException(status_code=409, detail={
+            "error": "version_conflict",
+            "aggregate_id": e.aggregate_id,
+            "expected_version": e.expected_version,
+            "current_version": e.current_version
+        })
     except Exception as e:
         logger.error(f"Command 실행 실패: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,48 +1,152 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import StreamingResponse
+from typing import Any, Dict
 from app.models.event_storm import AnalyzeRequest, RefineRequest, EventStormResult
 from app.services.llm_service import LLMService
+from app.services.llm_pool import LLMPoolBusy
+import app.dependencies as deps
+import json
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 def get_llm_service() -> LLMService:
-    return LLMService()
+    return deps.llm_service
 
 @router.post("/analyze", response_model=EventStormResult)
 async def analyze_business(
     request: AnalyzeRequest,
+    bypass_cache: bool = False,
+    mode: str = Query("auto", pattern="^(auto|single|map_reduce)$"),
     llm: LLMService = Depends(get_llm_service)
 ):
     """
     비즈니스 설명을 이벤트 스토밍 분석
     
     LLM을 사용하여 Aggregates, Commands, Events, Policies 추출
+    같은 설명(공백 차이 무시)은 캐시된 응답을 돌려준다. bypass_cache=true 면 새로 분석해 캐시를 갱신한다.
+    mode: auto(llm_section_max_chars 보다 길면 map_reduce), single(한 프롬프트),
+          map_reduce(길이와 상관없이 제목/문단마다 나눠 병렬 분석 후 병합, 나눌 곳이 없으면 single)
     """
     try:
-        result = await llm.analyze_business(
-            description=request.description,
-            examples=request.examples
-        )
+        if mode == "single":
+            result = await llm.analyze_business(
+                description=request.description,
+                examples=request.examples,
+                bypass_cache=bypass_cache
+            )
+        else:
+            # 섹션이 하나뿐이면 single 과 같다
+            result = await llm.analyze_map_reduce(
+                description=request.description,
+                examples=request.examples,
+                bypass_cache=bypass_cache,
+                force_split=mode == "map_reduce"
+            )
         return result
+    except LLMPoolBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"이벤트 스토밍 분석 실패: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+async def run_job(kind: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """분석 작업 큐 실행기: /analyze, /refine 과 같은 처리를 공용 LLMService 로"""
+    llm = deps.llm_service
+    bypass_cache = params.get("bypass_cache", False)
+    if kind == "analyze":
+        request = AnalyzeRequest.model_validate(params["request"])
+        if params.get("mode") == "single":
+            result = await llm.analyze_business(request.description, request.examples, bypass_cache)
+        else:
+            result = await llm.analyze_map_reduce(
+                request.description, request.examples, bypass_cache,
+                force_split=params.get("mode") == "map_reduce"
+            )
+    elif kind == "refine":
+        request = RefineRequest.model_validate(params["request"])
+        refine = llm.refine_delta if params.get("mode") == "delta" else llm.refine_result
+        result = await refine(request.current_result, request.feedback, bypass_cache)
+    else:
+        raise ValueError(f"Unknown job kind '{kind}'")
+    return result.model_dump(exclude_none=True)
+
+async def _sse_analysis(llm: LLMService, request: AnalyzeRequest, bypass_cache: bool):
+    counts = {}
+    try:
+        async for kind, item in llm.analyze_business_stream(
+            description=request.description,
+            examples=request.examples,
+            bypass_cache=bypass_cache
+        ):
+            index = counts[kind] = counts.get(kind, -1) + 1
+            data = json.dumps(item, ensure_ascii=False) if isinstance(item, dict) else item.model_dump_json(exclude_none=True)
+            yield f"id: {kind}:{index}\nevent: {kind}\ndata: {data}\n\n"
+    except Exception as e:
+        logger.error(f"이벤트 스토밍 스트리밍 실패: {e}")
+        yield f"event: error\ndata: {json.dumps({'detail': str(e)}, ensure_ascii=False)}\n\n"
+
+@router.post("/analyze/stream")
+async def analyze_business_stream(
+    request: AnalyzeRequest,
+    bypass_cache: bool = False,
+    llm: LLMService = Depends(get_llm_service)
+):
+    """
+    /analyze 의 스트리밍 버전 (Server-Sent Events)
+    
+    LLM 토큰 스트림을 점진적으로 파싱해 Aggregate / Policy 가 완성·검증되는 즉시
+    `aggregate`, `policy` 이벤트로 보낸다. 검증 실패 원소는 `invalid`,
+    마지막은 전체 결과 `result` (실패 시 `error`).
+    """
+    return StreamingResponse(
+        _sse_analysis(llm, request, bypass_cache),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.post("/refine", response_model=EventStormResult)
 async def refine_analysis(
     request: RefineRequest,
+    bypass_cache: bool = False,
+    mode: str = Query("full", pattern="^(full|delta)$"),
     llm: LLMService = Depends(get_llm_service)
 ):
     """
     사용자 피드백으로 분석 결과 개선
+    
+    mode: full(전체 결과를 다시 생성), delta(관련 Aggregate 만 보내고 변경 patch 를 받아 로컬 적용)
     """
     try:
-        result = await llm.refine_result(
+        refine = llm.refine_delta if mode == "delta" else llm.refine_result
+        result = await refine(
             current_result=request.current_result,
-            feedback=request.feedback
+            feedback=request.feedback,
+            bypass_cache=bypass_cache
         )
         return result
+    except LLMPoolBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"개선 실패: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/llm/metrics")
+async def get_llm_metrics():
+    """LLM 클라이언트 풀: 처리 중 / 대기 중 요청, 대기 시간"""
+    return deps.llm_service.pool.stats()
+
+@router.get("/cache/metrics")
+async def get_cache_metrics():
+    """LLM 응답 캐시 적중/미스 지표"""
+    if not deps.llm_cache:
+        return {"enabled": False}
+    return {"enabled": True, **deps.llm_cache.stats()}
+
+@router.delete("/cache")
+async def clear_cache():
+    """LLM 응답 캐시 비우기"""
+    if deps.llm_cache:
+        await deps.llm_cache.clear()
+    return {"status": "cleared"}
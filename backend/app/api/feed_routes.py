@@ -0,0 +1,101 @@
+from fastapi import APIRouter, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, List
+from app.config import settings
+from app.services.event_feed import Subscription
+import app.dependencies as deps
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+def _sse(message) -> str:
+    return f"id: {message.id}\nevent: {message.type}\ndata: {message.data}\n\n"
+
+async def _sse_stream(request: Request, subscription: Subscription) -> AsyncIterator[str]:
+    try:
+        yield ": connected\n\n"
+        while True:
+            try:
+                message = await asyncio.wait_for(
+                    subscription.get(), timeout=settings.feed_heartbeat_interval
+                )
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                # 프록시 유휴 타임아웃 방지
+                yield ": keep-alive\n\n"
+                continue
+            if message is None:
+                yield "event: evicted\ndata: {\"reason\": \"slow consumer\"}\n\n"
+                break
+            yield _sse(message)
+    finally:
+        deps.event_feed.unsubscribe(subscription)
+
+@router.get("/events")
+async def stream_events(
+    request: Request,
+    aggregate_id: List[str] = Query([]),
+    aggregate_type: List[str] = Query([]),
+    event_type: List[str] = Query([])
+):
+    """
+    새로 추가되는 DomainEvent 를 Server-Sent Events 로 스트리밍
+
+    필터는 반복 가능하며 종류끼리는 AND, 같은 종류 안에서는 OR.
+    예: /api/feed/events?aggregate_type=Order&event_type=OrderPlaced
+    버퍼(feed_buffer_size)를 채울 만큼 느린 클라이언트는 `evicted` 이벤트 후 끊긴다.
+    """
+    subscription = deps.event_feed.subscribe(aggregate_id, aggregate_type, event_type)
+    return StreamingResponse(
+        _sse_stream(request, subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.websocket("/ws")
+async def stream_events_ws(
+    websocket: WebSocket,
+    aggregate_id: List[str] = Query([]),
+    aggregate_type: List[str] = Query([]),
+    event_type: List[str] = Query([])
+):
+    """WebSocket 버전 (메시지는 이벤트 JSON 텍스트)
+
+    이벤트를 기다리는 동안에도 소켓을 읽어 클라이언트가 끊으면 바로 구독을 해제한다
+    (좁은 필터라 이벤트가 오지 않아도 구독/버퍼가 남지 않게).
+    """
+    await websocket.accept()
+    subscription = deps.event_feed.subscribe(aggregate_id, aggregate_type, event_type)
+    receiver = asyncio.create_task(_wait_disconnect(websocket))
+    try:
+        while True:
+            getter = asyncio.create_task(subscription.get())
+            done, _ = await asyncio.wait({getter, receiver}, return_when=asyncio.FIRST_COMPLETED)
+            if receiver in done:
+                getter.cancel()
+                break
+            message = getter.result()
+            if message is None:
+                await websocket.close(code=1008, reason="slow consumer")
+                break
+            await websocket.send_text(message.data)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        receiver.cancel()
+        deps.event_feed.unsubscribe(subscription)
+
+async def _wait_disconnect(websocket: WebSocket):
+    """클라이언트 메시지는 버리고 websocket.disconnect 가 오면 끝난다"""
+    while True:
+        message = await websocket.receive()
+        if message['type'] == 'websocket.disconnect':
+            return
+
+@router.get("/metrics")
+async def get_feed_metrics():
+    """구독자 수 / 전달 / 강제 종료 지표"""
+    return deps.event_feed.stats()
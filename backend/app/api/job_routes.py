@@ -0,0 +1,108 @@
+from fastapi import APIRouter, Header, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator
+from app.config import settings
+from app.models.event_storm import AnalyzeRequest, RefineRequest
+from app.services.analysis_jobs import FINISHED, JobRejected
+import app.dependencies as deps
+import asyncio
+import json
+
+router = APIRouter()
+
+async def _submit(kind: str, tenant: str, params: dict):
+    try:
+        job = await deps.analysis_jobs.submit(kind, tenant, params)
+    except JobRejected as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    return job.to_dict(include_result=False)
+
+@router.post("/analyze", status_code=202)
+async def submit_analysis(
+    request: AnalyzeRequest,
+    bypass_cache: bool = False,
+    mode: str = Query("auto", pattern="^(auto|single|map_reduce)$"),
+    x_tenant_id: str = Header("default")
+):
+    """
+    /api/event-storm/analyze 를 백그라운드 작업으로 제출, 작업 id 를 바로 반환
+
+    GET /api/jobs/{id} 로 폴링하거나 GET /api/jobs/{id}/events 로 상태 변경을 구독한다.
+    테넌트(X-Tenant-ID 헤더)별로 공정하게 라운드 로빈 실행된다.
+    """
+    return await _submit("analyze", x_tenant_id, {
+        "request": request.model_dump(),
+        "bypass_cache": bypass_cache,
+        "mode": mode
+    })
+
+@router.post("/refine", status_code=202)
+async def submit_refine(
+    request: RefineRequest,
+    bypass_cache: bool = False,
+    mode: str = Query("full", pattern="^(full|delta)$"),
+    x_tenant_id: str = Header("default")
+):
+    """/api/event-storm/refine 를 백그라운드 작업으로 제출"""
+    return await _submit("refine", x_tenant_id, {
+        "request": request.model_dump(),
+        "bypass_cache": bypass_cache,
+        "mode": mode
+    })
+
+@router.get("/metrics")
+async def get_job_metrics():
+    """대기(테넌트별) / 실행 중 / 완료 / 취소 / 거부 지표"""
+    return deps.analysis_jobs.stats()
+
+@router.get("/{job_id}")
+async def get_job(job_id: str):
+    """작업 상태 (끝났으면 result 또는 error 포함)"""
+    job = await deps.analysis_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+async def _sse_job(request: Request, job_id: str, queue: asyncio.Queue) -> AsyncIterator[str]:
+    try:
+        # 구독 전에 바뀐 상태를 놓치지 않도록 현재 상태부터 보낸다
+        job = await deps.analysis_jobs.get(job_id)
+        if not job:
+            return
+        snapshot = job.to_dict(include_result=job.status in FINISHED)
+        while True:
+            yield f"event: {snapshot['status']}\ndata: {json.dumps(snapshot, default=str)}\n\n"
+            if snapshot['status'] in FINISHED:
+                break
+            while True:
+                try:
+                    snapshot = await asyncio.wait_for(
+                        queue.get(), timeout=settings.feed_heartbeat_interval
+                    )
+                    break
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        return
+                    yield ": keep-alive\n\n"
+    finally:
+        deps.analysis_jobs.unwatch(job_id, queue)
+
+@router.get("/{job_id}/events")
+async def stream_job(request: Request, job_id: str):
+    """작업 상태 변경을 Server-Sent Events 로 구독 (끝난 상태를 보내고 종료)"""
+    if not await deps.analysis_jobs.get(job_id):
+        raise HTTPException(status_code=404, detail="Job not found")
+    queue = deps.analysis_jobs.watch(job_id)
+    return StreamingResponse(
+        _sse_job(request, job_id, queue),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.delete("/{job_id}")
+async def cancel_job(job_id: str):
+    """대기 중이면 큐에서 빼고, 실행 중이면 LLM 호출을 취소"""
+    job = await deps.analysis_jobs.cancel(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict(include_result=False)
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, HTTPException, Depends
 from app.models.event_storm import EventStormResult
-from app.services.ontology_builder import OntologyBuilder
+from app.services.ontology_builder import OntologyBuilder, ObjectTypeInUse
 from app.db.neo4j_client import Neo4jClient
 import app.dependencies as deps
 import logging
@@ -8,22 +8,46 @@ import logging
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+AGGREGATE_SCHEMA_QUERY = """
+MATCH (ot:ObjectType {name: $name})
+OPTIONAL MATCH (ot)-[:HAS_COMMAND]->(cmd:Command)
+OPTIONAL MATCH (ot)-[:EMITS]->(evt:EventType)
+RETURN ot, collect(DISTINCT cmd) as commands, collect(DISTINCT evt) as events
+"""
+
 def get_ontology_builder() -> OntologyBuilder:
-    return OntologyBuilder(deps.neo4j_client)
+    return OntologyBuilder(
+        deps.neo4j_client,
+        deps.command_registry,
+        deps.projection_engine,
+        deps.saga_dispatcher,
+        deps.transformation_engine
+    )
 
 @router.post("/build")
 async def build_ontology(
     event_storm: EventStormResult,
+    bulk: bool = True,
+    incremental: bool = False,
+    prune: bool = False,
     builder: OntologyBuilder = Depends(get_ontology_builder)
 ):
     """
     이벤트 스토밍 결과 → Neo4j 온톨로지 생성
     
     Semantic + Kinetic Layer를 Neo4j에 생성
+    (bulk=false 이면 요소별 개별 쓰기 방식으로 빌드,
+     incremental=true 이면 기존 온톨로지와 비교해 변경분만 반영하고 변경 요약 반환,
+     인스턴스가 남은 Aggregate 를 빼면 409 - prune=true 면 인스턴스/이벤트까지 삭제)
     """
     try:
-        result = await builder.build(event_storm)
+        result = await builder.build(event_storm, bulk=bulk, incremental=incremental, prune=prune)
         return result
+    except ObjectTypeInUse as e:
+        raise HTTPException(status_code=409, detail={
+            "error": "object_type_in_use",
+            "object_types": e.names
+        })
     except Exception as e:
         logger.error(f"온톨로지 빌드 실패: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -32,13 +56,7 @@ async def build_ontology(
 async def get_aggregate_schema(aggregate_name: str):
     """특정 Aggregate의 스키마 조회"""
     try:
-        query = """
-        MATCH (ot:ObjectType {name: $name})
-        OPTIONAL MATCH (ot)-[:HAS_COMMAND]->(cmd:Command)
-        OPTIONAL MATCH (ot)-[:EMITS]->(evt:EventType)
-        RETURN ot, collect(DISTINCT cmd) as commands, collect(DISTINCT evt) as events
-        """
-        result = await deps.neo4j_client.execute(query, {'name': aggregate_name})
+        result = await deps.neo4j_client.execute(AGGREGATE_SCHEMA_QUERY, {'name': aggregate_name})
         
         if not result:
             raise HTTPException(status_code=404, detail="Aggregate not found")
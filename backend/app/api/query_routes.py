@@ -1,35 +1,138 @@
-from fastapi import APIRouter, HTTPException
-from typing import List, Dict, Any
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import List, Dict, Any, Optional, AsyncIterator
+from app.db.schema import TYPE_NAME_PATTERN
+from app.services.instance_query import (
+    compile_instance_query,
+    next_cursor,
+    parse_schema,
+    InstanceQueryError
+)
 import app.dependencies as deps
+import json
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# 내보내기 시 응답 청크 하나에 담을 레코드 수
+EXPORT_CHUNK_RECORDS = 500
+
+EXPORT_INSTANCES_QUERY = """
+MATCH (inst:{type_name}:DynamicInstance)
+RETURN inst
+"""
+
+OBJECT_TYPE_PROPERTIES_QUERY = """
+MATCH (ot:ObjectType {name: $name})
+RETURN ot.properties_json AS properties_json
+"""
+
+def _validate_type_name(aggregate_type: str):
+    if not TYPE_NAME_PATTERN.match(aggregate_type):
+        raise HTTPException(status_code=400, detail="Invalid aggregate type")
+
 @router.get("/instances/{aggregate_type}")
 async def get_instances(
     aggregate_type: str,
-    limit: int = 100
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    filter: List[str] = Query([]),
+    sort: Optional[str] = None,
+    page: bool = False
 ):
-    """특정 타입의 모든 인스턴스 조회"""
+    """
+    특정 타입의 인스턴스 조회 (keyset 페이지네이션 + 서버측 필터/정렬)
+    
+    - filter=field:op:value (반복 시 AND, op: eq ne lt lte gt gte in contains starts_with)
+    - sort=field[:asc|desc] (동률은 created_at, id 순)
+    - 응답은 기존과 같은 레코드 목록 (없는 타입이면 빈 목록)
+    - page=true 면 {"items", "has_more", "next_cursor"} (없는 타입은 404), 다음 페이지는 cursor=next_cursor
+    필드는 ObjectType 의 properties_json 에 선언된 것만 허용된다.
+    """
+    _validate_type_name(aggregate_type)
     try:
-        query = f"""
-        MATCH (inst:{aggregate_type}:DynamicInstance)
-        RETURN inst
-        LIMIT $limit
-        """
-        result = await deps.neo4j_client.execute(query, {'limit': limit})
-        return result
+        schema_result = await deps.neo4j_client.execute(OBJECT_TYPE_PROPERTIES_QUERY, {'name': aggregate_type})
+        if not schema_result:
+            if not page:
+                return []
+            raise HTTPException(status_code=404, detail="Aggregate not found")
+        schema = parse_schema(schema_result[0]['properties_json'])
+
+        query, params, key_fields = compile_instance_query(
+            aggregate_type, schema, filter, sort=sort, cursor=cursor, limit=limit + 1
+        )
+        records = await deps.neo4j_client.execute(query, params)
+        if not page:
+            return records[:limit]
+        has_more = len(records) > limit
+        items = [r['inst'] for r in records[:limit]]
+        return {
+            "items": items,
+            "has_more": has_more,
+            "next_cursor": next_cursor(items[-1], key_fields) if has_more else None
+        }
+    except InstanceQueryError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"인스턴스 조회 실패: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/instances/{aggregate_type}/export")
+async def export_instances(
+    aggregate_type: str,
+    format: str = Query("ndjson", pattern="^(ndjson|json)$"),
+    limit: Optional[int] = Query(None, ge=1)
+):
+    """
+    인스턴스 스트리밍 내보내기
+    
+    Bolt 커서를 fetch_size 단위로 읽으며 바로 응답에 쓰므로 전체 목록을 메모리에 올리지 않는다.
+    format=ndjson: 한 줄에 인스턴스 하나 / format=json: 청크 단위로 쓰는 JSON 배열
+    """
+    _validate_type_name(aggregate_type)
+    query = EXPORT_INSTANCES_QUERY.format(type_name=aggregate_type)
+    params: Dict[str, Any] = {}
+    if limit:
+        query += "LIMIT $limit\n"
+        params['limit'] = limit
+
+    records = deps.neo4j_client.stream(query, params)
+    if format == "json":
+        return StreamingResponse(_json_array(records), media_type="application/json")
+    return StreamingResponse(_ndjson_lines(records), media_type="application/x-ndjson")
+
+async def _ndjson_lines(records: AsyncIterator[Dict]) -> AsyncIterator[str]:
+    chunk: List[str] = []
+    async for record in records:
+        chunk.append(json.dumps(record['inst'], ensure_ascii=False, default=str) + "\n")
+        if len(chunk) >= EXPORT_CHUNK_RECORDS:
+            yield "".join(chunk)
+            chunk = []
+    if chunk:
+        yield "".join(chunk)
+
+async def _json_array(records: AsyncIterator[Dict]) -> AsyncIterator[str]:
+    chunk: List[str] = ["["]
+    first = True
+    async for record in records:
+        chunk.append(("" if first else ",") + json.dumps(record['inst'], ensure_ascii=False, default=str))
+        first = False
+        if len(chunk) >= EXPORT_CHUNK_RECORDS:
+            yield "".join(chunk)
+            chunk = []
+    chunk.append("]")
+    yield "".join(chunk)
+
 @router.get("/instance/{aggregate_type}/{instance_id}")
 async def get_instance(
     aggregate_type: str,
     instance_id: str
 ):
     """특정 인스턴스 조회"""
+    _validate_type_name(aggregate_type)
     try:
         instance = await deps.neo4j_client.get_instance(aggregate_type, instance_id)
         if not instance:
@@ -44,12 +147,92 @@ async def get_instance(
 @router.get("/events/{aggregate_id}")
 async def get_event_stream(
     aggregate_id: str,
-    limit: int = 100
+    limit: int = Query(100, ge=1, le=1000),
+    after: Optional[int] = Query(None, ge=0),
+    before: Optional[int] = Query(None, ge=1),
+    page: bool = False
 ):
-    """Aggregate의 이벤트 스트림 조회"""
+    """
+    Aggregate의 이벤트 스트림 조회 (sequence 기반 커서 페이지네이션)
+    
+    - 기본: 최신 이벤트부터 역방향, 다음 페이지는 before=next_cursor
+    - after=X: sequence X 이후 이벤트를 정방향으로, 다음 페이지는 after=next_cursor
+    - 응답은 기존과 같은 레코드 목록, page=true 면 has_more / next_cursor 를 담은 페이지 객체
+    """
+    if after is not None and before is not None:
+        raise HTTPException(status_code=400, detail="after 와 before 는 함께 쓸 수 없습니다")
     try:
-        events = await deps.neo4j_client.get_event_stream(aggregate_id, limit)
-        return events
+        if not page:
+            return await deps.neo4j_client.get_event_stream(aggregate_id, limit, after=after, before=before)
+        # 한 건 더 읽어 다음 페이지 존재 여부 판단
+        records = await deps.neo4j_client.get_event_stream(
+            aggregate_id, limit + 1, after=after, before=before
+        )
+        has_more = len(records) > limit
+        events = [r['e'] for r in records[:limit]]
+        return {
+            "aggregate_id": aggregate_id,
+            "direction": "forward" if after is not None else "backward",
+            "events": events,
+            "has_more": has_more,
+            "next_cursor": events[-1]['sequence'] if has_more else None
+        }
     except Exception as e:
         logger.error(f"이벤트 스트림 조회 실패: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/state/{aggregate_id}")
+async def get_aggregate_state(aggregate_id: str):
+    """Aggregate 현재 상태 (최신 스냅샷 + 꼬리 이벤트 재생)"""
+    try:
+        result = await deps.snapshot_service.rehydrate(aggregate_id)
+        if result['version'] == 0:
+            raise HTTPException(status_code=404, detail="Aggregate has no events")
+        return result
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"상태 재수화 실패: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/state/{aggregate_id}/snapshot")
+async def take_snapshot(aggregate_id: str):
+    """즉시 스냅샷 저장"""
+    try:
+        version = await deps.snapshot_service.take_snapshot(aggregate_id)
+        return {"aggregate_id": aggregate_id, "snapshot_version": version}
+    except Exception as e:
+        logger.error(f"스냅샷 저장 실패: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/snapshots/metrics")
+async def get_snapshot_metrics():
+    """재수화 재생 길이 / 스냅샷 지표"""
+    return {
+        "frequency": deps.snapshot_service.frequency,
+        **deps.snapshot_service.metrics.snapshot()
+    }
+
+@router.get("/rules/metrics")
+async def get_rule_metrics():
+    """룰별 평가 횟수 / 소요 시간 (느린 룰부터)"""
+    return {
+        "loaded": deps.rule_engine.rule_count,
+        **deps.rule_engine.metrics.snapshot()
+    }
+
+@router.get("/transformations/metrics")
+async def get_transformation_metrics():
+    """Transformation 별 실행 지연 히스토그램 / 컴파일 거부 목록"""
+    return deps.transformation_engine.stats()
+
+@router.get("/outbox/metrics")
+async def get_outbox_metrics():
+    """아웃박스 발행 대기 / 발행 / 실패 지표"""
+    if not deps.outbox_relay:
+        return {"enabled": False}
+    try:
+        return {"enabled": True, **await deps.outbox_relay.stats()}
+    except Exception as e:
+        logger.error(f"아웃박스 지표 조회 실패: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
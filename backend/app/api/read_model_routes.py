@@ -0,0 +1,68 @@
+from fastapi import APIRouter, HTTPException, Query
+from app.services.projection_engine import Projection
+import app.dependencies as deps
+import logging
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+def _get_projection(name: str) -> Projection:
+    projection = deps.projection_engine.get(name) if deps.projection_engine else None
+    if not projection:
+        raise HTTPException(status_code=404, detail="Read model not found")
+    return projection
+
+@router.get("")
+async def list_read_models():
+    """물질화된 Read Model 목록"""
+    projections = deps.projection_engine.projections.values() if deps.projection_engine else []
+    return {
+        "read_models": [
+            {
+                "name": p.name,
+                "source_events": p.source_events,
+                "projections": p.projections,
+                "rows": len(p.rows)
+            }
+            for p in projections
+        ]
+    }
+
+@router.get("/_metrics")
+async def get_read_model_metrics():
+    """프로젝션 적용 수 / 지연 / 재구축 지표"""
+    return deps.projection_engine.metrics.snapshot()
+
+@router.get("/{name}")
+async def get_read_model_rows(
+    name: str,
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0)
+):
+    """Read Model 행 조회 (메모리 테이블, 그래프 탐색 없음)"""
+    projection = _get_projection(name)
+    rows = list(projection.rows.values())
+    return {
+        "name": name,
+        "total": len(rows),
+        "rows": rows[offset:offset + limit]
+    }
+
+@router.get("/{name}/{aggregate_id}")
+async def get_read_model_row(name: str, aggregate_id: str):
+    """Aggregate 하나의 Read Model 행"""
+    row = _get_projection(name).rows.get(aggregate_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Row not found")
+    return row
+
+@router.post("/{name}/rebuild")
+async def rebuild_read_model(name: str):
+    """이벤트 로그에서 Read Model 재구축"""
+    _get_projection(name)
+    try:
+        await deps.projection_engine.rebuild(name)
+        return {"name": name, **deps.projection_engine.metrics.rebuilds[name]}
+    except Exception as e:
+        logger.error(f"Read Model 재구축 실패: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
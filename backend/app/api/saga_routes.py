@@ -0,0 +1,22 @@
+from fastapi import APIRouter, HTTPException, Query
+import app.dependencies as deps
+
+router = APIRouter()
+
+@router.get("/metrics")
+async def get_saga_metrics():
+    """큐 깊이 / 처리 중 / 처리량 / 재시도 / dead letter 지표"""
+    return deps.saga_dispatcher.stats()
+
+@router.get("/dead-letters")
+async def list_dead_letters(limit: int = Query(100, ge=1, le=1000)):
+    """재시도 후에도 실패한 Policy 작업 (최근 순)"""
+    jobs = list(deps.saga_dispatcher.dead_letters)[::-1][:limit]
+    return {"dead_letters": [job.to_dict() for job in jobs]}
+
+@router.post("/dead-letters/{job_id}/redrive")
+async def redrive_dead_letter(job_id: str):
+    """dead letter 작업을 다시 큐에 넣는다"""
+    if not await deps.saga_dispatcher.redrive(job_id):
+        raise HTTPException(status_code=404, detail="Dead letter not found")
+    return {"status": "queued", "id": job_id}
@@ -14,6 +14,32 @@ from uuid import uuid4
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+PARENT_VERSION_QUERY = """
+MATCH (v:ProjectVersion {id: $parent_id})
+RETURN v.version as version
+"""
+
+GET_VERSION_QUERY = """
+MATCH (v:ProjectVersion {id: $version_id})
+OPTIONAL MATCH (v)-[:HAS_ONTOLOGY]->(o:ObjectType)
+RETURN v,
+       toString(v.created_at) as created_at,
+       toString(v.updated_at) as updated_at,
+       collect(o.name) as ontology_types
+"""
+
+LINK_PARENT_VERSION_QUERY = """
+MATCH (parent:ProjectVersion {id: $parent_id})
+MATCH (child:ProjectVersion {id: $child_id})
+CREATE (parent)-[:HAS_CHILD_VERSION]->(child)
+"""
+
+DELETE_VERSION_QUERY = """
+MATCH (v:ProjectVersion {id: $version_id})
+DETACH DELETE v
+RETURN count(*) as deleted
+"""
+
 
 @router.post("/save", response_model=ProjectVersion)
 async def save_version(request: SaveVersionRequest):
@@ -21,60 +47,53 @@ async def save_version(request: SaveVersionRequest):
     try:
         version_id = str(uuid4())
 
-        # 버전 번호 계산
-        version_number = 1
-        if request.parent_version_id:
-            # 부모 버전이 있으면 버전 번호 증가
-            parent_query = """
-            MATCH (v:ProjectVersion {id: $parent_id})
-            RETURN v.version as version
-            """
-            parent_result = await deps.neo4j_client.execute(parent_query, {
-                'parent_id': request.parent_version_id
+        # 부모 조회 / 버전 생성 / 관계 생성을 하나의 트랜잭션에서 실행
+        async with deps.neo4j_client.unit_of_work() as uow:
+            # 버전 번호 계산
+            version_number = 1
+            if request.parent_version_id:
+                # 부모 버전이 있으면 버전 번호 증가
+                parent_result = await uow.execute(PARENT_VERSION_QUERY, {
+                    'parent_id': request.parent_version_id
+                })
+                if parent_result:
+                    version_number = parent_result[0]['version'] + 1
+
+            # Neo4j에 버전 저장
+            query = """
+            CREATE (v:ProjectVersion {
+                id: $id,
+                name: $name,
+                description: $description,
+                version: $version,
+                business_description: $business_description,
+                llm_result_json: $llm_result_json,
+                flow_state_json: $flow_state_json,
+                created_at: datetime(),
+                updated_at: datetime()
             })
-            if parent_result:
-                version_number = parent_result[0]['version'] + 1
+            RETURN v, toString(v.created_at) as created_at, toString(v.updated_at) as updated_at
+            """
 
-        # Neo4j에 버전 저장
-        query = """
-        CREATE (v:ProjectVersion {
-            id: $id,
-            name: $name,
-            description: $description,
-            version: $version,
-            business_description: $business_description,
-            llm_result_json: $llm_result_json,
-            flow_state_json: $flow_state_json,
-            created_at: datetime(),
-            updated_at: datetime()
-        })
-        RETURN v, toString(v.created_at) as created_at, toString(v.updated_at) as updated_at
-        """
+            result = await uow.execute(query, {
+                'id': version_id,
+                'name': request.name,
+                'description': request.description or "",
+                'version': version_number,
+                'business_description': request.business_description,
+                'llm_result_json': json.dumps(request.llm_result) if request.llm_result else None,
+                'flow_state_json': json.dumps(request.flow_state.dict()) if request.flow_state else None
+            })
 
-        result = await deps.neo4j_client.execute_write(query, {
-            'id': version_id,
-            'name': request.name,
-            'description': request.description or "",
-            'version': version_number,
-            'business_description': request.business_description,
-            'llm_result_json': json.dumps(request.llm_result) if request.llm_result else None,
-            'flow_state_json': json.dumps(request.flow_state.dict()) if request.flow_state else None
-        })
+            if not result:
+                raise HTTPException(status_code=500, detail="Failed to save version")
 
-        if not result:
-            raise HTTPException(status_code=500, detail="Failed to save version")
-
-        # 부모 버전과의 관계 생성
-        if request.parent_version_id:
-            relation_query = """
-            MATCH (parent:ProjectVersion {id: $parent_id})
-            MATCH (child:ProjectVersion {id: $child_id})
-            CREATE (parent)-[:HAS_CHILD_VERSION]->(child)
-            """
-            await deps.neo4j_client.execute_write(relation_query, {
-                'parent_id': request.parent_version_id,
-                'child_id': version_id
-            })
+            # 부모 버전과의 관계 생성
+            if request.parent_version_id:
+                await uow.execute(LINK_PARENT_VERSION_QUERY, {
+                    'parent_id': request.parent_version_id,
+                    'child_id': version_id
+                })
 
         logger.info(f"버전 저장 완료: {version_id}")
 
@@ -139,16 +158,7 @@ async def list_versions():
 async def get_version(version_id: str):
     """특정 버전 상세 조회"""
     try:
-        query = """
-        MATCH (v:ProjectVersion {id: $version_id})
-        OPTIONAL MATCH (v)-[:HAS_ONTOLOGY]->(o:ObjectType)
-        RETURN v,
-               toString(v.created_at) as created_at,
-               toString(v.updated_at) as updated_at,
-               collect(o.name) as ontology_types
-        """
-
-        result = await deps.neo4j_client.execute(query, {'version_id': version_id})
+        result = await deps.neo4j_client.execute(GET_VERSION_QUERY, {'version_id': version_id})
 
         if not result:
             raise HTTPException(status_code=404, detail="Version not found")
@@ -257,13 +267,7 @@ async def update_version(version_id: str, request: UpdateVersionRequest):
 async def delete_version(version_id: str):
     """버전 삭제"""
     try:
-        query = """
-        MATCH (v:ProjectVersion {id: $version_id})
-        DETACH DELETE v
-        RETURN count(*) as deleted
-        """
-
-        result = await deps.neo4j_client.execute_write(query, {'version_id': version_id})
+        result = await deps.neo4j_client.execute_write(DELETE_VERSION_QUERY, {'version_id': version_id})
 
         if not result or result[0]['deleted'] == 0:
             raise HTTPException(status_code=404, detail="Version not found")
@@ -1,14 +1,53 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Optional
 
 class Settings(BaseSettings):
     # Neo4j
     neo4j_uri: str = "bolt://localhost:7687"
     neo4j_user: str = "neo4j"
     neo4j_password: str = "password"
+    neo4j_database: Optional[str] = None  # None 이면 서버 기본 DB
+    neo4j_max_connection_pool_size: int = 100
+    neo4j_connection_acquisition_timeout: float = 60.0  # 초
+    neo4j_max_connection_lifetime: float = 3600.0  # 초
+    neo4j_fetch_size: int = 1000
+    neo4j_max_transaction_retry_time: float = 30.0  # 초, 일시적 오류 재시도 한도
+    neo4j_causal_consistency: bool = False  # 북마크 기반 인과적 일관성
+    
+    # Command 일괄 실행 (/api/commands/bulk)
+    command_bulk_batch_size: int = 500
+    command_bulk_max_line_bytes: int = 1048576  # NDJSON 한 줄 상한
+    
+    # Aggregate 스냅샷 (N개 이벤트마다, 0 이면 비활성)
+    snapshot_frequency: int = 100
+    
+    # 룰 엔진 (Given-When-Then YAML 디렉터리)
+    rules_dir: str = "rules"
+    
+    # Policy saga 디스패처
+    saga_workers: int = 8
+    saga_queue_size: int = 1000
+    saga_max_retries: int = 3
+    saga_retry_backoff: float = 0.5  # 초, 시도마다 2배
+    saga_max_depth: int = 10  # Policy → Command → Policy 연쇄 최대 깊이
+    saga_dead_letter_size: int = 1000
     
     # Kafka
     kafka_bootstrap_servers: str = "localhost:9092"
+    kafka_compression_type: Optional[str] = "gzip"  # gzip, snappy, lz4, zstd 또는 None
+    kafka_linger_ms: int = 20
+    kafka_max_batch_size: int = 65536  # 바이트, 파티션별 배치
+    
+    # 아웃박스 릴레이 (DomainEvent → Kafka)
+    outbox_enabled: bool = False  # 브로커 없이 실행할 때 릴레이 오류가 나지 않도록 기본 비활성
+    outbox_broker: str = "memory"  # memory (프로세스 내 브로커, 개발/테스트용) 또는 kafka
+    outbox_topic: str = "domain-events"
+    outbox_batch_size: int = 500
+    outbox_poll_interval: float = 1.0  # 초
+    
+    # 실시간 이벤트 피드 (SSE / WebSocket)
+    feed_buffer_size: int = 256  # 구독자별 버퍼, 넘치면 연결 종료
+    feed_heartbeat_interval: float = 15.0  # 초
     
     # LLM
     openai_api_key: str = ""
@@ -17,6 +56,34 @@ class Settings(BaseSettings):
     llm_model: str = "gpt-4-turbo-preview"
     llm_temperature: float = 0.3
     
+    # 긴 문서 map-reduce 분석
+    llm_section_max_chars: int = 6000  # 섹션 최대 길이, 넘는 설명은 섹션별로 분석
+    llm_map_concurrency: int = 4  # 요청 하나가 동시에 분석하는 섹션 수
+    
+    # LLM 클라이언트 풀 (프로세스 공용 HTTP 연결)
+    llm_http2: bool = True  # h2 패키지가 없으면 HTTP/1.1
+    llm_max_connections: int = 20
+    llm_max_keepalive_connections: int = 10
+    llm_keepalive_expiry: float = 30.0  # 초
+    llm_connect_timeout: float = 10.0  # 초
+    llm_timeout: float = 120.0  # 초, 읽기/쓰기
+    llm_max_concurrency: int = 8  # 동시 LLM 호출 수
+    llm_queue_timeout: float = 30.0  # 초, 넘으면 503
+    
+    # LLM 분석 작업 큐 (/api/jobs)
+    analysis_job_workers: int = 4  # 동시에 실행하는 분석 작업 수
+    analysis_job_max_pending: int = 1000
+    analysis_job_max_pending_per_tenant: int = 100  # 넘으면 429
+    analysis_job_result_ttl: float = 3600.0  # 초, 끝난 작업 보존 기간
+    analysis_job_store: str = "memory"  # memory 또는 neo4j (재시작 후 미완료 작업 재실행)
+    analysis_job_lease_ttl: float = 60.0  # 초, 하트비트가 끊긴 프로세스의 작업을 다른 프로세스가 가져가기까지
+    
+    # LLM 응답 캐시
+    llm_cache_backend: str = "memory"  # memory, disk 또는 none
+    llm_cache_ttl: float = 86400.0  # 초
+    llm_cache_max_entries: int = 1000  # memory 백엔드 LRU 상한
+    llm_cache_dir: str = ".cache/llm"  # disk 백엔드 디렉터리
+    
     # FastAPI
     backend_port: int = 8000
     cors_origins: List[str] = ["http://localhost:5173"]
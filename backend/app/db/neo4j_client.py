@@ -1,27 +1,225 @@
-from neo4j import AsyncGraphDatabase
-from typing import List, Dict, Any, Optional
+from neo4j import AsyncGraphDatabase, READ_ACCESS, WRITE_ACCESS
+from neo4j.exceptions import ConstraintError
+from typing import List, Dict, Any, Optional, Callable, Awaitable, AsyncIterator
+from contextlib import asynccontextmanager
 import logging
 import json
+import time
 
 logger = logging.getLogger(__name__)
 
+# 인덱스 대상 핫 쿼리 (app.db.plan_check 에서 실행 계획 검사)
+INSTANCE_BY_ID_QUERY = """
+MATCH (inst:{type_name}:DynamicInstance {{id: $instance_id}})
+RETURN inst
+"""
+
+# Command 실행: 인스턴스 생성/갱신 + 이벤트 추가를 한 문장으로
+# 인스턴스에 먼저 쓰기 락을 잡고(_lock SET/REMOVE) 버전을 읽어 같은 Aggregate 에 대한
+# 동시 쓰기가 직렬화되고 sequence 가 1씩 단조 증가한다
+# published: false 는 같은 쓰기 안에서 남기는 아웃박스 표시 (OutboxRelay 가 발행 후 true)
+# $expected_version 이 주어지면 현재 버전과 다를 때 아무 행도 반환하지 않는다
+EXECUTE_COMMAND_QUERY = """
+MATCH (ot:ObjectType {{name: $type_name}})
+MERGE (inst:{type_name}:DynamicInstance {{id: $instance_id}})
+ON CREATE SET inst.layer = 'dynamic',
+              inst.created_at = timestamp()
+SET inst._lock = true
+REMOVE inst._lock
+WITH ot, inst, coalesce(inst.version, 0) AS current_version
+WHERE $expected_version IS NULL OR current_version = $expected_version
+SET inst += $properties,
+    inst.version = current_version + 1,
+    inst.updated_at = timestamp()
+MERGE (inst)-[:INSTANCE_OF]->(ot)
+CREATE (e:DomainEvent {{
+    type: $event_type,
+    aggregate_id: $instance_id,
+    payload_json: $payload_json,
+    sequence: current_version + 1,
+    timestamp: timestamp(),
+    published: false
+}})
+CREATE (inst)-[:EMITTED]->(e)
+RETURN inst, e
+"""
+
+INSTANCE_VERSION_QUERY = """
+MATCH (inst:{type_name}:DynamicInstance {{id: $instance_id}})
+RETURN coalesce(inst.version, 0) AS version
+"""
+
+# DynamicInstance.id 유일성 위반 원인: 같은 id 가 다른 Aggregate 타입으로 이미 있음
+INSTANCE_TYPE_CONFLICT_QUERY = """
+UNWIND $rows AS row
+MATCH (inst:DynamicInstance {id: row.instance_id})
+WHERE NOT row.type_name IN labels(inst)
+RETURN inst.id AS instance_id, coalesce(inst.version, 0) AS version
+LIMIT 1
+"""
+
+# 일괄 Command 실행: Aggregate 타입별로 인스턴스당 한 행
+# 인스턴스 버전을 한 번 올리고, 이벤트는 배치 내 순번(offset)대로 sequence 를 받는다
+EXECUTE_COMMAND_BATCH_QUERY = """
+MATCH (ot:ObjectType {{name: $type_name}})
+UNWIND $aggregates AS agg
+MERGE (inst:{type_name}:DynamicInstance {{id: agg.instance_id}})
+ON CREATE SET inst.layer = 'dynamic',
+              inst.created_at = timestamp()
+SET inst._lock = true
+REMOVE inst._lock
+WITH ot, inst, agg, coalesce(inst.version, 0) AS base
+SET inst += agg.properties,
+    inst.version = base + size(agg.events),
+    inst.updated_at = timestamp()
+MERGE (inst)-[:INSTANCE_OF]->(ot)
+WITH inst, agg, base
+UNWIND agg.events AS evt
+CREATE (e:DomainEvent {{
+    type: evt.event_type,
+    aggregate_id: agg.instance_id,
+    payload_json: evt.payload_json,
+    sequence: base + evt.offset,
+    timestamp: timestamp(),
+    published: false
+}})
+CREATE (inst)-[:EMITTED]->(e)
+RETURN evt.index AS index, e AS event, inst AS instance
+"""
+
+# 이벤트 스트림 범위 조회: (aggregate_id, sequence) 인덱스로 위치 기반 탐색
+# 한 페이지 비용이 이력 길이와 무관하다
+EVENT_STREAM_QUERY = """
+MATCH (e:DomainEvent)
+WHERE e.aggregate_id = $aggregate_id AND e.sequence < $before
+RETURN e
+ORDER BY e.sequence DESC
+LIMIT $limit
+"""
+
+EVENT_STREAM_FORWARD_QUERY = """
+MATCH (e:DomainEvent)
+WHERE e.aggregate_id = $aggregate_id AND e.sequence > $after
+RETURN e
+ORDER BY e.sequence ASC
+LIMIT $limit
+"""
+
+# sequence 상한 (before 미지정 시 최신 이벤트부터)
+MAX_SEQUENCE = 2 ** 63 - 1
+
+class ConcurrencyConflict(Exception):
+    """expected_version 과 Aggregate 현재 버전 불일치"""
+    
+    def __init__(self, aggregate_id: str, expected_version: int, current_version: int):
+        self.aggregate_id = aggregate_id
+        self.expected_version = expected_version
+        self.current_version = current_version
+        super().__init__(
+            f"Aggregate {aggregate_id}: expected version {expected_version}, "
+            f"current version {current_version}"
+        )
+
+class PoolMetrics:
+    """커넥션 풀 사용량 / 획득 대기 시간 집계"""
+    
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.sessions = 0
+        self.transaction_retries = 0
+        self.waits = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+    
+    def session_opened(self):
+        self.in_use += 1
+        self.peak_in_use = max(self.peak_in_use, self.in_use)
+        self.sessions += 1
+    
+    def session_closed(self):
+        self.in_use -= 1
+    
+    def record_wait(self, wait_ms: float):
+        # 트랜잭션 시작 시점에 커넥션을 획득하므로 첫 시도까지의 소요 시간을 대기 시간으로 본다
+        self.waits += 1
+        self.total_wait_ms += wait_ms
+        self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+    
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'max_size': self.max_size,
+            'in_use': self.in_use,
+            'peak_in_use': self.peak_in_use,
+            'utilisation': round(self.in_use / self.max_size, 3) if self.max_size else 0.0,
+            'sessions': self.sessions,
+            'transaction_retries': self.transaction_retries,
+            'acquisitions_timed': self.waits,
+            'avg_wait_ms': round(self.total_wait_ms / self.waits, 2) if self.waits else 0.0,
+            'max_wait_ms': round(self.max_wait_ms, 2)
+        }
+
+class UnitOfWork:
+    """하나의 세션(또는 트랜잭션)을 공유하는 쿼리 실행 단위"""
+    
+    def __init__(self, runner):
+        # runner: AsyncSession (auto-commit) 또는 AsyncTransaction
+        self.runner = runner
+    
+    async def execute(
+        self,
+        query: str,
+        params: Dict[str, Any] = None
+    ) -> List[Dict]:
+        result = await self.runner.run(query, params or {})
+        return await result.data()
+
 class Neo4jClient:
     """Neo4j 비동기 클라이언트"""
     
-    def __init__(self, uri: str, user: str, password: str):
+    def __init__(
+        self,
+        uri: str,
+        user: str,
+        password: str,
+        database: Optional[str] = None,
+        max_connection_pool_size: int = 100,
+        connection_acquisition_timeout: float = 60.0,
+        max_connection_lifetime: float = 3600.0,
+        fetch_size: int = 1000,
+        max_transaction_retry_time: float = 30.0,
+        causal_consistency: bool = False
+    ):
         self.uri = uri
         self.user = user
         self.password = password
+        self.database = database
+        self.max_connection_pool_size = max_connection_pool_size
+        self.connection_acquisition_timeout = connection_acquisition_timeout
+        self.max_connection_lifetime = max_connection_lifetime
+        self.fetch_size = fetch_size
+        self.max_transaction_retry_time = max_transaction_retry_time
+        self.causal_consistency = causal_consistency
+        self.bookmark_manager = None
+        self.pool_metrics = PoolMetrics(max_connection_pool_size)
         self.driver = None
     
     async def connect(self):
         """Neo4j 연결"""
         self.driver = AsyncGraphDatabase.driver(
             self.uri,
-            auth=(self.user, self.password)
+            auth=(self.user, self.password),
+            max_connection_pool_size=self.max_connection_pool_size,
+            connection_acquisition_timeout=self.connection_acquisition_timeout,
+            max_connection_lifetime=self.max_connection_lifetime,
+            max_transaction_retry_time=self.max_transaction_retry_time
         )
+        if self.causal_consistency:
+            # 모든 세션이 북마크를 공유 → 쓰기 직후 읽기가 팔로워에서도 최신 상태를 본다
+            self.bookmark_manager = AsyncGraphDatabase.bookmark_manager()
         # 연결 테스트
-        async with self.driver.session() as session:
+        async with self._session() as session:
             result = await session.run("RETURN 1")
             await result.single()
         logger.info(f"Connected to Neo4j at {self.uri}")
@@ -32,32 +230,135 @@ class Neo4jClient:
             await self.driver.close()
             logger.info("Neo4j connection closed")
     
+    @asynccontextmanager
+    async def _session(self, read: bool = False):
+        """설정(database, fetch_size, bookmark)이 적용된 세션 + 풀 사용량 집계"""
+        async with self.driver.session(
+            database=self.database,
+            fetch_size=self.fetch_size,
+            bookmark_manager=self.bookmark_manager,
+            default_access_mode=READ_ACCESS if read else WRITE_ACCESS
+        ) as session:
+            self.pool_metrics.session_opened()
+            try:
+                yield session
+            finally:
+                self.pool_metrics.session_closed()
+    
+    @asynccontextmanager
+    async def _begin(self, session):
+        """명시적 트랜잭션 시작 (커넥션 획득 대기 시간 측정), 정상 종료 시 커밋 / 예외 시 롤백"""
+        started = time.perf_counter()
+        tx = await session.begin_transaction()
+        self.pool_metrics.record_wait((time.perf_counter() - started) * 1000)
+        try:
+            yield tx
+            await tx.commit()
+        except BaseException:
+            await tx.rollback()
+            raise
+    
+    async def run_transaction(
+        self,
+        work: Callable[[UnitOfWork], Awaitable[Any]],
+        write: bool = True
+    ) -> Any:
+        """여러 쿼리를 묶은 함수를 관리형 트랜잭션으로 실행
+        
+        일시적 오류(리더 선출, 데드락 등) 시 드라이버가
+        max_transaction_retry_time 동안 work 전체를 재시도하므로
+        work 는 부수효과 없이 결과를 모두 소비해서 반환해야 한다.
+        """
+        async with self._session() as session:
+            started = time.perf_counter()
+            attempts = 0
+            
+            async def tx_function(tx):
+                nonlocal attempts
+                attempts += 1
+                if attempts == 1:
+                    self.pool_metrics.record_wait((time.perf_counter() - started) * 1000)
+                return await work(UnitOfWork(tx))
+            
+            try:
+                if write:
+                    return await session.execute_write(tx_function)
+                return await session.execute_read(tx_function)
+            finally:
+                if attempts > 1:
+                    self.pool_metrics.transaction_retries += attempts - 1
+    
+    async def _execute_managed(
+        self,
+        query: str,
+        params: Optional[Dict[str, Any]],
+        write: bool
+    ) -> List[Dict]:
+        async def work(uow: UnitOfWork) -> List[Dict]:
+            return await uow.execute(query, params)
+        return await self.run_transaction(work, write=write)
+    
     async def execute(
         self, 
         query: str, 
         params: Dict[str, Any] = None
     ) -> List[Dict]:
-        """Cypher 쿼리 실행"""
-        async with self.driver.session() as session:
-            result = await session.run(query, params or {})
-            records = await result.data()
-            return records
+        """Cypher 읽기 쿼리 실행 (관리형 읽기 트랜잭션, 클러스터 팔로워로 라우팅)"""
+        return await self._execute_managed(query, params, write=False)
     
     async def execute_write(
         self,
         query: str,
         params: Dict[str, Any] = None
     ) -> List[Dict]:
-        """쓰기 트랜잭션"""
-        async with self.driver.session() as session:
+        """쓰기 트랜잭션 (관리형 쓰기 트랜잭션, 리더로 라우팅)"""
+        return await self._execute_managed(query, params, write=True)
+    
+    async def stream(
+        self,
+        query: str,
+        params: Dict[str, Any] = None
+    ) -> AsyncIterator[Dict]:
+        """읽기 쿼리 결과를 레코드 단위로 스트리밍
+        
+        result.data() 로 전체를 모으지 않고 Bolt 커서를 fetch_size 단위로 당겨오므로
+        결과 크기와 무관하게 메모리 사용이 일정하다. (재시도 없음)
+        """
+        async with self._session(read=True) as session:
             result = await session.run(query, params or {})
-            records = await result.data()
-            return records
+            async for record in result:
+                yield record.data()
+    
+    @asynccontextmanager
+    async def transaction(self):
+        """명시적 쓰기 트랜잭션 (블록 정상 종료 시 커밋, 예외 시 롤백)"""
+        async with self._session() as session:
+            async with self._begin(session) as tx:
+                yield tx
+    
+    @asynccontextmanager
+    async def unit_of_work(self, transactional: bool = True):
+        """요청 핸들러 단위로 하나의 세션/트랜잭션을 재사용
+        
+        async with client.unit_of_work() as uow:
+            await uow.execute(...)
+            await uow.execute(...)
+        """
+        async with self._session() as session:
+            if not transactional:
+                yield UnitOfWork(session)
+                return
+            async with self._begin(session) as tx:
+                yield UnitOfWork(tx)
+    
+    def pool_stats(self) -> Dict[str, Any]:
+        """풀 사용량 및 커넥션 획득 대기 시간"""
+        return self.pool_metrics.snapshot()
     
     async def health_check(self) -> bool:
         """헬스 체크"""
         try:
-            async with self.driver.session() as session:
+            async with self._session() as session:
                 result = await session.run("RETURN 1")
                 await result.single()
                 return True
@@ -111,41 +412,13 @@ class Neo4jClient:
         })
     
     # Dynamic Layer 쿼리들
-    async def create_instance(
-        self,
-        type_name: str,
-        instance_id: str,
-        properties: Dict[str, Any]
-    ):
-        """동적 인스턴스 생성"""
-        # Cypher injection 방지를 위해 파라미터 사용
-        query = f"""
-        MATCH (ot:ObjectType {{name: $type_name}})
-        CREATE (inst:{type_name}:DynamicInstance $properties)
-        SET inst.id = $instance_id,
-            inst.layer = 'dynamic',
-            inst.created_at = timestamp()
-        CREATE (inst)-[:INSTANCE_OF]->(ot)
-        RETURN inst
-        """
-        
-        props = {**properties, 'id': instance_id}
-        return await self.execute_write(query, {
-            'type_name': type_name,
-            'instance_id': instance_id,
-            'properties': props
-        })
-    
     async def get_instance(
         self,
         type_name: str,
         instance_id: str
     ) -> Optional[Dict]:
         """인스턴스 조회"""
-        query = f"""
-        MATCH (inst:{type_name}:DynamicInstance {{id: $instance_id}})
-        RETURN inst
-        """
+        query = INSTANCE_BY_ID_QUERY.format(type_name=type_name)
         result = await self.execute(query, {
             'instance_id': instance_id
         })
@@ -182,45 +455,132 @@ class Neo4jClient:
             'instance_id': instance_id
         })
     
-    # 이벤트 로그
-    async def create_event(
+    async def execute_command(
         self,
+        type_name: str,
+        instance_id: str,
         event_type: str,
-        aggregate_id: str,
-        payload: Dict[str, Any]
-    ):
-        """도메인 이벤트 생성"""
-        query = """
-        CREATE (e:DomainEvent {
-            type: $event_type,
-            aggregate_id: $aggregate_id,
-            payload: $payload,
-            timestamp: timestamp()
-        })
-        WITH e
-        MATCH (agg {id: $aggregate_id})
-        CREATE (agg)-[:EMITTED]->(e)
-        RETURN e
+        properties: Dict[str, Any],
+        payload: Dict[str, Any],
+        expected_version: Optional[int] = None
+    ) -> Optional[Dict]:
+        """Command 실행: 인스턴스 생성/갱신과 도메인 이벤트 추가를 단일 쓰기 트랜잭션으로
+        
+        ObjectType 이 없으면 아무것도 쓰지 않고 None 반환.
+        expected_version 이 현재 버전과 다르거나 id 가 다른 타입 인스턴스로 이미 있으면
+        ConcurrencyConflict (트랜잭션 롤백).
         """
-        return await self.execute_write(query, {
+        query = EXECUTE_COMMAND_QUERY.format(type_name=type_name)
+        params = {
+            'type_name': type_name,
+            'instance_id': instance_id,
             'event_type': event_type,
-            'aggregate_id': aggregate_id,
-            'payload': payload
-        })
+            'properties': {**properties, 'id': instance_id},
+            'payload_json': json.dumps(payload),
+            'expected_version': expected_version
+        }
+        
+        async def work(uow: UnitOfWork) -> Optional[Dict]:
+            result = await uow.execute(query, params)
+            if result:
+                return {'instance': result[0]['inst'], 'event': result[0]['e']}
+            if expected_version is None:
+                return None
+            current = await uow.execute(
+                INSTANCE_VERSION_QUERY.format(type_name=type_name),
+                {'instance_id': instance_id}
+            )
+            if not current:
+                return None
+            # 예외로 빠져나가면 MERGE 로 만들어진 인스턴스까지 롤백된다
+            raise ConcurrencyConflict(instance_id, expected_version, current[0]['version'])
+        
+        try:
+            return await self.run_transaction(work, write=True)
+        except ConstraintError:
+            await self._raise_instance_conflict(
+                [{'instance_id': instance_id, 'type_name': type_name}], expected_version
+            )
+            raise
+    
+    async def execute_command_batch(
+        self,
+        groups: Dict[str, List[Dict[str, Any]]]
+    ) -> Dict[int, Dict[str, Any]]:
+        """Aggregate 타입별로 묶인 Command 행들을 하나의 쓰기 트랜잭션으로 실행
+        
+        groups: {type_name: [{index, instance_id, event_type, properties, payload_json}]}
+        반환: {기록된 행 index: {'event': DomainEvent, 'instance': 배치 적용 후 인스턴스}}
+        (ObjectType 이 없는 타입의 행은 빠진다)
+        id 가 다른 타입 인스턴스로 이미 있으면 ConcurrencyConflict (배치 전체 롤백).
+        """
+        statements = []
+        for type_name, rows in groups.items():
+            # 같은 인스턴스의 행은 한 행으로 합치고 이벤트는 입력 순서대로 offset 부여
+            aggregates: Dict[str, Dict[str, Any]] = {}
+            for row in rows:
+                agg = aggregates.setdefault(row['instance_id'], {
+                    'instance_id': row['instance_id'],
+                    'properties': {},
+                    'events': []
+                })
+                agg['properties'].update(row['properties'])
+                agg['events'].append({
+                    'index': row['index'],
+                    'event_type': row['event_type'],
+                    'payload_json': row['payload_json'],
+                    'offset': len(agg['events']) + 1
+                })
+            statements.append((
+                EXECUTE_COMMAND_BATCH_QUERY.format(type_name=type_name),
+                {'type_name': type_name, 'aggregates': list(aggregates.values())}
+            ))
+        
+        async def work(uow: UnitOfWork) -> Dict[int, Dict[str, Any]]:
+            written = {}
+            for query, params in statements:
+                for record in await uow.execute(query, params):
+                    written[record['index']] = {
+                        'event': record['event'],
+                        'instance': record['instance']
+                    }
+            return written
+        
+        try:
+            return await self.run_transaction(work, write=True)
+        except ConstraintError:
+            await self._raise_instance_conflict([
+                {'instance_id': row['instance_id'], 'type_name': type_name}
+                for type_name, rows in groups.items() for row in rows
+            ], None)
+            raise
+    
+    async def _raise_instance_conflict(self, rows: List[Dict[str, str]], expected_version: Optional[int]):
+        """유일성 위반이 인스턴스 id 충돌이면 ConcurrencyConflict 로 바꿔 던진다 (아니면 그냥 반환)"""
+        conflict = await self.execute(INSTANCE_TYPE_CONFLICT_QUERY, {'rows': rows})
+        if conflict:
+            raise ConcurrencyConflict(conflict[0]['instance_id'], expected_version, conflict[0]['version'])
     
     async def get_event_stream(
         self,
         aggregate_id: str,
-        limit: int = 100
+        limit: int = 100,
+        after: Optional[int] = None,
+        before: Optional[int] = None
     ) -> List[Dict]:
-        """Aggregate의 이벤트 스트림 조회"""
-        query = """
-        MATCH (agg {id: $aggregate_id})-[:EMITTED]->(e:DomainEvent)
-        RETURN e
-        ORDER BY e.timestamp DESC
-        LIMIT $limit
+        """Aggregate의 이벤트 스트림 조회
+        
+        after 지정: sequence > after 인 이벤트를 오래된 순으로 (정방향, "X 이후 이벤트")
+        그 외: sequence < before 인 이벤트를 최신 순으로 (역방향, before 없으면 최신부터)
         """
-        return await self.execute(query, {
+        if after is not None:
+            return await self.execute(EVENT_STREAM_FORWARD_QUERY, {
+                'aggregate_id': aggregate_id,
+                'after': after,
+                'limit': limit
+            })
+        return await self.execute(EVENT_STREAM_QUERY, {
             'aggregate_id': aggregate_id,
+            'before': before if before is not None else MAX_SEQUENCE,
             'limit': limit
         })
@@ -0,0 +1,150 @@
+"""핫 쿼리 실행 계획 검사
+
+    python -m app.db.plan_check
+
+스키마 부트스트랩 후 클라이언트/라우트/서비스의 키 조회 쿼리를 EXPLAIN 하여
+AllNodesScan / NodeByLabelScan 이 남아 있으면 종료 코드 1 로 실패한다.
+동적 라벨 쿼리용 검사 인덱스(instance_PlanCheckType_*)는 검사 후 지운다.
+
+의도적으로 라벨 전체를 읽어 검사하지 않는 쿼리 (INTENTIONAL_FULL_READS):
+시작/빌드 시 한 번 읽는 정의 목록, 관리용 목록/연결, 타입 전체 내보내기.
+"""
+import asyncio
+import sys
+from typing import Dict
+
+from app.config import settings
+from app.db.neo4j_client import (
+    Neo4jClient,
+    INSTANCE_BY_ID_QUERY,
+    INSTANCE_VERSION_QUERY,
+    INSTANCE_TYPE_CONFLICT_QUERY,
+    EXECUTE_COMMAND_QUERY,
+    EXECUTE_COMMAND_BATCH_QUERY,
+    EVENT_STREAM_QUERY,
+    EVENT_STREAM_FORWARD_QUERY,
+)
+from app.db.schema import bootstrap_schema, check_query_plans, ensure_instance_indexes, QueryPlanError
+
+# 동적 라벨 쿼리 검사용 라벨 (존재하지 않아도 계획은 세워진다)
+PLAN_CHECK_LABEL = "PlanCheckType"
+
+# ensure_instance_indexes(PLAN_CHECK_LABEL, []) 가 만드는 인덱스
+PROBE_INDEXES = [f"instance_{PLAN_CHECK_LABEL}_keyset"]
+
+# 검사하지 않는 쿼리 → 이유
+INTENTIONAL_FULL_READS = {
+    'command_registry.load': "시작 시 전체 Command 정의를 한 번 읽는다",
+    'projection_engine.load': "시작/빌드 시 전체 ReadModel 정의를 한 번 읽는다",
+    'saga_dispatcher.load': "시작/빌드 시 전체 Policy 정의를 한 번 읽는다",
+    'transformation_engine.load': "시작/빌드 시 전체 Transformation 정의를 한 번 읽는다",
+    'ontology_builder.dedupe_transformations': "빌드 시 Transformation 전체에서 중복 정리",
+    'ontology.list / ontology.links': "관리 화면의 전체 ObjectType / LinkType 목록",
+    'versions.list / versions.link_ontology': "전체 버전 목록, 전체 ObjectType 연결",
+    'versions.update': "SET 절이 요청마다 달라지는 동적 쿼리 (MATCH 는 versions.get 과 같다)",
+    'instances.export': "타입의 인스턴스 전체 내보내기 (라벨 스캔이 곧 결과)",
+}
+
+
+def hot_queries() -> Dict[str, str]:
+    """검사 대상 쿼리 (이름 → Cypher)"""
+    from app.api.ontology_routes import AGGREGATE_SCHEMA_QUERY
+    from app.api.query_routes import OBJECT_TYPE_PROPERTIES_QUERY
+    from app.api.version_routes import (
+        PARENT_VERSION_QUERY, GET_VERSION_QUERY, LINK_PARENT_VERSION_QUERY, DELETE_VERSION_QUERY
+    )
+    from app.services import ontology_builder
+    from app.services.analysis_jobs import (
+        SAVE_JOB_QUERY, GET_JOB_QUERY, CLAIM_EXPIRED_JOBS_QUERY, RENEW_JOB_LEASES_QUERY, PURGE_JOBS_QUERY
+    )
+    from app.services.transformation_engine import compile_logic
+    from app.services.outbox import FETCH_UNPUBLISHED_QUERY, MARK_PUBLISHED_QUERY, COUNT_UNPUBLISHED_QUERY
+    from app.services.projection_engine import REBUILD_EVENTS_QUERY
+    from app.services.snapshot_service import LATEST_SNAPSHOT_QUERY, TAIL_EVENTS_QUERY, SAVE_SNAPSHOT_QUERY
+    from app.services.instance_query import BUILTIN_FIELDS, compile_instance_query, encode_cursor
+
+    # 두 번째 페이지 (커서 있음) 인스턴스 목록
+    instance_page, _, _ = compile_instance_query(
+        PLAN_CHECK_LABEL, dict(BUILTIN_FIELDS), [], cursor=encode_cursor([0, ''])
+    )
+
+    queries = {
+        'client.get_instance': INSTANCE_BY_ID_QUERY.format(type_name=PLAN_CHECK_LABEL),
+        'client.instance_version': INSTANCE_VERSION_QUERY.format(type_name=PLAN_CHECK_LABEL),
+        'client.instance_type_conflict': INSTANCE_TYPE_CONFLICT_QUERY,
+        'client.execute_command': EXECUTE_COMMAND_QUERY.format(type_name=PLAN_CHECK_LABEL),
+        'client.execute_command_batch': EXECUTE_COMMAND_BATCH_QUERY.format(type_name=PLAN_CHECK_LABEL),
+        'client.get_event_stream': EVENT_STREAM_QUERY,
+        'client.get_event_stream_forward': EVENT_STREAM_FORWARD_QUERY,
+        'ontology.schema': AGGREGATE_SCHEMA_QUERY,
+        'instances.object_type_properties': OBJECT_TYPE_PROPERTIES_QUERY,
+        'instances.keyset_page': instance_page,
+        'versions.parent': PARENT_VERSION_QUERY,
+        'versions.get': GET_VERSION_QUERY,
+        'versions.link_parent': LINK_PARENT_VERSION_QUERY,
+        'versions.delete': DELETE_VERSION_QUERY,
+        'transformations.apply': compile_logic(ontology_builder.DEFAULT_TRANSFORMATION_LOGIC),
+        'outbox.fetch': FETCH_UNPUBLISHED_QUERY,
+        'outbox.mark': MARK_PUBLISHED_QUERY,
+        'outbox.count': COUNT_UNPUBLISHED_QUERY,
+        'projections.rebuild': REBUILD_EVENTS_QUERY,
+        'snapshots.latest': LATEST_SNAPSHOT_QUERY,
+        'snapshots.tail': TAIL_EVENTS_QUERY,
+        'snapshots.save': SAVE_SNAPSHOT_QUERY,
+        'jobs.save': SAVE_JOB_QUERY,
+        'jobs.get': GET_JOB_QUERY,
+        'jobs.claim_expired': CLAIM_EXPIRED_JOBS_QUERY,
+        'jobs.renew': RENEW_JOB_LEASES_QUERY,
+        'jobs.purge': PURGE_JOBS_QUERY,
+        'ontology_builder.object_types': ontology_builder.BULK_OBJECT_TYPES_QUERY,
+        'ontology_builder.commands': ontology_builder.BULK_COMMANDS_QUERY,
+        'ontology_builder.events': ontology_builder.BULK_EVENTS_QUERY,
+        'ontology_builder.link_types': ontology_builder.BULK_LINK_TYPES_QUERY,
+        'ontology_builder.transformations': ontology_builder.BULK_TRANSFORMATIONS_QUERY,
+        'ontology_builder.read_models': ontology_builder.BULK_READ_MODELS_QUERY,
+        'ontology_builder.policies': ontology_builder.BULK_POLICIES_QUERY,
+    }
+    for phase, query in ontology_builder.DELETE_QUERIES.items():
+        queries[f'ontology_builder.delete_{phase}'] = query
+    queries['ontology_builder.object_types_in_use'] = ontology_builder.OBJECT_TYPES_IN_USE_QUERY
+    queries['ontology_builder.prune_object_types'] = ontology_builder.PRUNE_OBJECT_TYPES_QUERY
+    return queries
+
+
+async def _drop_probe_indexes(client: Neo4jClient, names):
+    for name in names:
+        async with client.transaction() as tx:
+            result = await tx.run(f"DROP INDEX {name} IF EXISTS")
+            await result.consume()
+
+
+async def main() -> int:
+    client = Neo4jClient(
+        uri=settings.neo4j_uri,
+        user=settings.neo4j_user,
+        password=settings.neo4j_password,
+        database=settings.neo4j_database
+    )
+    await client.connect()
+    try:
+        await bootstrap_schema(client)
+        # 인스턴스 목록 쿼리용 (created_at, id) 인덱스 - 검사용 라벨이므로 끝나면 지운다
+        await ensure_instance_indexes(client, PLAN_CHECK_LABEL, [])
+        queries = hot_queries()
+        try:
+            await check_query_plans(client, queries)
+        except QueryPlanError as e:
+            for name, scans in e.violations.items():
+                print(f"❌ {name}: {', '.join(scans)}")
+            return 1
+        print(f"✅ {len(queries)}개 쿼리 모두 인덱스 사용 (제외 {len(INTENTIONAL_FULL_READS)}건)")
+        return 0
+    finally:
+        try:
+            await _drop_probe_indexes(client, PROBE_INDEXES)
+        finally:
+            await client.close()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,252 @@
+from typing import List, Dict, Any, Tuple
+import logging
+import re
+
+from app.db.neo4j_client import Neo4jClient
+
+logger = logging.getLogger(__name__)
+
+# (이름, DDL) - 모두 IF NOT EXISTS 로 멱등
+SCHEMA_STATEMENTS: List[Tuple[str, str]] = [
+    # Semantic / Kinetic Layer
+    ('object_type_name_unique',
+     "CREATE CONSTRAINT object_type_name_unique IF NOT EXISTS "
+     "FOR (n:ObjectType) REQUIRE n.name IS UNIQUE"),
+    ('command_name_aggregate_unique',
+     "CREATE CONSTRAINT command_name_aggregate_unique IF NOT EXISTS "
+     "FOR (n:Command) REQUIRE (n.name, n.aggregate) IS UNIQUE"),
+    ('command_name',
+     "CREATE INDEX command_name IF NOT EXISTS FOR (n:Command) ON (n.name)"),
+    ('event_type_name_aggregate_unique',
+     "CREATE CONSTRAINT event_type_name_aggregate_unique IF NOT EXISTS "
+     "FOR (n:EventType) REQUIRE (n.name, n.aggregate) IS UNIQUE"),
+    ('transformation_name_unique',
+     "CREATE CONSTRAINT transformation_name_unique IF NOT EXISTS "
+     "FOR (n:Transformation) REQUIRE n.name IS UNIQUE"),
+    ('transformation_trigger',
+     "CREATE INDEX transformation_trigger IF NOT EXISTS FOR (n:Transformation) ON (n.trigger)"),
+    # 버전 관리
+    ('project_version_id_unique',
+     "CREATE CONSTRAINT project_version_id_unique IF NOT EXISTS "
+     "FOR (n:ProjectVersion) REQUIRE n.id IS UNIQUE"),
+    # Dynamic Layer / 이벤트 로그 (DynamicInstance.id 는 ensure_instance_id_constraint)
+    ('domain_event_aggregate_id',
+     "CREATE INDEX domain_event_aggregate_id IF NOT EXISTS FOR (n:DomainEvent) ON (n.aggregate_id)"),
+    ('domain_event_aggregate_sequence_unique',
+     "CREATE CONSTRAINT domain_event_aggregate_sequence_unique IF NOT EXISTS "
+     "FOR (n:DomainEvent) REQUIRE (n.aggregate_id, n.sequence) IS UNIQUE"),
+    ('aggregate_snapshot_aggregate_sequence_unique',
+     "CREATE CONSTRAINT aggregate_snapshot_aggregate_sequence_unique IF NOT EXISTS "
+     "FOR (n:AggregateSnapshot) REQUIRE (n.aggregate_id, n.sequence) IS UNIQUE"),
+    ('domain_event_type',
+     "CREATE INDEX domain_event_type IF NOT EXISTS FOR (n:DomainEvent) ON (n.type)"),
+    ('domain_event_published',
+     "CREATE INDEX domain_event_published IF NOT EXISTS FOR (n:DomainEvent) ON (n.published)"),
+    # Read Model
+    ('read_model_name_unique',
+     "CREATE CONSTRAINT read_model_name_unique IF NOT EXISTS "
+     "FOR (n:ReadModel) REQUIRE n.name IS UNIQUE"),
+    # Policy (saga)
+    ('policy_name_unique',
+     "CREATE CONSTRAINT policy_name_unique IF NOT EXISTS "
+     "FOR (n:Policy) REQUIRE n.name IS UNIQUE"),
+    # LLM 분석 작업 (analysis_job_store=neo4j)
+    ('analysis_job_id_unique',
+     "CREATE CONSTRAINT analysis_job_id_unique IF NOT EXISTS "
+     "FOR (n:AnalysisJob) REQUIRE n.id IS UNIQUE"),
+    ('analysis_job_status',
+     "CREATE INDEX analysis_job_status IF NOT EXISTS FOR (n:AnalysisJob) ON (n.status)"),
+    ('analysis_job_finished_at',
+     "CREATE INDEX analysis_job_finished_at IF NOT EXISTS FOR (n:AnalysisJob) ON (n.finished_at)"),
+]
+
+# DynamicInstance.id: 유일성 제약조건 (중복 id 가 남아 있으면 range 인덱스로 대체)
+INSTANCE_ID_CONSTRAINT = 'dynamic_instance_id_unique'
+INSTANCE_ID_INDEX = 'dynamic_instance_id'
+
+INSTANCE_ID_CONSTRAINT_EXISTS_QUERY = f"""
+SHOW CONSTRAINTS YIELD name
+WHERE name = '{INSTANCE_ID_CONSTRAINT}'
+RETURN name
+"""
+
+DUPLICATE_INSTANCE_IDS_QUERY = """
+MATCH (n:DynamicInstance)
+WITH n.id AS id, count(*) AS copies
+WHERE copies > 1
+RETURN id, copies
+ORDER BY copies DESC
+LIMIT 10
+"""
+
+CREATE_INSTANCE_ID_CONSTRAINT = (
+    f"CREATE CONSTRAINT {INSTANCE_ID_CONSTRAINT} IF NOT EXISTS "
+    "FOR (n:DynamicInstance) REQUIRE n.id IS UNIQUE"
+)
+CREATE_INSTANCE_ID_INDEX = (
+    f"CREATE INDEX {INSTANCE_ID_INDEX} IF NOT EXISTS FOR (n:DynamicInstance) ON (n.id)"
+)
+# 같은 속성에 range 인덱스가 있으면 유일성 제약조건을 만들 수 없다
+DROP_INSTANCE_ID_INDEX = f"DROP INDEX {INSTANCE_ID_INDEX} IF EXISTS"
+
+# Aggregate 이름 규칙 (라벨로 DDL/쿼리에 삽입되므로 검증)
+TYPE_NAME_PATTERN = re.compile(r"^[A-Z][a-zA-Z0-9]*$")
+
+# 인스턴스 속성 인덱스를 만들 수 있는 필드 이름
+FIELD_NAME_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+# 인덱스 없이 전체를 훑는 실행 계획 연산자
+SCAN_OPERATORS = {'AllNodesScan', 'NodeByLabelScan'}
+
+
+class QueryPlanError(Exception):
+    """핫 쿼리가 전체 스캔을 수행하는 경우"""
+
+    def __init__(self, violations: Dict[str, List[str]]):
+        self.violations = violations
+        details = ", ".join(f"{name}: {'/'.join(ops)}" for name, ops in violations.items())
+        super().__init__(f"전체 스캔 쿼리 발견 - {details}")
+
+
+async def bootstrap_schema(neo4j: Neo4jClient) -> Dict[str, Any]:
+    """제약조건/인덱스를 멱등하게 생성하고 생성 결과 보고
+
+    이미 중복 데이터가 있어 제약조건 생성이 실패하면 나머지는 계속 진행한다.
+    """
+    report: Dict[str, Any] = {'created': [], 'existing': [], 'failed': {}}
+
+    for name, statement in SCHEMA_STATEMENTS:
+        try:
+            async with neo4j.transaction() as tx:
+                result = await tx.run(statement)
+                summary = await result.consume()
+            counters = summary.counters
+            if counters.constraints_added or counters.indexes_added:
+                report['created'].append(name)
+            else:
+                report['existing'].append(name)
+        except Exception as e:
+            logger.error(f"스키마 생성 실패 ({name}): {e}")
+            report['failed'][name] = str(e)
+
+    try:
+        await ensure_instance_id_constraint(neo4j, report)
+    except Exception as e:
+        logger.error(f"스키마 생성 실패 ({INSTANCE_ID_CONSTRAINT}): {e}")
+        report['failed'][INSTANCE_ID_CONSTRAINT] = str(e)
+
+    logger.info(
+        f"스키마 부트스트랩: 생성 {len(report['created'])}, "
+        f"기존 {len(report['existing'])}, 실패 {len(report['failed'])}"
+    )
+    return report
+
+
+async def _run_ddl(neo4j: Neo4jClient, statement: str):
+    async with neo4j.transaction() as tx:
+        result = await tx.run(statement)
+        return await result.consume()
+
+
+async def ensure_instance_id_constraint(neo4j: Neo4jClient, report: Dict[str, Any]):
+    """DynamicInstance.id 유일성 제약조건 (id 조회는 어느 경우든 인덱스를 탄다)
+
+    예전 CREATE 경로로 생긴 중복 id 가 있으면 제약조건을 만들 수 없으므로
+    range 인덱스를 유지하고 중복 id 를 report['failed'] 에 남긴다.
+    중복이 없으면 range 인덱스를 지우고 제약조건을 만들며, 실패하면 인덱스를 되살린다.
+    """
+    if await neo4j.execute(INSTANCE_ID_CONSTRAINT_EXISTS_QUERY):
+        report['existing'].append(INSTANCE_ID_CONSTRAINT)
+        return
+
+    duplicates = await neo4j.execute(DUPLICATE_INSTANCE_IDS_QUERY)
+    if duplicates:
+        summary = await _run_ddl(neo4j, CREATE_INSTANCE_ID_INDEX)
+        report['created' if summary.counters.indexes_added else 'existing'].append(INSTANCE_ID_INDEX)
+        details = ", ".join(f"{d['id']} x{d['copies']}" for d in duplicates)
+        logger.error(f"DynamicInstance id 중복으로 유일성 제약조건 생략: {details}")
+        report['failed'][INSTANCE_ID_CONSTRAINT] = f"duplicate DynamicInstance ids: {details}"
+        return
+
+    await _run_ddl(neo4j, DROP_INSTANCE_ID_INDEX)
+    try:
+        await _run_ddl(neo4j, CREATE_INSTANCE_ID_CONSTRAINT)
+    except Exception:
+        await _run_ddl(neo4j, CREATE_INSTANCE_ID_INDEX)
+        raise
+    report['created'].append(INSTANCE_ID_CONSTRAINT)
+
+
+async def ensure_instance_indexes(
+    neo4j: Neo4jClient,
+    type_name: str,
+    filterable: List[str]
+) -> List[str]:
+    """Aggregate 타입별 인스턴스 인덱스 생성, 새로 만든 인덱스 이름 반환
+
+    (created_at, id) 복합 인덱스는 keyset 페이지네이션 정렬을,
+    filterable 필드 인덱스는 조회 필터/정렬을 받친다.
+    인덱스 하나가 실패해도 나머지는 계속 만든다 (온톨로지 빌드를 중단하지 않음).
+    """
+    if not TYPE_NAME_PATTERN.match(type_name):
+        logger.warning(f"인덱스 생략 - Aggregate 이름 규칙 위반: {type_name!r}")
+        return []
+    statements = [(
+        f"instance_{type_name}_keyset",
+        f"CREATE INDEX instance_{type_name}_keyset IF NOT EXISTS "
+        f"FOR (n:`{type_name}`) ON (n.created_at, n.id)"
+    )]
+    for field in filterable:
+        if not FIELD_NAME_PATTERN.match(field):
+            logger.warning(f"인덱스 생략 - 필드 이름 규칙 위반: {type_name}.{field}")
+            continue
+        statements.append((
+            f"instance_{type_name}_{field}",
+            f"CREATE INDEX instance_{type_name}_{field} IF NOT EXISTS "
+            f"FOR (n:`{type_name}`) ON (n.`{field}`)"
+        ))
+
+    created = []
+    for name, statement in statements:
+        try:
+            async with neo4j.transaction() as tx:
+                result = await tx.run(statement)
+                summary = await result.consume()
+        except Exception as e:
+            logger.error(f"인스턴스 인덱스 생성 실패 ({name}): {e}")
+            continue
+        if summary.counters.indexes_added:
+            created.append(name)
+    return created
+
+
+def find_scans(plan: Dict[str, Any]) -> List[str]:
+    """실행 계획 트리에서 전체 스캔 연산자 수집"""
+    found = []
+    operator = plan.get('operatorType', '').split('@')[0]
+    if operator in SCAN_OPERATORS:
+        found.append(operator)
+    for child in plan.get('children', []):
+        found.extend(find_scans(child))
+    return found
+
+
+async def check_query_plans(
+    neo4j: Neo4jClient,
+    queries: Dict[str, str]
+) -> Dict[str, List[str]]:
+    """EXPLAIN 으로 각 쿼리의 실행 계획을 검사, 전체 스캔이 있으면 QueryPlanError"""
+    violations: Dict[str, List[str]] = {}
+
+    for name, query in queries.items():
+        # EXPLAIN 은 실행하지 않으므로 파라미터 값 없이 계획만 얻는다
+        async with neo4j.transaction() as tx:
+            result = await tx.run(f"EXPLAIN {query}")
+            summary = await result.consume()
+        scans = find_scans(summary.plan or {})
+        if scans:
+            violations[name] = scans
+
+    if violations:
+        raise QueryPlanError(violations)
+    return violations
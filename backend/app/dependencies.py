@@ -1,7 +1,55 @@
 from app.db.neo4j_client import Neo4jClient
+from app.services.command_registry import CommandRegistry
+from app.services.snapshot_service import SnapshotService
+from app.services.event_pipeline import EventPipeline
+from app.services.projection_engine import ProjectionEngine
+from app.services.rule_engine import RuleEngine
+from app.services.saga_dispatcher import SagaDispatcher
+from app.services.transformation_engine import TransformationEngine
+from app.services.outbox import OutboxRelay
+from app.services.event_feed import EventFeed
+from app.services.llm_cache import LLMCache
+from app.services.llm_service import LLMService
+from app.services.analysis_jobs import AnalysisJobQueue
 
 # Neo4j 클라이언트 전역 인스턴스
 neo4j_client: Neo4jClient = None
 
+# Command → Aggregate 매핑 캐시 (시작 시 / 온톨로지 빌드 후 로드)
+command_registry: CommandRegistry = CommandRegistry()
+
+# Aggregate 스냅샷 / 재수화 (lifespan 에서 생성)
+snapshot_service: SnapshotService = None
+
+# 커밋된 DomainEvent 구독자 (Read Model 프로젝션 등)
+event_pipeline: EventPipeline = EventPipeline()
+
+# Read Model 물질화 (lifespan 에서 생성)
+projection_engine: ProjectionEngine = None
+
+# when 이벤트별로 인덱싱된 룰 (시작 시 rules_dir 에서 로드)
+rule_engine: RuleEngine = RuleEngine()
+
+# Policy → Command 비동기 실행 (lifespan 에서 생성)
+saga_dispatcher: SagaDispatcher = None
+
+# Kinetic Layer Transformation 실행 (lifespan 에서 생성)
+transformation_engine: TransformationEngine = None
+
+# DomainEvent → Kafka 아웃박스 릴레이 (outbox_enabled 일 때 lifespan 에서 생성)
+outbox_relay: OutboxRelay = None
+
+# 실시간 이벤트 피드 fan-out (lifespan 에서 생성)
+event_feed: EventFeed = None
+
+# LLM 응답 캐시 (llm_cache_backend 가 none 이 아니면 lifespan 에서 생성)
+llm_cache: LLMCache = None
+
+# 공용 LLM 클라이언트 풀을 쓰는 분석 서비스 (lifespan 에서 생성)
+llm_service: LLMService = None
+
+# 백그라운드 LLM 분석 작업 (lifespan 에서 생성)
+analysis_jobs: AnalysisJobQueue = None
+
 def get_neo4j_client() -> Neo4jClient:
     return neo4j_client
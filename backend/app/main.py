@@ -4,6 +4,17 @@ from contextlib import asynccontextmanager
 
 from app.config import settings
 from app.db.neo4j_client import Neo4jClient
+from app.db.schema import bootstrap_schema
+from app.services.snapshot_service import SnapshotService
+from app.services.projection_engine import ProjectionEngine
+from app.services.saga_dispatcher import SagaDispatcher
+from app.services.transformation_engine import TransformationEngine
+from app.services.outbox import OutboxRelay, KafkaPublisher, InMemoryBroker
+from app.services.event_feed import EventFeed
+from app.services.llm_cache import LLMCache, MemoryCacheBackend, DiskCacheBackend
+from app.services.llm_pool import LLMClientPool
+from app.services.llm_service import LLMService
+from app.services.analysis_jobs import AnalysisJobQueue, MemoryJobStore, Neo4jJobStore
 import app.dependencies as deps
 
 @asynccontextmanager
@@ -12,23 +23,116 @@ async def lifespan(app: FastAPI):
     deps.neo4j_client = Neo4jClient(
         uri=settings.neo4j_uri,
         user=settings.neo4j_user,
-        password=settings.neo4j_password
+        password=settings.neo4j_password,
+        database=settings.neo4j_database,
+        max_connection_pool_size=settings.neo4j_max_connection_pool_size,
+        connection_acquisition_timeout=settings.neo4j_connection_acquisition_timeout,
+        max_connection_lifetime=settings.neo4j_max_connection_lifetime,
+        fetch_size=settings.neo4j_fetch_size,
+        max_transaction_retry_time=settings.neo4j_max_transaction_retry_time,
+        causal_consistency=settings.neo4j_causal_consistency
     )
+    deps.snapshot_service = SnapshotService(deps.neo4j_client, settings.snapshot_frequency)
+    deps.projection_engine = ProjectionEngine(deps.neo4j_client)
+    deps.event_pipeline.subscribe("projections", deps.projection_engine.handle)
+    deps.transformation_engine = TransformationEngine(deps.neo4j_client)
+    deps.event_pipeline.subscribe("transformations", deps.transformation_engine.handle)
+    deps.event_feed = EventFeed(settings.feed_buffer_size)
+    deps.event_pipeline.subscribe("feed", deps.event_feed.handle)
+    deps.rule_engine.load_directory(settings.rules_dir)
+    if settings.llm_cache_backend == "disk":
+        deps.llm_cache = LLMCache(DiskCacheBackend(settings.llm_cache_dir, settings.llm_cache_ttl))
+    elif settings.llm_cache_backend == "memory":
+        deps.llm_cache = LLMCache(
+            MemoryCacheBackend(settings.llm_cache_max_entries, settings.llm_cache_ttl)
+        )
+    llm_pool = LLMClientPool(
+        settings.llm_provider,
+        settings.openai_api_key if settings.llm_provider == "openai" else settings.anthropic_api_key,
+        http2=settings.llm_http2,
+        max_connections=settings.llm_max_connections,
+        max_keepalive_connections=settings.llm_max_keepalive_connections,
+        keepalive_expiry=settings.llm_keepalive_expiry,
+        connect_timeout=settings.llm_connect_timeout,
+        timeout=settings.llm_timeout,
+        max_concurrency=settings.llm_max_concurrency,
+        queue_timeout=settings.llm_queue_timeout
+    )
+    llm_pool.start()
+    deps.llm_service = LLMService(llm_pool, cache=deps.llm_cache)
+    deps.analysis_jobs = AnalysisJobQueue(
+        Neo4jJobStore(deps.neo4j_client) if settings.analysis_job_store == "neo4j" else MemoryJobStore(),
+        event_storm_routes.run_job,
+        workers=settings.analysis_job_workers,
+        max_pending=settings.analysis_job_max_pending,
+        max_pending_per_tenant=settings.analysis_job_max_pending_per_tenant,
+        result_ttl=settings.analysis_job_result_ttl,
+        lease_ttl=settings.analysis_job_lease_ttl
+    )
+    deps.saga_dispatcher = SagaDispatcher(
+        deps.neo4j_client,
+        deps.command_registry,
+        command_routes.run_command,
+        workers=settings.saga_workers,
+        queue_size=settings.saga_queue_size,
+        max_retries=settings.saga_max_retries,
+        retry_backoff=settings.saga_retry_backoff,
+        max_depth=settings.saga_max_depth,
+        dead_letter_size=settings.saga_dead_letter_size
+    )
+    deps.event_pipeline.subscribe("sagas", deps.saga_dispatcher.handle)
+    if settings.outbox_enabled:
+        if settings.outbox_broker == "memory":
+            publisher = InMemoryBroker(settings.outbox_topic)
+        else:
+            publisher = KafkaPublisher(
+                settings.kafka_bootstrap_servers,
+                settings.outbox_topic,
+                compression_type=settings.kafka_compression_type,
+                linger_ms=settings.kafka_linger_ms,
+                max_batch_size=settings.kafka_max_batch_size
+            )
+        deps.outbox_relay = OutboxRelay(
+            deps.neo4j_client,
+            publisher,
+            batch_size=settings.outbox_batch_size,
+            poll_interval=settings.outbox_poll_interval
+        )
+        deps.event_pipeline.subscribe("outbox", deps.outbox_relay.handle)
     try:
         await deps.neo4j_client.connect()
         print("✅ Neo4j 연결 성공")
+        schema_report = await bootstrap_schema(deps.neo4j_client)
+        print(
+            f"✅ 스키마 부트스트랩: 생성 {schema_report['created'] or '없음'}, "
+            f"실패 {list(schema_report['failed']) or '없음'}"
+        )
+        await deps.command_registry.load(deps.neo4j_client)
+        await deps.projection_engine.load()
+        await deps.saga_dispatcher.load()
+        await deps.transformation_engine.load()
     except Exception as e:
         print(f"⚠️ Neo4j 연결 실패 (서버는 계속 실행됩니다): {e}")
 
+    deps.saga_dispatcher.start()
+    if deps.outbox_relay:
+        deps.outbox_relay.start()
+    await deps.analysis_jobs.start()
+
     yield
 
     # 종료 시
+    await deps.analysis_jobs.stop()
+    await deps.llm_service.pool.close()
+    await deps.saga_dispatcher.stop()
+    if deps.outbox_relay:
+        await deps.outbox_relay.stop()
     if deps.neo4j_client and deps.neo4j_client.driver:
         await deps.neo4j_client.close()
         print("👋 Neo4j 연결 종료")
 
 # Import routes after dependencies are set up to avoid circular imports
-from app.api import event_storm_routes, ontology_routes, command_routes, query_routes, version_routes
+from app.api import event_storm_routes, ontology_routes, command_routes, query_routes, version_routes, read_model_routes, saga_routes, feed_routes, job_routes
 
 app = FastAPI(
     title="Business OS API",
@@ -52,6 +156,10 @@ app.include_router(ontology_routes.router, prefix="/api/ontology", tags=["Ontolo
 app.include_router(command_routes.router, prefix="/api/commands", tags=["Commands"])
 app.include_router(query_routes.router, prefix="/api/queries", tags=["Queries"])
 app.include_router(version_routes.router, prefix="/api/versions", tags=["Versions"])
+app.include_router(read_model_routes.router, prefix="/api/read-models", tags=["Read Models"])
+app.include_router(saga_routes.router, prefix="/api/sagas", tags=["Sagas"])
+app.include_router(feed_routes.router, prefix="/api/feed", tags=["Event Feed"])
+app.include_router(job_routes.router, prefix="/api/jobs", tags=["Analysis Jobs"])
 
 @app.get("/")
 async def root():
@@ -65,5 +173,6 @@ async def root():
 async def health_check():
     return {
         "status": "healthy",
-        "neo4j": await deps.neo4j_client.health_check() if deps.neo4j_client else False
+        "neo4j": await deps.neo4j_client.health_check() if deps.neo4j_client else False,
+        "neo4j_pool": deps.neo4j_client.pool_stats() if deps.neo4j_client else None
     }
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, field_validator
-from typing import List, Dict, Any, Optional, Union
+from typing import List, Dict, Any, Literal, Optional, Union
 
 class Command(BaseModel):
     """도메인 명령"""
@@ -34,6 +34,7 @@ class Aggregate(BaseModel):
     events: List[Event]
     state: Dict[str, str]  # field_name: type
     invariants: List[str] = []
+    filterable: List[str] = []  # 인스턴스 조회 필터/정렬용 인덱스를 만들 상태 필드
     
 class Policy(BaseModel):
     """비즈니스 정책 (Saga)"""
@@ -44,7 +45,7 @@ class Policy(BaseModel):
 
 class ReadModel(BaseModel):
     """읽기 모델 (CQRS)"""
-    name: str
+    name: str = Field(..., pattern="^[A-Za-z][a-zA-Z0-9_]*$")  # '_' 시작은 조회 API 예약 (/_metrics)
     source_events: List[str]
     projections: Dict[str, str]
 
@@ -55,6 +56,18 @@ class EventStormResult(BaseModel):
     read_models: List[ReadModel] = []
     version: str = "1.0.0"
 
+class PatchOperation(BaseModel):
+    """이벤트 스토밍 결과 변경 한 건 (delta refine)"""
+    op: Literal["add", "remove", "modify"]
+    target: Literal["aggregate", "command", "event", "policy", "read_model"]
+    name: str
+    aggregate: Optional[str] = None  # command / event 가 속한 Aggregate
+    value: Dict[str, Any] = {}  # add: 전체 정의, modify: 바꿀 필드만
+
+class EventStormPatch(BaseModel):
+    """LLM 이 돌려주는 변경 목록"""
+    operations: List[PatchOperation] = []
+
 class AnalyzeRequest(BaseModel):
     """이벤트 스토밍 분석 요청"""
     description: str = Field(..., min_length=10)
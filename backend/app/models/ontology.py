@@ -16,6 +16,7 @@ class PropertyDef(BaseModel):
     minimum: Optional[float] = None
     maximum: Optional[float] = None
     pattern: Optional[str] = None
+    filterable: bool = False  # 인스턴스 조회 필터/정렬 대상 (속성 인덱스 생성)
 
 class ObjectType(BaseModel):
     """Semantic Layer: 객체 타입 정의"""
@@ -0,0 +1,520 @@
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set
+from collections import deque
+import asyncio
+import json
+import logging
+import os
+import socket
+import time
+import uuid
+
+from app.db.neo4j_client import Neo4jClient
+
+logger = logging.getLogger(__name__)
+
+# (kind, params) → 결과 dict
+JobRunner = Callable[[str, Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = {SUCCEEDED, FAILED, CANCELLED}
+
+SAVE_JOB_QUERY = """
+MERGE (j:AnalysisJob {id: $job.id})
+SET j += $job
+"""
+
+GET_JOB_QUERY = """
+MATCH (j:AnalysisJob {id: $id})
+RETURN j
+"""
+
+# 임대(lease)가 만료된 미완료 작업만 가져온다 (살아 있는 다른 프로세스의 작업은 건드리지 않음)
+# 쓰기 락을 잡은 뒤(_lock SET/REMOVE) 임대를 다시 확인하므로 동시에 시작한 프로세스 중 하나만 가져간다
+CLAIM_EXPIRED_JOBS_QUERY = """
+MATCH (j:AnalysisJob)
+WHERE j.status IN ['queued', 'running'] AND coalesce(j.lease_until, 0) < $now
+SET j._lock = true
+REMOVE j._lock
+WITH j
+WHERE j.status IN ['queued', 'running'] AND coalesce(j.lease_until, 0) < $now
+SET j.owner = $owner, j.lease_until = $lease_until
+RETURN j
+ORDER BY j.created_at ASC
+"""
+
+# 하트비트: 아직 이 프로세스가 소유한 작업의 임대 연장
+RENEW_JOB_LEASES_QUERY = """
+UNWIND $ids AS id
+MATCH (j:AnalysisJob {id: id})
+WHERE j.owner = $owner
+SET j.lease_until = $lease_until
+RETURN j.id AS id
+"""
+
+PURGE_JOBS_QUERY = """
+MATCH (j:AnalysisJob)
+WHERE j.finished_at < $before
+DETACH DELETE j
+"""
+
+
+class JobRejected(RuntimeError):
+    """큐 또는 테넌트 대기 한도 초과"""
+
+
+class AnalysisJob:
+    """LLM 분석/개선 작업 하나"""
+
+    def __init__(
+        self,
+        kind: str,
+        tenant: str,
+        params: Dict[str, Any],
+        job_id: Optional[str] = None,
+        created_at: Optional[float] = None
+    ):
+        self.id = job_id or str(uuid.uuid4())
+        self.kind = kind
+        self.tenant = tenant
+        self.params = params
+        self.status = QUEUED
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created_at = created_at or time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        # 작업을 맡은 프로세스와 임대 만료 시각 (하트비트로 연장, 끝나면 해제)
+        self.owner: Optional[str] = None
+        self.lease_until: Optional[float] = None
+
+    def to_record(self) -> Dict[str, Any]:
+        """저장소 행 (Neo4j 속성은 원시 타입만)"""
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'tenant': self.tenant,
+            'status': self.status,
+            'params_json': json.dumps(self.params, default=str),
+            'result_json': json.dumps(self.result, default=str) if self.result is not None else None,
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'owner': self.owner,
+            'lease_until': self.lease_until
+        }
+
+    @classmethod
+    def from_record(cls, record: Dict[str, Any]) -> "AnalysisJob":
+        job = cls(
+            record['kind'],
+            record['tenant'],
+            json.loads(record['params_json']),
+            job_id=record['id'],
+            created_at=record['created_at']
+        )
+        job.status = record['status']
+        job.result = json.loads(record['result_json']) if record.get('result_json') else None
+        job.error = record.get('error')
+        job.started_at = record.get('started_at')
+        job.finished_at = record.get('finished_at')
+        job.owner = record.get('owner')
+        job.lease_until = record.get('lease_until')
+        return job
+
+    def to_dict(self, include_result: bool = True) -> Dict[str, Any]:
+        data = {
+            'id': self.id,
+            'kind': self.kind,
+            'tenant': self.tenant,
+            'status': self.status,
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at
+        }
+        if include_result:
+            data['result'] = self.result
+        return data
+
+
+class MemoryJobStore:
+    """프로세스 내 저장소 (재시작하면 사라진다)"""
+
+    def __init__(self):
+        self._jobs: Dict[str, AnalysisJob] = {}
+
+    async def save(self, job: AnalysisJob):
+        # 같은 프로세스이므로 직렬화 사본 없이 작업 객체를 그대로 보관
+        self._jobs[job.id] = job
+
+    async def get(self, job_id: str) -> Optional[AnalysisJob]:
+        return self._jobs.get(job_id)
+
+    async def claim_expired(self, owner: str, lease_until: float) -> List[AnalysisJob]:
+        return []
+
+    async def renew(self, owner: str, job_ids: List[str], lease_until: float) -> Set[str]:
+        return set(job_ids)
+
+    async def purge(self, before: float):
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished_at is not None and job.finished_at < before
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+class Neo4jJobStore:
+    """AnalysisJob 노드 저장소
+
+    대기/실행 중인 작업은 소유 프로세스의 임대가 만료된 것만 다른(재시작한) 프로세스가 다시 큐에 넣는다.
+    """
+
+    def __init__(self, neo4j: Neo4jClient):
+        self.neo4j = neo4j
+
+    async def save(self, job: AnalysisJob):
+        await self.neo4j.execute_write(SAVE_JOB_QUERY, {'job': job.to_record()})
+
+    async def get(self, job_id: str) -> Optional[AnalysisJob]:
+        records = await self.neo4j.execute(GET_JOB_QUERY, {'id': job_id})
+        return AnalysisJob.from_record(records[0]['j']) if records else None
+
+    async def claim_expired(self, owner: str, lease_until: float) -> List[AnalysisJob]:
+        records = await self.neo4j.execute_write(CLAIM_EXPIRED_JOBS_QUERY, {
+            'owner': owner, 'lease_until': lease_until, 'now': time.time()
+        })
+        return [AnalysisJob.from_record(r['j']) for r in records]
+
+    async def renew(self, owner: str, job_ids: List[str], lease_until: float) -> Set[str]:
+        records = await self.neo4j.execute_write(RENEW_JOB_LEASES_QUERY, {
+            'ids': job_ids, 'owner': owner, 'lease_until': lease_until
+        })
+        return {r['id'] for r in records}
+
+    async def purge(self, before: float):
+        await self.neo4j.execute_write(PURGE_JOBS_QUERY, {'before': before})
+
+
+class JobMetrics:
+    def __init__(self):
+        self.submitted = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.rejected = 0
+        self.total_wait_ms = 0.0
+        self.total_run_ms = 0.0
+        self.started = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        finished = self.succeeded + self.failed
+        return {
+            'submitted': self.submitted,
+            'succeeded': self.succeeded,
+            'failed': self.failed,
+            'cancelled': self.cancelled,
+            'rejected': self.rejected,
+            'avg_queue_wait_ms': round(self.total_wait_ms / self.started, 2) if self.started else None,
+            'avg_run_ms': round(self.total_run_ms / finished, 2) if finished else None
+        }
+
+
+class AnalysisJobQueue:
+    """LLM 분석 작업 큐 (HTTP 요청은 작업 id 만 받고 바로 반환)
+
+    테넌트별 FIFO 큐를 라운드 로빈으로 꺼내므로 한 테넌트가 작업을 몰아 넣어도
+    다른 테넌트의 작업이 그 뒤에 줄 서지 않는다. 워커 수(workers)가 동시 LLM 작업 수의 상한이다.
+    대기 중인 작업은 큐에서 빼고, 실행 중인 작업은 태스크를 취소해 끝날 때까지 기다린다.
+    끝난 작업은 result_ttl 동안 조회할 수 있다.
+    미완료 작업은 lease_ttl 짜리 임대를 lease_ttl/3 마다 연장하므로, 여러 프로세스가 같은
+    저장소를 써도 시작 시에는 소유 프로세스가 죽어 임대가 만료된 작업만 다시 실행한다.
+    """
+
+    def __init__(
+        self,
+        store,
+        runner: JobRunner,
+        workers: int = 4,
+        max_pending: int = 1000,
+        max_pending_per_tenant: int = 100,
+        result_ttl: float = 3600.0,
+        lease_ttl: float = 60.0
+    ):
+        self.store = store
+        self.runner = runner
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_pending_per_tenant = max_pending_per_tenant
+        self.result_ttl = result_ttl
+        self.lease_ttl = lease_ttl
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.metrics = JobMetrics()
+        self._jobs: Dict[str, AnalysisJob] = {}  # 대기/실행 중 + 보존 기간 안의 끝난 작업
+        self._pending: Dict[str, Deque[AnalysisJob]] = {}  # 테넌트 → 대기 작업
+        self._ready: Deque[str] = deque()  # 대기 작업이 있는 테넌트 (라운드 로빈 순서)
+        self._available = asyncio.Semaphore(0)
+        self._running: Dict[str, asyncio.Task] = {}
+        self._watchers: Dict[str, Set[asyncio.Queue]] = {}
+        self._workers: List[asyncio.Task] = []
+        self._janitor: Optional[asyncio.Task] = None
+        self._heartbeat: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    @property
+    def pending_count(self) -> int:
+        return sum(len(jobs) for jobs in self._pending.values())
+
+    async def start(self):
+        """워커 시작, 영속 저장소면 임대가 만료된 미완료 작업을 가져와 다시 큐에 넣는다"""
+        try:
+            for job in await self.store.claim_expired(self.owner, self._lease_until()):
+                job.status = QUEUED
+                job.started_at = None
+                self._jobs[job.id] = job
+                self._push(job)
+        except Exception as e:
+            logger.error(f"분석 작업 복구 실패: {e}")
+        for i in range(self.workers):
+            self._workers.append(asyncio.create_task(self._work(), name=f"analysis-job-worker-{i}"))
+        self._janitor = asyncio.create_task(self._purge_loop(), name="analysis-job-janitor")
+        self._heartbeat = asyncio.create_task(self._heartbeat_loop(), name="analysis-job-heartbeat")
+
+    async def stop(self):
+        # 종료로 끊긴 작업은 취소로 기록하지 않는다 (영속 저장소면 다음 시작 때 다시 실행)
+        self._stopping = True
+        tasks = self._workers + list(self._running.values())
+        for task in (self._janitor, self._heartbeat):
+            if task:
+                tasks.append(task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+        self._running = {}
+        self._janitor = None
+        self._heartbeat = None
+        self._stopping = False
+
+    async def submit(self, kind: str, tenant: str, params: Dict[str, Any]) -> AnalysisJob:
+        if self.pending_count >= self.max_pending:
+            self.metrics.rejected += 1
+            raise JobRejected(f"Job queue is full ({self.max_pending})")
+        if len(self._pending.get(tenant, ())) >= self.max_pending_per_tenant:
+            self.metrics.rejected += 1
+            raise JobRejected(f"Tenant '{tenant}' has too many pending jobs ({self.max_pending_per_tenant})")
+        job = AnalysisJob(kind, tenant, params)
+        job.owner = self.owner
+        job.lease_until = self._lease_until()
+        self._jobs[job.id] = job
+        self._push(job)
+        self.metrics.submitted += 1
+        await self._save(job)
+        return job
+
+    def _push(self, job: AnalysisJob):
+        queue = self._pending.setdefault(job.tenant, deque())
+        if not queue:
+            self._ready.append(job.tenant)
+        queue.append(job)
+        self._available.release()
+
+    def _pop(self) -> Optional[AnalysisJob]:
+        """다음 테넌트의 가장 오래된 작업 (그 테넌트는 아직 남아 있으면 맨 뒤로)"""
+        while self._ready:
+            tenant = self._ready.popleft()
+            queue = self._pending.get(tenant)
+            if not queue:
+                self._pending.pop(tenant, None)
+                continue
+            job = queue.popleft()
+            if queue:
+                self._ready.append(tenant)
+            else:
+                del self._pending[tenant]
+            return job
+        return None
+
+    async def get(self, job_id: str) -> Optional[AnalysisJob]:
+        job = self._jobs.get(job_id)
+        if job is None:
+            job = await self.store.get(job_id)
+        return job
+
+    async def cancel(self, job_id: str) -> Optional[AnalysisJob]:
+        """대기 중이면 큐에서 빼고, 실행 중이면 태스크를 취소하고 끝날 때까지 기다린다
+
+        반환한 작업은 끝난 상태다 (취소 직전에 끝났으면 그 결과 그대로).
+        다른 프로세스가 실행 중인 작업은 건드리지 않는다.
+        """
+        job = await self.get(job_id)
+        if job is None or job.status in FINISHED:
+            return job
+        if self._dequeue(job):
+            await self._finish(job, CANCELLED)
+            return job
+        task = self._running.get(job.id)
+        if task:
+            task.cancel()
+            # 작업 취소가 호출자로 번지지 않도록 완료만 기다린다
+            await asyncio.wait({task})
+            if job.status not in FINISHED:
+                # 워커가 꺼냈지만 시작하기 전에 취소된 태스크
+                await self._finish(job, CANCELLED)
+        return job
+
+    def _dequeue(self, job: AnalysisJob) -> bool:
+        """대기 큐에서 작업 제거, 테넌트 큐가 비면 라운드 로빈 순서에서도 뺀다"""
+        queue = self._pending.get(job.tenant)
+        if not queue or job not in queue:
+            return False
+        queue.remove(job)
+        if not queue:
+            del self._pending[job.tenant]
+            self._ready.remove(job.tenant)
+        return True
+
+    async def _work(self):
+        while True:
+            await self._available.acquire()
+            job = self._pop()
+            if job is None:
+                # 취소로 이미 빠진 작업
+                continue
+            task = asyncio.create_task(self._execute(job), name=f"analysis-job-{job.id}")
+            self._running[job.id] = task
+            try:
+                # 작업 취소가 워커로 번지지 않도록 태스크 완료만 기다린다
+                await asyncio.wait({task})
+            finally:
+                self._running.pop(job.id, None)
+
+    async def _execute(self, job: AnalysisJob):
+        job.status = RUNNING
+        job.started_at = time.time()
+        self.metrics.started += 1
+        self.metrics.total_wait_ms += (job.started_at - job.created_at) * 1000
+        await self._save(job)
+        try:
+            result = await self.runner(job.kind, job.params)
+        except asyncio.CancelledError:
+            if self._stopping:
+                raise
+            await self._finish(job, CANCELLED)
+            return
+        except Exception as e:
+            logger.error(f"분석 작업 실패 ({job.id}): {e}")
+            await self._finish(job, FAILED, error=str(e))
+            return
+        await self._finish(job, SUCCEEDED, result=result)
+
+    async def _finish(
+        self,
+        job: AnalysisJob,
+        status: str,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None
+    ):
+        job.status = status
+        job.result = result
+        job.error = error
+        job.finished_at = time.time()
+        job.lease_until = None
+        if status == SUCCEEDED:
+            self.metrics.succeeded += 1
+        elif status == FAILED:
+            self.metrics.failed += 1
+        else:
+            self.metrics.cancelled += 1
+        if job.started_at and status != CANCELLED:
+            self.metrics.total_run_ms += (job.finished_at - job.started_at) * 1000
+        await self._save(job)
+
+    async def _save(self, job: AnalysisJob):
+        """저장 후 구독자에게 상태 전달 (저장소 장애는 작업을 멈추지 않는다)"""
+        try:
+            await self.store.save(job)
+        except Exception as e:
+            logger.error(f"분석 작업 저장 실패 ({job.id}): {e}")
+        snapshot = job.to_dict(include_result=job.status in FINISHED)
+        for queue in self._watchers.get(job.id, ()):
+            queue.put_nowait(snapshot)
+
+    def watch(self, job_id: str) -> asyncio.Queue:
+        """상태 변경 구독 (끝난 상태까지 받고 unwatch)"""
+        queue: asyncio.Queue = asyncio.Queue()
+        self._watchers.setdefault(job_id, set()).add(queue)
+        return queue
+
+    def unwatch(self, job_id: str, queue: asyncio.Queue):
+        watchers = self._watchers.get(job_id)
+        if watchers:
+            watchers.discard(queue)
+            if not watchers:
+                del self._watchers[job_id]
+
+    async def purge_expired(self):
+        before = time.time() - self.result_ttl
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished_at is not None and job.finished_at < before
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+        await self.store.purge(before)
+
+    def _lease_until(self) -> float:
+        return time.time() + self.lease_ttl
+
+    async def renew_leases(self):
+        """이 프로세스의 미완료 작업 임대 연장
+
+        다른 프로세스에 임대를 빼앗긴(연장이 지연돼 만료된) 대기 작업은 여기서 실행하지 않는다.
+        """
+        owned = [job for job in self._jobs.values() if job.status not in FINISHED]
+        if not owned:
+            return
+        lease_until = self._lease_until()
+        renewed = await self.store.renew(self.owner, [job.id for job in owned], lease_until)
+        for job in owned:
+            if job.id in renewed:
+                job.lease_until = lease_until
+            elif self._dequeue(job):
+                logger.warning(f"분석 작업 임대 상실, 대기열에서 제외 ({job.id})")
+                del self._jobs[job.id]
+            elif job.status not in FINISHED:
+                logger.warning(f"분석 작업 임대 상실, 실행은 계속 ({job.id})")
+
+    async def _heartbeat_loop(self):
+        interval = self.lease_ttl / 3
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.renew_leases()
+            except Exception as e:
+                logger.error(f"분석 작업 임대 연장 실패: {e}")
+
+    async def _purge_loop(self):
+        interval = min(self.result_ttl, 60.0)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.purge_expired()
+            except Exception as e:
+                logger.error(f"분석 작업 정리 실패: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'workers': len(self._workers),
+            'pending': self.pending_count,
+            'pending_by_tenant': {tenant: len(jobs) for tenant, jobs in self._pending.items()},
+            'running': len(self._running),
+            'retained': len(self._jobs),
+            **self.metrics.snapshot()
+        }
@@ -0,0 +1,130 @@
+from typing import Dict, List, Optional
+import logging
+import re
+import time
+
+from app.db.neo4j_client import Neo4jClient
+
+logger = logging.getLogger(__name__)
+
+LOAD_COMMANDS_QUERY = """
+MATCH (ot:ObjectType)-[:HAS_COMMAND]->(cmd:Command)
+OPTIONAL MATCH (ot)-[:EMITS]->(evt:EventType)
+RETURN cmd.name AS command, ot.name AS aggregate_type, collect(DISTINCT evt.name) AS events
+ORDER BY ot.name
+"""
+
+
+class CommandRoute:
+    """Command 실행에 필요한 스키마 정보"""
+
+    def __init__(self, command: str, aggregate_type: str, events: List[str]):
+        self.command = command
+        self.aggregate_type = aggregate_type
+        self.events = events  # 발행 이벤트 (첫 번째가 기본 이벤트)
+
+    @property
+    def event(self) -> str:
+        return self.events[0]
+
+    def to_dict(self) -> Dict:
+        return {
+            'command': self.command,
+            'aggregate_type': self.aggregate_type,
+            'events': self.events
+        }
+
+
+class CommandRegistry:
+    """Command → Aggregate 타입 → 발행 이벤트 (프로세스 내 캐시)
+
+    시작 시 온톨로지에서 한 번 로드하고, OntologyBuilder.build 후 다시 로드한다.
+    Command 실행 경로에서는 Neo4j 스키마 조회가 필요 없다.
+    """
+
+    def __init__(self):
+        self._routes: Dict[str, CommandRoute] = {}
+        self.loaded = False
+        self.loaded_at: Optional[float] = None
+
+    async def load(self, neo4j: Neo4jClient):
+        """온톨로지에서 전체 Command 매핑 로드"""
+        records = await neo4j.execute(LOAD_COMMANDS_QUERY)
+        routes: Dict[str, CommandRoute] = {}
+        for record in records:
+            command = record['command']
+            if command in routes:
+                logger.warning(
+                    f"Command '{command}' 가 여러 Aggregate 에 정의됨 - "
+                    f"{routes[command].aggregate_type} 사용"
+                )
+                continue
+            routes[command] = CommandRoute(
+                command=command,
+                aggregate_type=record['aggregate_type'],
+                events=match_events(command, [e for e in record['events'] if e])
+            )
+        self._routes = routes
+        self.loaded = True
+        self.loaded_at = time.time()
+        logger.info(f"Command 레지스트리 로드: {len(routes)}개")
+
+    async def ensure_loaded(self, neo4j: Neo4jClient):
+        if not self.loaded:
+            await self.load(neo4j)
+
+    def invalidate(self):
+        self._routes = {}
+        self.loaded = False
+
+    def resolve(self, command: str) -> Optional[CommandRoute]:
+        return self._routes.get(command)
+
+    def routes(self) -> List[CommandRoute]:
+        return list(self._routes.values())
+
+
+def _words(name: str) -> List[str]:
+    return re.findall(r'[A-Z][a-z0-9]*', name)
+
+
+# 규칙으로 만들 수 없는 과거형
+IRREGULAR_PAST = {
+    'Pay': 'Paid',
+    'Send': 'Sent',
+    'Build': 'Built',
+    'Buy': 'Bought',
+    'Make': 'Made',
+    'Sell': 'Sold',
+    'Hold': 'Held',
+    'Set': 'Set',
+}
+
+
+def _past_forms(verb: str) -> List[str]:
+    forms = [verb + "ed", verb + "d", verb + verb[-1] + "ed"]  # Cancel → Cancelled
+    if verb.endswith("y"):
+        forms.append(verb[:-1] + "ied")
+    if verb in IRREGULAR_PAST:
+        forms.append(IRREGULAR_PAST[verb])
+    return forms
+
+
+def match_events(command: str, events: List[str]) -> List[str]:
+    """Command 이름과 대응하는 이벤트 추론 (PlaceOrder → OrderPlaced)
+
+    대응 이벤트가 없으면 기존 규칙(Place→Placed, Create→Created)으로 만든 이름을 쓴다.
+    """
+    words = _words(command)
+    if words:
+        verb, rest = words[0], set(words[1:])
+        past = set(_past_forms(verb))
+        matched = [
+            evt for evt in events
+            if past & set(_words(evt)) and rest <= set(_words(evt))
+        ]
+        if not matched:
+            matched = [evt for evt in events if past & set(_words(evt))]
+        if matched:
+            return matched
+    return [command.replace("Place", "Placed").replace("Create", "Created")]
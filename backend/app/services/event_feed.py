@@ -0,0 +1,168 @@
+from typing import Any, Dict, List, Optional, Set
+import asyncio
+import itertools
+import json
+import logging
+
+from app.services.event_pipeline import event_payload
+
+logger = logging.getLogger(__name__)
+
+# 구독 종료 표시 (버퍼에 넣어 대기 중인 소비자를 깨운다)
+CLOSED = None
+
+
+class FeedMessage:
+    """구독자에게 보낼 이벤트 (직렬화는 이벤트당 한 번)"""
+
+    def __init__(self, event: Dict[str, Any]):
+        self.id = f"{event.get('aggregate_id')}:{event.get('sequence')}"
+        self.type = event.get('type')
+        self.data = json.dumps({
+            'type': event.get('type'),
+            'aggregate_id': event.get('aggregate_id'),
+            'aggregate_type': event.get('aggregate_type'),
+            'sequence': event.get('sequence'),
+            'timestamp': event.get('timestamp'),
+            'payload': event_payload(event)
+        }, default=str)
+
+
+class Subscription:
+    """필터 하나와 bounded 버퍼 (모든 필터는 AND, 비어 있으면 전체)"""
+
+    def __init__(
+        self,
+        subscription_id: int,
+        aggregate_ids: Set[str],
+        aggregate_types: Set[str],
+        event_types: Set[str],
+        buffer_size: int
+    ):
+        self.id = subscription_id
+        self.aggregate_ids = aggregate_ids
+        self.aggregate_types = aggregate_types
+        self.event_types = event_types
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=buffer_size)
+        self.delivered = 0
+        self.evicted = False
+
+    def matches(self, event: Dict[str, Any]) -> bool:
+        return (
+            (not self.aggregate_ids or event.get('aggregate_id') in self.aggregate_ids)
+            and (not self.aggregate_types or event.get('aggregate_type') in self.aggregate_types)
+            and (not self.event_types or event.get('type') in self.event_types)
+        )
+
+    async def get(self) -> Optional[FeedMessage]:
+        """다음 메시지, 구독이 끝났으면 None"""
+        return await self.queue.get()
+
+
+class EventFeed:
+    """커밋된 DomainEvent 프로세스 내 fan-out
+
+    구독은 가장 선택적인 필터(aggregate_id > event_type > aggregate_type) 로 인덱싱해
+    이벤트마다 후보 구독자만 검사한다. 버퍼가 가득 찬 구독자는 이벤트를 미루지 않고
+    즉시 끊어(slow consumer eviction) 다른 구독자와 Command 경로가 기다리지 않는다.
+    """
+
+    def __init__(self, buffer_size: int = 256):
+        self.buffer_size = buffer_size
+        self._ids = itertools.count(1)
+        self._subscriptions: Dict[int, Subscription] = {}
+        self._by_aggregate: Dict[str, Set[int]] = {}
+        self._by_event_type: Dict[str, Set[int]] = {}
+        self._by_aggregate_type: Dict[str, Set[int]] = {}
+        self._unfiltered: Set[int] = set()
+        self.published = 0
+        self.delivered = 0
+        self.evicted = 0
+
+    def subscribe(
+        self,
+        aggregate_ids: Optional[List[str]] = None,
+        aggregate_types: Optional[List[str]] = None,
+        event_types: Optional[List[str]] = None
+    ) -> Subscription:
+        subscription = Subscription(
+            next(self._ids),
+            set(aggregate_ids or []),
+            set(aggregate_types or []),
+            set(event_types or []),
+            self.buffer_size
+        )
+        self._subscriptions[subscription.id] = subscription
+        for index, keys in self._index_keys(subscription):
+            for key in keys:
+                index.setdefault(key, set()).add(subscription.id)
+        if not (subscription.aggregate_ids or subscription.event_types or subscription.aggregate_types):
+            self._unfiltered.add(subscription.id)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        if self._subscriptions.pop(subscription.id, None) is None:
+            return
+        for index, keys in self._index_keys(subscription):
+            for key in keys:
+                ids = index.get(key)
+                if ids:
+                    ids.discard(subscription.id)
+                    if not ids:
+                        del index[key]
+        self._unfiltered.discard(subscription.id)
+
+    def _index_keys(self, subscription: Subscription):
+        """구독을 등록할 인덱스 하나 (가장 선택적인 필터)"""
+        if subscription.aggregate_ids:
+            return [(self._by_aggregate, subscription.aggregate_ids)]
+        if subscription.event_types:
+            return [(self._by_event_type, subscription.event_types)]
+        if subscription.aggregate_types:
+            return [(self._by_aggregate_type, subscription.aggregate_types)]
+        return []
+
+    def _candidates(self, event: Dict[str, Any]) -> Set[int]:
+        return (
+            self._by_aggregate.get(event.get('aggregate_id'), set())
+            | self._by_event_type.get(event.get('type'), set())
+            | self._by_aggregate_type.get(event.get('aggregate_type'), set())
+            | self._unfiltered
+        )
+
+    async def handle(self, events: List[Dict[str, Any]]):
+        """EventPipeline 구독자"""
+        for event in events:
+            self.published += 1
+            message = None
+            for subscription_id in self._candidates(event):
+                subscription = self._subscriptions.get(subscription_id)
+                if not subscription or not subscription.matches(event):
+                    continue
+                message = message or FeedMessage(event)
+                try:
+                    subscription.queue.put_nowait(message)
+                    subscription.delivered += 1
+                    self.delivered += 1
+                except asyncio.QueueFull:
+                    self._evict(subscription)
+
+    def _evict(self, subscription: Subscription):
+        """느린 소비자: 버퍼를 비우고 종료 표시를 넣은 뒤 구독 해제"""
+        logger.warning(f"이벤트 피드 구독 {subscription.id} 종료 - 버퍼 초과 ({self.buffer_size})")
+        subscription.evicted = True
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+        subscription.queue.put_nowait(CLOSED)
+        self.unsubscribe(subscription)
+        self.evicted += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'subscribers': len(self._subscriptions),
+            'buffer_size': self.buffer_size,
+            'published': self.published,
+            'delivered': self.delivered,
+            'evicted': self.evicted,
+            'buffered': sum(s.queue.qsize() for s in self._subscriptions.values())
+        }
@@ -0,0 +1,37 @@
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 추가된 DomainEvent: 노드 속성(type, aggregate_id, sequence, payload_json, timestamp)
+# + aggregate_type
+EventHandler = Callable[[List[Dict[str, Any]]], Awaitable[None]]
+
+
+def event_payload(event: Dict[str, Any]) -> Dict[str, Any]:
+    """DomainEvent 의 payload_json 파싱"""
+    raw = event.get('payload_json')
+    return json.loads(raw) if raw else {}
+
+
+class EventPipeline:
+    """DomainEvent 가 커밋된 뒤 구독자(프로젝션 등)에게 순서대로 전달
+
+    구독자 하나의 실패가 다른 구독자나 Command 응답에 영향을 주지 않는다.
+    """
+
+    def __init__(self):
+        self._handlers: List[Tuple[str, EventHandler]] = []
+
+    def subscribe(self, name: str, handler: EventHandler):
+        self._handlers.append((name, handler))
+
+    async def publish(self, events: List[Dict[str, Any]]):
+        if not events:
+            return
+        for name, handler in self._handlers:
+            try:
+                await handler(events)
+            except Exception as e:
+                logger.error(f"이벤트 구독자 실패 ({name}): {e}")
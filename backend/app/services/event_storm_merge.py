@@ -0,0 +1,178 @@
+from typing import Dict, List, Tuple
+import re
+
+from app.models.event_storm import Aggregate, Command, Event, EventStormResult, Policy, ReadModel
+
+# 섹션 제목 줄: 마크다운 헤딩, "2.1 Order Creation" 같은 번호 제목
+HEADING_PATTERN = re.compile(r"^(?:#{1,6}\s+\S|\d+(?:\.\d+)*\.?\s+\S)")
+
+
+def split_sections(text: str, max_chars: int, force: bool = False) -> List[str]:
+    """긴 설명 → max_chars 이하 섹션 목록 (문서 순서)
+
+    제목 줄 경계에서 나눈 뒤 이웃 섹션을 max_chars 까지 묶고,
+    그래도 긴 섹션은 빈 줄(문단), 마지막으로 줄 단위로 자른다.
+    force=True 면 길이와 상관없이 제목마다 (제목이 없으면 문단마다) 묶지 않고 나눈다.
+    """
+    if len(text) <= max_chars and not force:
+        return [text]
+    blocks = _heading_blocks(text)
+    if force and len(blocks) == 1:
+        blocks = text.split('\n\n')
+
+    pieces: List[str] = []
+    for block in blocks:
+        pieces.extend(_split_block(block, max_chars))
+    if force:
+        return [p for p in pieces if p.strip()]
+
+    sections: List[str] = []
+    for piece in pieces:
+        if sections and len(sections[-1]) + 1 + len(piece) <= max_chars:
+            sections[-1] += '\n' + piece
+        else:
+            sections.append(piece)
+    return [s for s in sections if s.strip()]
+
+
+def _heading_blocks(text: str) -> List[str]:
+    blocks: List[str] = []
+    current: List[str] = []
+    for line in text.splitlines():
+        if HEADING_PATTERN.match(line) and current:
+            blocks.append('\n'.join(current))
+            current = []
+        current.append(line)
+    if current:
+        blocks.append('\n'.join(current))
+    return blocks
+
+
+def _split_block(block: str, max_chars: int) -> List[str]:
+    if len(block) <= max_chars:
+        return [block]
+    for separator in ('\n\n', '\n'):
+        parts = block.split(separator)
+        if len(parts) > 1:
+            pieces: List[str] = []
+            for part in parts:
+                if pieces and len(pieces[-1]) + len(separator) + len(part) <= max_chars:
+                    pieces[-1] += separator + part
+                else:
+                    pieces.extend(_split_block(part, max_chars))
+            return pieces
+    return [block[i:i + max_chars] for i in range(0, len(block), max_chars)]
+
+
+def _key(name: str) -> str:
+    return name.strip().casefold()
+
+
+def _extend_unique(target: List, values: List):
+    for value in values:
+        if value not in target:
+            target.append(value)
+
+
+def _extend_unique_names(target: List[str], names: List[str]):
+    """이름 목록 병합 (대소문자 무시, 먼저 나온 표기 유지)"""
+    keys = {_key(name) for name in target}
+    for name in names:
+        if _key(name) not in keys:
+            target.append(name)
+            keys.add(_key(name))
+
+
+def _merge_parameters(target: Command, parameters: List):
+    names = {p.get('name') if isinstance(p, dict) else p for p in target.parameters}
+    for parameter in parameters:
+        name = parameter.get('name') if isinstance(parameter, dict) else parameter
+        if name not in names:
+            target.parameters.append(parameter)
+            names.add(name)
+
+
+def merge_results(results: List[EventStormResult]) -> EventStormResult:
+    """섹션별 부분 결과 → 하나의 결과 (입력 순서만으로 결정되는 중복 제거)
+
+    - Aggregate / Command / Event / Policy / ReadModel 은 이름(대소문자 무시)으로 합치고
+      먼저 나온 섹션의 이름·값을 유지한다. 목록은 처음 등장 순서.
+    - Command / Event 는 전체에서 한 Aggregate 에만 속한다 (먼저 선언한 Aggregate).
+    - 이름이 달라도 trigger_event 와 actions 가 같은 Policy 는 같은 Policy 로 본다.
+    - Policy actions, ReadModel source_events 도 대소문자 무시로 중복 제거한다.
+    """
+    aggregates: Dict[str, Aggregate] = {}
+    command_owner: Dict[str, str] = {}
+    event_owner: Dict[str, str] = {}
+    commands: Dict[str, Command] = {}
+    events: Dict[str, Event] = {}
+    policies: Dict[str, Policy] = {}
+    policy_signatures: Dict[Tuple[str, Tuple[str, ...]], str] = {}
+    read_models: Dict[str, ReadModel] = {}
+
+    for result in results:
+        for aggregate in result.aggregates:
+            aggregate_key = _key(aggregate.name)
+            merged = aggregates.get(aggregate_key)
+            if merged is None:
+                merged = aggregates[aggregate_key] = aggregate.model_copy(
+                    update={'commands': [], 'events': [], 'state': {}, 'invariants': [], 'filterable': []}
+                )
+            for field, field_type in aggregate.state.items():
+                merged.state.setdefault(field, field_type)
+            _extend_unique(merged.invariants, aggregate.invariants)
+            _extend_unique(merged.filterable, aggregate.filterable)
+
+            for command in aggregate.commands:
+                command_key = _key(command.name)
+                owner = command_owner.setdefault(command_key, aggregate_key)
+                if command_key in commands:
+                    if owner == aggregate_key:
+                        _merge_parameters(commands[command_key], command.parameters)
+                    continue
+                commands[command_key] = command.model_copy(update={'parameters': list(command.parameters)})
+                merged.commands.append(commands[command_key])
+
+            for event in aggregate.events:
+                event_key = _key(event.name)
+                owner = event_owner.setdefault(event_key, aggregate_key)
+                if event_key in events:
+                    if owner == aggregate_key:
+                        for field, value in event.data.items():
+                            events[event_key].data.setdefault(field, value)
+                    continue
+                events[event_key] = event.model_copy(update={'data': dict(event.data)})
+                merged.events.append(events[event_key])
+
+        for policy in result.policies:
+            policy_key = _key(policy.name)
+            signature = (_key(policy.trigger_event), tuple(sorted(_key(a) for a in policy.actions)))
+            policy_key = policy_signatures.get(signature, policy_key)
+            if policy_key in policies:
+                _extend_unique_names(policies[policy_key].actions, policy.actions)
+                if not policies[policy_key].description:
+                    policies[policy_key].description = policy.description
+            else:
+                policies[policy_key] = policy.model_copy(update={'actions': []})
+                _extend_unique_names(policies[policy_key].actions, policy.actions)
+            policy_signatures.setdefault(signature, policy_key)
+
+        for read_model in result.read_models:
+            read_model_key = _key(read_model.name)
+            if read_model_key in read_models:
+                merged_model = read_models[read_model_key]
+                _extend_unique_names(merged_model.source_events, read_model.source_events)
+                for field, expression in read_model.projections.items():
+                    merged_model.projections.setdefault(field, expression)
+            else:
+                read_models[read_model_key] = read_model.model_copy(update={
+                    'source_events': list(read_model.source_events),
+                    'projections': dict(read_model.projections)
+                })
+
+    return EventStormResult(
+        aggregates=list(aggregates.values()),
+        policies=list(policies.values()),
+        read_models=list(read_models.values()),
+        version=results[0].version if results else "1.0.0"
+    )
@@ -0,0 +1,155 @@
+from typing import Any, Dict, List, Optional, Set
+import json
+
+from app.models.event_storm import EventStormPatch, EventStormResult, PatchOperation
+
+# 대상 → (결과 안 목록 필드, Aggregate 하위 여부)
+PATCH_TARGETS = {
+    'aggregate': ('aggregates', False),
+    'command': ('commands', True),
+    'event': ('events', True),
+    'policy': ('policies', False),
+    'read_model': ('read_models', False)
+}
+
+
+class PatchError(ValueError):
+    """현재 결과에 적용할 수 없는 patch"""
+
+
+def _named(items: List[Dict[str, Any]], name: str) -> Optional[Dict[str, Any]]:
+    key = name.casefold()
+    return next((item for item in items if item['name'].casefold() == key), None)
+
+
+def _mentioned(name: str, feedback: str) -> bool:
+    return name.casefold() in feedback
+
+
+def select_context(result: EventStormResult, feedback: str) -> Dict[str, Any]:
+    """피드백과 관련된 부분만 골라 프롬프트 컨텍스트 구성
+
+    - outline: 전체 Aggregate → Command/Event 이름과 Policy 이름 (추가/이름 충돌 판단용, 상세 없음)
+    - aggregates: 피드백에 자신이나 자신의 Command/Event 이름이 나온 Aggregate 와
+      그 Aggregate 와 Policy 로 연결된 Aggregate 의 전체 정의
+    - policies: 관련 Aggregate 의 이벤트/Command 를 잇거나 피드백에 이름이 나온 Policy
+    """
+    feedback = feedback.casefold()
+    owner: Dict[str, str] = {}
+    for aggregate in result.aggregates:
+        for item in [*aggregate.commands, *aggregate.events]:
+            owner.setdefault(item.name, aggregate.name)
+
+    relevant: Set[str] = {
+        a.name for a in result.aggregates
+        if _mentioned(a.name, feedback)
+        or any(_mentioned(item.name, feedback) for item in [*a.commands, *a.events])
+    }
+    policies = []
+    for policy in result.policies:
+        linked = {owner.get(policy.trigger_event)} | {owner.get(action) for action in policy.actions}
+        linked.discard(None)
+        if _mentioned(policy.name, feedback) or linked & relevant:
+            policies.append(policy)
+    # Policy 반대편 Aggregate 까지 한 단계 확장
+    for policy in policies:
+        relevant |= {owner.get(policy.trigger_event)} | {owner.get(action) for action in policy.actions}
+    relevant.discard(None)
+
+    return {
+        'outline': {
+            'aggregates': {
+                a.name: {'commands': [c.name for c in a.commands], 'events': [e.name for e in a.events]}
+                for a in result.aggregates
+            },
+            'policies': [p.name for p in result.policies],
+            'read_models': [r.name for r in result.read_models]
+        },
+        'aggregates': [
+            a.model_dump(exclude_none=True) for a in result.aggregates if a.name in relevant
+        ],
+        'policies': [p.model_dump(exclude_none=True) for p in policies]
+    }
+
+
+def context_json(context: Dict[str, Any]) -> str:
+    """프롬프트용 압축 JSON (들여쓰기 없음)"""
+    return json.dumps(context, ensure_ascii=False, separators=(',', ':'))
+
+
+def _container(data: Dict[str, Any], operation: PatchOperation) -> List[Dict[str, Any]]:
+    field, nested = PATCH_TARGETS[operation.target]
+    if not nested:
+        return data[field]
+    if operation.aggregate:
+        aggregate = _named(data['aggregates'], operation.aggregate)
+        if aggregate is None:
+            raise PatchError(f"Aggregate '{operation.aggregate}' not found")
+        return aggregate[field]
+    # Aggregate 를 생략하면 이름으로 소속 Aggregate 를 찾는다
+    for aggregate in data['aggregates']:
+        if _named(aggregate[field], operation.name):
+            return aggregate[field]
+    raise PatchError(f"{operation.target} '{operation.name}' needs an aggregate")
+
+
+def _apply_operation(data: Dict[str, Any], operation: PatchOperation):
+    items = _container(data, operation)
+    existing = _named(items, operation.name)
+    if operation.op == 'add':
+        if existing is not None:
+            raise PatchError(f"{operation.target} '{operation.name}' already exists")
+        items.append({**operation.value, 'name': operation.name})
+    elif existing is None:
+        raise PatchError(f"{operation.target} '{operation.name}' not found")
+    elif operation.op == 'remove':
+        items.remove(existing)
+    else:
+        for field, value in operation.value.items():
+            if field in ('state', 'data', 'projections') and isinstance(value, dict):
+                # 매핑 필드는 병합, 값이 null 이면 키 삭제
+                merged = dict(existing.get(field) or {})
+                for key, item in value.items():
+                    if item is None:
+                        merged.pop(key, None)
+                    else:
+                        merged[key] = item
+                existing[field] = merged
+            else:
+                existing[field] = value
+
+
+def _dangling_references(data: Dict[str, Any]) -> Set[str]:
+    """Policy / ReadModel 이 가리키지만 결과 안에 없는 Event / Command"""
+    events = {e['name'].casefold() for a in data['aggregates'] for e in a['events']}
+    commands = {c['name'].casefold() for a in data['aggregates'] for c in a['commands']}
+    dangling: Set[str] = set()
+    for policy in data['policies']:
+        if policy['trigger_event'].casefold() not in events:
+            dangling.add(f"policy '{policy['name']}' → event '{policy['trigger_event']}'")
+        for action in policy['actions']:
+            if action.casefold() not in commands:
+                dangling.add(f"policy '{policy['name']}' → command '{action}'")
+    for read_model in data['read_models']:
+        for event in read_model['source_events']:
+            if event.casefold() not in events:
+                dangling.add(f"read_model '{read_model['name']}' → event '{event}'")
+    return dangling
+
+
+def apply_patch(result: EventStormResult, patch: EventStormPatch) -> EventStormResult:
+    """patch 를 복사본에 순서대로 적용하고 전체를 다시 검증 (원본은 그대로)
+
+    하나라도 적용할 수 없거나 검증에 실패하면 PatchError / ValidationError 로 전체를 거부한다.
+    patch 가 아직 참조되는 Event / Command 를 지우거나 없는 것을 가리키게 만들어도 거부한다
+    (원래 결과에 있던 끊긴 참조는 그대로 둔다).
+    """
+    data = result.model_dump()
+    before = _dangling_references(data)
+    for operation in patch.operations:
+        _apply_operation(data, operation)
+    patched = EventStormResult.model_validate(data)
+    broken = _dangling_references(patched.model_dump()) - before
+    if broken:
+        raise PatchError(f"dangling references: {', '.join(sorted(broken))}")
+    return patched
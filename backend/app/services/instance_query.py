@@ -0,0 +1,177 @@
+from typing import Any, Dict, List, Optional, Tuple
+import base64
+import json
+import re
+
+# 필터/정렬 DSL
+#   filter=field:op:value (여러 개 AND), in 은 value 를 콤마로 구분
+#   sort=field[:asc|desc]
+# 필드는 ObjectType.properties_json 에 선언된 것과 기본 필드만 허용하고
+# 값은 모두 파라미터로 넘긴다.
+
+OPERATORS = {
+    'eq': '=',
+    'ne': '<>',
+    'lt': '<',
+    'lte': '<=',
+    'gt': '>',
+    'gte': '>=',
+    'in': 'IN',
+    'contains': 'CONTAINS',
+    'starts_with': 'STARTS WITH',
+}
+
+# 모든 인스턴스에 있는 필드
+BUILTIN_FIELDS = {
+    'id': 'string',
+    'created_at': 'integer',
+    'updated_at': 'integer',
+    'version': 'integer',
+}
+
+NUMBER_TYPES = {'number', 'float', 'double', 'decimal', 'money'}
+INTEGER_TYPES = {'integer', 'int', 'long'}
+BOOLEAN_TYPES = {'boolean', 'bool'}
+
+FIELD_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+class InstanceQueryError(ValueError):
+    """잘못된 필터/정렬/커서"""
+
+
+def parse_schema(properties_json: Optional[str]) -> Dict[str, str]:
+    """ObjectType.properties_json → {필드: 타입}"""
+    schema = dict(BUILTIN_FIELDS)
+    if properties_json:
+        for field, definition in json.loads(properties_json).items():
+            field_type = definition.get('type', 'string') if isinstance(definition, dict) else str(definition)
+            schema[field] = field_type.lower()
+    return schema
+
+
+def _coerce(value: str, field_type: str) -> Any:
+    try:
+        if field_type in INTEGER_TYPES:
+            return int(value)
+        if field_type in NUMBER_TYPES:
+            return float(value)
+    except ValueError:
+        raise InstanceQueryError(f"'{value}' is not a valid {field_type}")
+    if field_type in BOOLEAN_TYPES:
+        if value.lower() not in ('true', 'false'):
+            raise InstanceQueryError(f"'{value}' is not a valid boolean")
+        return value.lower() == 'true'
+    return value
+
+
+def _field(name: str, schema: Dict[str, str]) -> str:
+    if not FIELD_PATTERN.match(name) or name not in schema:
+        raise InstanceQueryError(f"Unknown field '{name}'")
+    return name
+
+
+def encode_cursor(values: List[Any]) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        raise InstanceQueryError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise InstanceQueryError("Invalid cursor")
+    return values
+
+
+def compile_instance_query(
+    type_name: str,
+    schema: Dict[str, str],
+    filters: List[str],
+    sort: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = 100
+) -> Tuple[str, Dict[str, Any], List[str]]:
+    """DSL → (Cypher, 파라미터, 커서 키 필드)
+
+    (created_at, id) 를 항상 마지막 정렬 키로 두어 keyset 페이지네이션이
+    페이지 깊이와 무관하게 인덱스 위치에서 바로 시작한다.
+    """
+    conditions: List[str] = []
+    params: Dict[str, Any] = {'limit': limit}
+
+    for i, expr in enumerate(filters):
+        parts = expr.split(':', 2)
+        if len(parts) != 3:
+            raise InstanceQueryError(f"Invalid filter '{expr}' (field:op:value)")
+        name, op, raw = parts
+        field = _field(name, schema)
+        if op not in OPERATORS:
+            raise InstanceQueryError(f"Unknown operator '{op}'")
+        if op == 'in':
+            value = [_coerce(v, schema[field]) for v in raw.split(',')]
+        elif op in ('contains', 'starts_with'):
+            value = raw
+        else:
+            value = _coerce(raw, schema[field])
+        params[f'f{i}'] = value
+        conditions.append(f"inst.`{field}` {OPERATORS[op]} $f{i}")
+
+    # 정렬 키: [사용자 정렬 필드], created_at, id
+    order_fields: List[Tuple[str, str]] = []
+    if sort:
+        name, _, direction = sort.partition(':')
+        direction = (direction or 'asc').lower()
+        if direction not in ('asc', 'desc'):
+            raise InstanceQueryError(f"Invalid sort direction '{direction}'")
+        field = _field(name, schema)
+        if field not in ('created_at', 'id'):
+            order_fields.append((field, direction))
+            # keyset 비교는 null 을 다룰 수 없으므로 값이 있는 인스턴스만
+            conditions.append(f"inst.`{field}` IS NOT NULL")
+    order_fields += [('created_at', 'asc'), ('id', 'asc')]
+    key_fields = [f for f, _ in order_fields]
+
+    if cursor:
+        values = decode_cursor(cursor, len(order_fields))
+        conditions.append(_keyset_condition(order_fields, values, params))
+
+    query = f"MATCH (inst:{type_name}:DynamicInstance)\n"
+    if conditions:
+        query += "WHERE " + "\n  AND ".join(conditions) + "\n"
+    query += "RETURN inst\n"
+    query += "ORDER BY " + ", ".join(f"inst.`{f}` {d.upper()}" for f, d in order_fields) + "\n"
+    query += "LIMIT $limit\n"
+    return query, params, key_fields
+
+
+def _keyset_condition(
+    order_fields: List[Tuple[str, str]],
+    values: List[Any],
+    params: Dict[str, Any]
+) -> str:
+    """(a, b, c) > (x, y, z) 를 정렬 방향에 맞게 펼친 조건
+
+    펼친 OR 만으로는 플래너가 인덱스 시작 위치를 잡지 못하므로 첫 정렬 키의
+    범위 조건(a >= x, desc 면 a <= x)을 AND 로 앞에 붙여 인덱스 seek 이 되게 한다.
+    """
+    clause = None
+    for i in reversed(range(len(order_fields))):
+        field, direction = order_fields[i]
+        params[f'k{i}'] = values[i]
+        op = '<' if direction == 'desc' else '>'
+        strict = f"inst.`{field}` {op} $k{i}"
+        if clause is None:
+            clause = strict
+        else:
+            clause = f"({strict} OR (inst.`{field}` = $k{i} AND {clause}))"
+    if len(order_fields) == 1:
+        return clause
+    field, direction = order_fields[0]
+    bound = '<=' if direction == 'desc' else '>='
+    return f"inst.`{field}` {bound} $k0 AND {clause}"
+
+
+def next_cursor(item: Dict[str, Any], key_fields: List[str]) -> str:
+    return encode_cursor([item.get(f) for f in key_fields])
@@ -0,0 +1,95 @@
+from typing import List, Optional, Sequence, Tuple
+
+
+class IncrementalArrayParser:
+    """토큰 스트림으로 들어오는 JSON 객체에서 지정한 최상위 배열의 원소를 완성되는 대로 꺼낸다
+
+    예: fields=("aggregates", "policies") 이면 {"aggregates": [{...}, {...}], "policies": [...]} 에서
+    각 {...} 가 닫히는 순간 ("aggregates", '{...}') 를 돌려준다.
+    문자열/이스케이프 안의 괄호는 무시하고, 첫 '{' 이전(마크다운 펜스, 설명 문장)은 건너뛴다.
+    새 청크의 글자만 한 번씩 보고 원소는 청크 조각을 모아 두므로 비용은 응답 길이에 선형이다.
+    """
+
+    def __init__(self, fields: Sequence[str]):
+        self.fields = set(fields)
+        self._chunks: List[str] = []
+        self._offset = 0  # 지금까지 받은 글자 수
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_parts: Optional[List[str]] = None  # depth 1 문자열(키 후보) 조각
+        self._last_string: Optional[str] = None
+        self._key: Optional[str] = None
+        self._array: Optional[str] = None  # 지금 원소를 모으는 배열 이름
+        self._element_parts: Optional[List[str]] = None
+        self._document_start: Optional[int] = None
+        self._document_end: Optional[int] = None
+
+    def feed(self, chunk: str) -> List[Tuple[str, str]]:
+        """청크 추가, 이번에 완성된 (배열 이름, 원소 JSON) 목록"""
+        completed: List[Tuple[str, str]] = []
+        self._chunks.append(chunk)
+        element_from = 0
+        string_from = 0
+        for i, ch in enumerate(chunk):
+            if self._document_end is not None:
+                break
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._string_parts is not None:
+                        self._string_parts.append(chunk[string_from:i])
+                        self._last_string = ''.join(self._string_parts)
+                        self._string_parts = None
+                continue
+            if self._document_start is None:
+                if ch == '{':
+                    self._document_start = self._offset + i
+                    self._depth = 1
+                continue
+            if ch == '"':
+                self._in_string = True
+                if self._depth == 1:
+                    self._string_parts = []
+                    string_from = i + 1
+            elif ch == ':' and self._depth == 1:
+                self._key = self._last_string
+            elif ch in '{[':
+                self._depth += 1
+                if ch == '[' and self._depth == 2 and self._key in self.fields:
+                    self._array = self._key
+                elif ch == '{' and self._depth == 3 and self._array:
+                    self._element_parts = []
+                    element_from = i
+            elif ch in '}]':
+                self._depth -= 1
+                if ch == '}' and self._depth == 2 and self._element_parts is not None:
+                    self._element_parts.append(chunk[element_from:i + 1])
+                    completed.append((self._array, ''.join(self._element_parts)))
+                    self._element_parts = None
+                elif ch == ']' and self._depth == 1:
+                    self._array = None
+                elif self._depth == 0:
+                    self._document_end = self._offset + i + 1
+        # 청크 경계에 걸친 원소/키는 남은 조각을 보관
+        if self._element_parts is not None:
+            self._element_parts.append(chunk[element_from:])
+        if self._string_parts is not None:
+            self._string_parts.append(chunk[string_from:])
+        self._offset += len(chunk)
+        return completed
+
+    @property
+    def text(self) -> str:
+        return ''.join(self._chunks)
+
+    @property
+    def document(self) -> str:
+        """최상위 JSON 객체 텍스트 (앞뒤 군더더기 제외, 아직 안 닫혔으면 남은 전체)"""
+        if self._document_start is None:
+            return self.text
+        return self.text[self._document_start:self._document_end]
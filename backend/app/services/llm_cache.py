@@ -0,0 +1,168 @@
+from typing import Any, Dict, Optional
+from collections import OrderedDict
+from pathlib import Path
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+import unicodedata
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_prompt(prompt: str) -> str:
+    """캐시 키용 정규화: 유니코드 NFC, 공백 연속/줄바꿈 차이 무시"""
+    return " ".join(unicodedata.normalize("NFC", prompt).split())
+
+
+def cache_key(
+    provider: str,
+    model: str,
+    temperature: float,
+    system_prompt: str,
+    prompt: str
+) -> str:
+    """(provider, model, temperature, 시스템 프롬프트 해시, 정규화 프롬프트) → sha256"""
+    material = json.dumps([
+        provider,
+        model,
+        temperature,
+        hashlib.sha256(system_prompt.encode()).hexdigest(),
+        normalize_prompt(prompt)
+    ], ensure_ascii=False)
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+class MemoryCacheBackend:
+    """프로세스 내 LRU + TTL"""
+
+    def __init__(self, max_entries: int = 1000, ttl: float = 86400.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if self.ttl and time.time() - stored_at > self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: str):
+        self._entries[key] = (time.time(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def clear(self):
+        self._entries.clear()
+
+    def size(self) -> int:
+        return len(self._entries)
+
+
+class DiskCacheBackend:
+    """디렉터리에 키별 JSON 파일 (재시작 후에도 유지, 파일 IO 는 스레드에서)"""
+
+    def __init__(self, directory: str, ttl: float = 86400.0):
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def _read(self, key: str) -> Optional[str]:
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        if self.ttl and time.time() - entry['stored_at'] > self.ttl:
+            path.unlink(missing_ok=True)
+            return None
+        return entry['value']
+
+    def _write(self, key: str, value: str):
+        # 임시 파일에 쓴 뒤 교체해 읽는 쪽이 반쯤 쓴 파일을 보지 않게
+        path = self._path(key)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({'stored_at': time.time(), 'value': value}, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def _clear(self):
+        for path in self.directory.glob("*.json"):
+            path.unlink(missing_ok=True)
+
+    async def get(self, key: str) -> Optional[str]:
+        return await asyncio.to_thread(self._read, key)
+
+    async def set(self, key: str, value: str):
+        await asyncio.to_thread(self._write, key, value)
+
+    async def clear(self):
+        await asyncio.to_thread(self._clear)
+
+    def size(self) -> int:
+        return sum(1 for _ in self.directory.glob("*.json"))
+
+
+class LLMCache:
+    """LLM 응답(원문 JSON) 내용 주소 캐시
+
+    검증을 통과한 응답만 저장한다. bypass 요청은 읽지 않고 새 응답으로 덮어쓴다.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.stores = 0
+        self.errors = 0
+
+    async def get(self, key: str) -> Optional[str]:
+        try:
+            value = await self.backend.get(key)
+        except Exception as e:
+            # 캐시 장애는 LLM 호출로 대체
+            self.errors += 1
+            logger.error(f"LLM 캐시 조회 실패: {e}")
+            value = None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value: str):
+        try:
+            await self.backend.set(key, value)
+            self.stores += 1
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"LLM 캐시 저장 실패: {e}")
+
+    async def clear(self):
+        await self.backend.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'backend': type(self.backend).__name__,
+            'entries': self.backend.size(),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 3) if lookups else None,
+            'bypassed': self.bypassed,
+            'stores': self.stores,
+            'errors': self.errors
+        }
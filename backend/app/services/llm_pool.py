@@ -0,0 +1,156 @@
+from typing import Any, Dict, Optional
+from contextlib import asynccontextmanager
+import asyncio
+import logging
+import time
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class LLMPoolBusy(RuntimeError):
+    """동시 실행 한도에서 queue_timeout 안에 자리를 얻지 못함"""
+
+
+class LLMPoolMetrics:
+    def __init__(self):
+        self.requests = 0
+        self.failures = 0
+        self.rejected = 0
+        self.in_flight = 0
+        self.waiting = 0
+        self.max_in_flight = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+        self.total_call_ms = 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'requests': self.requests,
+            'failures': self.failures,
+            'rejected': self.rejected,
+            'in_flight': self.in_flight,
+            'waiting': self.waiting,
+            'max_in_flight': self.max_in_flight,
+            'avg_queue_wait_ms': round(self.total_wait_ms / self.requests, 3) if self.requests else 0.0,
+            'max_queue_wait_ms': round(self.max_wait_ms, 3),
+            'avg_call_ms': round(self.total_call_ms / self.requests, 3) if self.requests else 0.0
+        }
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class LLMClientPool:
+    """프로세스 공용 LLM 클라이언트 (lifespan 에서 열고 닫는다)
+
+    httpx.AsyncClient 하나를 SDK 클라이언트에 주입해 TLS 연결을 keep-alive 로 재사용하고
+    (h2 가 설치되어 있으면 HTTP/2 로 한 연결에 여러 요청을 다중화),
+    세마포어로 동시 호출 수를 제한해 버스트 트래픽이 소켓을 새로 열지 않게 한다.
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        api_key: Optional[str],
+        http2: bool = True,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 30.0,
+        connect_timeout: float = 10.0,
+        timeout: float = 120.0,
+        max_concurrency: int = 8,
+        queue_timeout: float = 30.0
+    ):
+        self.provider = provider
+        self.api_key = api_key
+        self.http2 = http2
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.connect_timeout = connect_timeout
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.queue_timeout = queue_timeout
+        self.metrics = LLMPoolMetrics()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.http_client: Optional[httpx.AsyncClient] = None
+        self.client = None
+
+    def start(self):
+        if self.http2 and not _http2_available():
+            logger.warning("h2 패키지가 없어 LLM 연결은 HTTP/1.1 keep-alive 로 동작합니다")
+            self.http2 = False
+        self.http_client = httpx.AsyncClient(
+            http2=self.http2,
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive_connections,
+                keepalive_expiry=self.keepalive_expiry
+            ),
+            timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout)
+        )
+        if self.provider == "openai":
+            from openai import AsyncOpenAI
+
+            self.client = AsyncOpenAI(api_key=self.api_key, http_client=self.http_client)
+        else:
+            from anthropic import AsyncAnthropic
+
+            self.client = AsyncAnthropic(api_key=self.api_key, http_client=self.http_client)
+
+    async def close(self):
+        if self.http_client:
+            await self.http_client.aclose()
+            self.http_client = None
+            self.client = None
+
+    @asynccontextmanager
+    async def slot(self):
+        """동시 실행 자리 하나 (대기 시간/처리 중 수 기록)"""
+        metrics = self.metrics
+        metrics.waiting += 1
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            metrics.rejected += 1
+            raise LLMPoolBusy(
+                f"LLM 동시 실행 한도({self.max_concurrency}) 대기 {self.queue_timeout}초 초과"
+            )
+        finally:
+            metrics.waiting -= 1
+
+        acquired = time.perf_counter()
+        wait_ms = (acquired - started) * 1000
+        metrics.requests += 1
+        metrics.total_wait_ms += wait_ms
+        metrics.max_wait_ms = max(metrics.max_wait_ms, wait_ms)
+        metrics.in_flight += 1
+        metrics.max_in_flight = max(metrics.max_in_flight, metrics.in_flight)
+        try:
+            yield self.client
+        except Exception:
+            metrics.failures += 1
+            raise
+        finally:
+            metrics.in_flight -= 1
+            metrics.total_call_ms += (time.perf_counter() - acquired) * 1000
+            self._semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'provider': self.provider,
+            'http2': self.http2,
+            'open': self.http_client is not None,
+            'max_concurrency': self.max_concurrency,
+            'max_connections': self.max_connections,
+            'max_keepalive_connections': self.max_keepalive_connections,
+            **self.metrics.snapshot()
+        }
@@ -1,11 +1,15 @@
-from openai import AsyncOpenAI
-from anthropic import AsyncAnthropic
-from typing import Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+import asyncio
 import json
 import logging
 
 from app.config import settings
-from app.models.event_storm import EventStormResult
+from app.models.event_storm import Aggregate, EventStormPatch, EventStormResult, Policy
+from app.services.llm_cache import LLMCache, cache_key
+from app.services.llm_pool import LLMClientPool
+from app.services.json_stream import IncrementalArrayParser
+from app.services.event_storm_merge import merge_results, split_sections
+from app.services.event_storm_patch import apply_patch, context_json, select_context
 
 logger = logging.getLogger(__name__)
 
@@ -46,55 +50,67 @@ EVENT_STORM_SYSTEM_PROMPT = """당신은 도메인 주도 설계(DDD)와 이벤
 }
 """
 
+PATCH_SYSTEM_PROMPT = """당신은 도메인 주도 설계(DDD)와 이벤트 스토밍 전문가입니다.
+기존 이벤트 스토밍 결과에 사용자 피드백을 반영하는 **변경 사항만** 출력하세요.
+전체 결과를 다시 쓰지 마세요.
+
+## 입력
+- outline: 전체 Aggregate 와 Command/Event, Policy, ReadModel 이름
+- aggregates / policies: 피드백과 관련된 부분의 전체 정의
+
+## 출력 형식 (JSON)
+{
+  "operations": [
+    {"op": "add", "target": "aggregate", "name": "Shipment",
+     "value": {"commands": [...], "events": [...], "state": {...}, "invariants": [...]}},
+    {"op": "add", "target": "command", "aggregate": "Order", "name": "CancelOrder",
+     "value": {"parameters": [{"name": "reason", "type": "string"}]}},
+    {"op": "modify", "target": "aggregate", "name": "Order",
+     "value": {"state": {"cancel_reason": "string", "obsolete_field": null}}},
+    {"op": "remove", "target": "event", "aggregate": "Order", "name": "OrderArchived"},
+    {"op": "modify", "target": "policy", "name": "start_shipment_on_payment",
+     "value": {"actions": ["CreateShipment", "NotifyCustomer"]}}
+  ]
+}
+
+## 규칙
+- target: aggregate, command, event, policy, read_model
+- command / event 는 aggregate 에 소속 Aggregate 이름을 적으세요
+- modify 의 value 에는 바꿀 필드만, state/data/projections 는 키 단위 병합 (null 이면 삭제)
+- 이름 규칙은 기존과 같습니다 (Aggregate/Command/Event UpperCamelCase)
+"""
+
+# 스트리밍 분석에서 완성되는 대로 내보낼 최상위 배열 → (이벤트 이름, 검증 모델)
+STREAMED_FIELDS = {
+    "aggregates": ("aggregate", Aggregate),
+    "policies": ("policy", Policy)
+}
+
 class LLMService:
-    def __init__(self):
-        self.provider = settings.llm_provider
+    """프로세스 공용 (lifespan 에서 한 번 생성), 호출은 pool 의 연결/동시성 한도를 공유한다"""
+    
+    def __init__(self, pool: LLMClientPool, cache: Optional[LLMCache] = None):
+        self.pool = pool
+        self.provider = pool.provider
+        self.cache = cache
         
         if self.provider == "openai":
-            self.client = AsyncOpenAI(api_key=settings.openai_api_key)
             self.model = settings.llm_model
         else:
-            self.client = AsyncAnthropic(api_key=settings.anthropic_api_key)
             self.model = "claude-3-sonnet-20240229"
     
     async def analyze_business(
         self,
         description: str,
-        examples: Optional[List[Dict]] = None
+        examples: Optional[List[Dict]] = None,
+        bypass_cache: bool = False
     ) -> EventStormResult:
         """비즈니스 설명 → 이벤트 스토밍 결과"""
         
         prompt = self._build_prompt(description, examples)
         
         try:
-            if self.provider == "openai":
-                response = await self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[
-                        {"role": "system", "content": EVENT_STORM_SYSTEM_PROMPT},
-                        {"role": "user", "content": prompt}
-                    ],
-                    response_format={"type": "json_object"},
-                    temperature=settings.llm_temperature
-                )
-                raw_json = response.choices[0].message.content
-            else:
-                # Anthropic Claude
-                response = await self.client.messages.create(
-                    model=self.model,
-                    max_tokens=4096,
-                    temperature=settings.llm_temperature,
-                    system=EVENT_STORM_SYSTEM_PROMPT,
-                    messages=[
-                        {"role": "user", "content": prompt}
-                    ]
-                )
-                raw_json = response.content[0].text
-            
-            # JSON 파싱 및 Pydantic 검증
-            parsed = json.loads(raw_json)
-            result = EventStormResult.model_validate(parsed)
-            
+            result = await self._generate(prompt, bypass_cache)
             logger.info(f"이벤트 스토밍 성공: {len(result.aggregates)}개 Aggregate")
             return result
             
@@ -102,13 +118,99 @@ class LLMService:
             logger.error(f"LLM 분석 실패: {e}")
             raise
     
+    async def analyze_map_reduce(
+        self,
+        description: str,
+        examples: Optional[List[Dict]] = None,
+        bypass_cache: bool = False,
+        max_section_chars: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        force_split: bool = False
+    ) -> EventStormResult:
+        """긴 문서 → 섹션별 동시 분석(map) → 중복 제거 병합(reduce)
+        
+        섹션은 병렬로(최대 concurrency 개) 분석하고 결과는 문서 순서로 병합하므로
+        완료 순서와 상관없이 같은 입력이면 같은 결과가 나온다. 섹션마다 따로 캐시된다.
+        한 섹션이 실패하면 나머지 섹션 호출은 취소해 풀 자리를 바로 돌려준다.
+        force_split=True 면 max_section_chars 보다 짧아도 제목(없으면 문단)마다 나눈다.
+        """
+        sections = split_sections(
+            description, max_section_chars or settings.llm_section_max_chars, force=force_split
+        )
+        if len(sections) == 1:
+            return await self.analyze_business(description, examples, bypass_cache)
+        
+        semaphore = asyncio.Semaphore(concurrency or settings.llm_map_concurrency)
+        
+        async def analyze_section(section: str) -> EventStormResult:
+            async with semaphore:
+                return await self._generate(self._build_prompt(section, examples, partial=True), bypass_cache)
+        
+        tasks = [asyncio.create_task(analyze_section(s)) for s in sections]
+        try:
+            results = await asyncio.gather(*tasks)
+        except Exception as e:
+            logger.error(f"LLM 섹션 분석 실패: {e}")
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        result = merge_results(results)
+        logger.info(
+            f"이벤트 스토밍 map-reduce 성공: 섹션 {len(sections)}개 → {len(result.aggregates)}개 Aggregate"
+        )
+        return result
+    
+    async def analyze_business_stream(
+        self,
+        description: str,
+        examples: Optional[List[Dict]] = None,
+        bypass_cache: bool = False
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """비즈니스 설명 → 완성·검증되는 대로 ("aggregate", Aggregate) / ("policy", Policy)
+        
+        검증에 실패한 원소는 ("invalid", {...}) 로 알리고 건너뛴다.
+        마지막은 전체 검증을 통과한 ("result", EventStormResult) 이며 이 결과만 캐시한다.
+        """
+        prompt = self._build_prompt(description, examples)
+        key, cached = await self._lookup(prompt, bypass_cache)
+        if cached is not None:
+            for aggregate in cached.aggregates:
+                yield "aggregate", aggregate
+            for policy in cached.policies:
+                yield "policy", policy
+            yield "result", cached
+            return
+        
+        parser = IncrementalArrayParser(STREAMED_FIELDS)
+        async for delta in self._stream(prompt):
+            for field, raw in parser.feed(delta):
+                name, model = STREAMED_FIELDS[field]
+                try:
+                    item = model.model_validate(json.loads(raw))
+                except ValueError as e:
+                    # JSONDecodeError, ValidationError 모두 ValueError
+                    yield "invalid", {"field": field, "error": str(e)}
+                    continue
+                yield name, item
+        
+        raw_json = parser.document
+        result = EventStormResult.model_validate(json.loads(raw_json))
+        if key:
+            await self.cache.set(key, raw_json)
+        logger.info(f"이벤트 스토밍 스트리밍 성공: {len(result.aggregates)}개 Aggregate")
+        yield "result", result
+    
     def _build_prompt(
         self,
         description: str,
-        examples: Optional[List[Dict]] = None
+        examples: Optional[List[Dict]] = None,
+        partial: bool = False
     ) -> str:
-        """프롬프트 구성"""
+        """프롬프트 구성 (partial: 긴 문서의 한 섹션)"""
         prompt = f"## 비즈니스 설명\n{description}\n\n"
+        if partial:
+            prompt += "이 설명은 더 긴 문서의 일부입니다. 이 부분에 나타난 요소만 추출하세요.\n\n"
         
         if examples:
             prompt += "## 참고 예제\n"
@@ -122,7 +224,8 @@ class LLMService:
     async def refine_result(
         self,
         current_result: EventStormResult,
-        feedback: str
+        feedback: str,
+        bypass_cache: bool = False
     ) -> EventStormResult:
         """사용자 피드백으로 결과 개선"""
         
@@ -135,29 +238,141 @@ class LLMService:
 
 피드백을 반영하여 수정된 전체 결과를 JSON으로 출력하세요:
 """
+        return await self._generate(prompt, bypass_cache)
+    
+    async def refine_delta(
+        self,
+        current_result: EventStormResult,
+        feedback: str,
+        bypass_cache: bool = False
+    ) -> EventStormResult:
+        """사용자 피드백 → 변경 patch 만 생성해 로컬에서 적용
         
-        if self.provider == "openai":
-            response = await self.client.chat.completions.create(
+        관련 Aggregate/Policy 상세와 전체 이름 개요만 보내므로 프롬프트와 응답 크기가
+        모델 전체 크기가 아니라 변경 범위에 비례한다. patch 를 적용할 수 없거나 적용 결과가
+        검증에 실패하면 전체 재생성(refine_result)으로 대체한다.
+        """
+        prompt = f"""
+현재 모델:
+{context_json(select_context(current_result, feedback))}
+
+사용자 피드백:
+{feedback}
+
+피드백을 반영하는 변경 사항을 patch JSON으로 출력하세요:
+"""
+        try:
+            patch = await self._generate(prompt, bypass_cache, PATCH_SYSTEM_PROMPT, EventStormPatch)
+            result = apply_patch(current_result, patch)
+        except ValueError as e:
+            # 잘못된 patch JSON(JSONDecodeError), PatchError, ValidationError 모두 ValueError
+            logger.warning(f"patch 적용 실패, 전체 재생성으로 대체: {e}")
+            return await self.refine_result(current_result, feedback, bypass_cache)
+        logger.info(f"delta refine: 변경 {len(patch.operations)}건 적용")
+        return result
+    
+    async def _lookup(
+        self,
+        prompt: str,
+        bypass_cache: bool = False,
+        system_prompt: str = EVENT_STORM_SYSTEM_PROMPT,
+        response_model=EventStormResult
+    ) -> Tuple[Optional[str], Optional[Any]]:
+        """캐시 키와 (있으면) 캐시된 결과"""
+        if not self.cache:
+            return None, None
+        key = cache_key(
+            self.provider,
+            self.model,
+            settings.llm_temperature,
+            system_prompt,
+            prompt
+        )
+        if bypass_cache:
+            self.cache.bypassed += 1
+            return key, None
+        cached = await self.cache.get(key)
+        if cached is None:
+            return key, None
+        return key, response_model.model_validate(json.loads(cached))
+    
+    async def _generate(
+        self,
+        prompt: str,
+        bypass_cache: bool = False,
+        system_prompt: str = EVENT_STORM_SYSTEM_PROMPT,
+        response_model=EventStormResult
+    ):
+        """캐시 조회 → (없으면) LLM 호출 → 검증 → 캐시 저장"""
+        key, cached = await self._lookup(prompt, bypass_cache, system_prompt, response_model)
+        if cached is not None:
+            return cached
+        
+        raw_json = await self._complete(prompt, system_prompt)
+        
+        # JSON 파싱 및 Pydantic 검증 (통과한 응답만 캐시)
+        result = response_model.model_validate(json.loads(raw_json))
+        if key:
+            await self.cache.set(key, raw_json)
+        return result
+    
+    async def _complete(self, prompt: str, system_prompt: str = EVENT_STORM_SYSTEM_PROMPT) -> str:
+        """프로바이더 호출 → 원문 JSON"""
+        async with self.pool.slot() as client:
+            if self.provider == "openai":
+                response = await client.chat.completions.create(
+                    model=self.model,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": prompt}
+                    ],
+                    response_format={"type": "json_object"},
+                    temperature=settings.llm_temperature
+                )
+                return response.choices[0].message.content
+            
+            # Anthropic Claude
+            response = await client.messages.create(
                 model=self.model,
+                max_tokens=4096,
+                temperature=settings.llm_temperature,
+                system=system_prompt,
                 messages=[
-                    {"role": "system", "content": EVENT_STORM_SYSTEM_PROMPT},
                     {"role": "user", "content": prompt}
-                ],
-                response_format={"type": "json_object"},
-                temperature=settings.llm_temperature
+                ]
             )
-            raw_json = response.choices[0].message.content
-        else:
-            response = await self.client.messages.create(
+            return response.content[0].text
+    
+    async def _stream(self, prompt: str) -> AsyncIterator[str]:
+        """프로바이더 토큰 스트림 → 텍스트 조각"""
+        async with self.pool.slot() as client:
+            if self.provider == "openai":
+                stream = await client.chat.completions.create(
+                    model=self.model,
+                    messages=[
+                        {"role": "system", "content": EVENT_STORM_SYSTEM_PROMPT},
+                        {"role": "user", "content": prompt}
+                    ],
+                    response_format={"type": "json_object"},
+                    temperature=settings.llm_temperature,
+                    stream=True
+                )
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+                return
+            
+            # Anthropic Claude
+            stream = await client.messages.create(
                 model=self.model,
                 max_tokens=4096,
                 temperature=settings.llm_temperature,
                 system=EVENT_STORM_SYSTEM_PROMPT,
                 messages=[
                     {"role": "user", "content": prompt}
-                ]
+                ],
+                stream=True
             )
-            raw_json = response.content[0].text
-        
-        parsed = json.loads(raw_json)
-        return EventStormResult.model_validate(parsed)
+            async for event in stream:
+                if event.type == "content_block_delta" and event.delta.text:
+                    yield event.delta.text
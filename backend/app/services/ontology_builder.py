@@ -1,21 +1,269 @@
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 import logging
 import json
+import time
 
 from app.db.neo4j_client import Neo4jClient
-from app.models.event_storm import EventStormResult, Aggregate, Policy
+from app.db.schema import ensure_instance_indexes
+from app.services.command_registry import CommandRegistry
+from app.services.projection_engine import ProjectionEngine
+from app.services.saga_dispatcher import SagaDispatcher
+from app.services.transformation_engine import TransformationEngine
+from app.models.event_storm import EventStormResult, Aggregate, Command, Policy, ReadModel
 from app.models.ontology import ObjectType, LinkType, Transformation, PropertyDef
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_TRANSFORMATION_LOGIC = 'SET aggregate.last_event = $event_name, aggregate.updated_at = timestamp()'
+
+# 벌크 빌드용 UNWIND 쿼리 (단계 이름, 쿼리)
+BULK_OBJECT_TYPES_QUERY = """
+UNWIND $rows AS row
+MERGE (ot:ObjectType {name: row.name})
+SET ot.properties_json = row.properties_json,
+    ot.invariants = row.invariants,
+    ot.layer = 'semantic',
+    ot.updated_at = timestamp()
+"""
+
+BULK_COMMANDS_QUERY = """
+UNWIND $rows AS row
+MATCH (ot:ObjectType {name: row.agg_name})
+MERGE (c:Command {name: row.cmd_name, aggregate: row.agg_name})
+SET c.parameters_json = row.params_json
+MERGE (ot)-[:HAS_COMMAND]->(c)
+"""
+
+BULK_EVENTS_QUERY = """
+UNWIND $rows AS row
+MATCH (ot:ObjectType {name: row.agg_name})
+MERGE (e:EventType {name: row.evt_name, aggregate: row.agg_name})
+SET e.data_schema_json = row.data_json
+MERGE (ot)-[:EMITS]->(e)
+"""
+
+BULK_LINK_TYPES_QUERY = """
+UNWIND $rows AS row
+MATCH (from:ObjectType {name: row.from_type})
+MATCH (to:ObjectType {name: row.to_type})
+MERGE (from)-[link:LINK_TYPE {name: row.name}]->(to)
+SET link.cardinality = row.cardinality,
+    link.layer = 'semantic'
+"""
+
+BULK_TRANSFORMATIONS_QUERY = """
+UNWIND $rows AS row
+MATCH (ot:ObjectType {name: row.agg_name})
+MERGE (trans:Transformation {name: row.trans_name})
+SET trans.trigger = row.event_name,
+    trans.layer = 'kinetic',
+    trans.logic = row.logic
+MERGE (ot)-[:HAS_TRANSFORMATION]->(trans)
+"""
+
+BULK_READ_MODELS_QUERY = """
+UNWIND $rows AS row
+MERGE (rm:ReadModel {name: row.name})
+SET rm.source_events = row.source_events,
+    rm.projections_json = row.projections_json,
+    rm.layer = 'semantic'
+"""
+
+BULK_POLICIES_QUERY = """
+UNWIND $rows AS row
+MERGE (p:Policy {name: row.name})
+SET p.trigger_event = row.trigger_event,
+    p.actions = row.actions,
+    p.description = row.description,
+    p.layer = 'kinetic'
+"""
+
+# 증분 빌드: 현재 온톨로지 스냅샷 조회 (벌크 파라미터 행과 같은 컬럼명)
+SNAPSHOT_QUERIES = {
+    'object_types': """
+    MATCH (ot:ObjectType)
+    RETURN ot.name AS name, ot.properties_json AS properties_json, ot.invariants AS invariants
+    """,
+    'commands': """
+    MATCH (ot:ObjectType)-[:HAS_COMMAND]->(c:Command)
+    RETURN ot.name AS agg_name, c.name AS cmd_name, c.parameters_json AS params_json
+    """,
+    'events': """
+    MATCH (ot:ObjectType)-[:EMITS]->(e:EventType)
+    RETURN ot.name AS agg_name, e.name AS evt_name, e.data_schema_json AS data_json
+    """,
+    'link_types': """
+    MATCH (from:ObjectType)-[link:LINK_TYPE]->(to:ObjectType)
+    RETURN link.name AS name, from.name AS from_type, to.name AS to_type, link.cardinality AS cardinality
+    """,
+    'transformations': """
+    MATCH (ot:ObjectType)-[:HAS_TRANSFORMATION]->(t:Transformation)
+    RETURN ot.name AS agg_name, t.name AS trans_name, t.trigger AS event_name, t.logic AS logic
+    """,
+    'read_models': """
+    MATCH (rm:ReadModel)
+    RETURN rm.name AS name, rm.source_events AS source_events, rm.projections_json AS projections_json
+    """,
+    'policies': """
+    MATCH (p:Policy)
+    RETURN p.name AS name, p.trigger_event AS trigger_event, p.actions AS actions, p.description AS description
+    """,
+}
+
+# 증분 빌드: 제거 쿼리
+DELETE_QUERIES = {
+    'object_types': """
+    UNWIND $rows AS row
+    MATCH (ot:ObjectType {name: row.name})
+    DETACH DELETE ot
+    """,
+    'commands': """
+    UNWIND $rows AS row
+    MATCH (c:Command {name: row.cmd_name, aggregate: row.agg_name})
+    DETACH DELETE c
+    """,
+    'events': """
+    UNWIND $rows AS row
+    MATCH (e:EventType {name: row.evt_name, aggregate: row.agg_name})
+    DETACH DELETE e
+    """,
+    'link_types': """
+    UNWIND $rows AS row
+    MATCH (:ObjectType {name: row.from_type})-[link:LINK_TYPE {name: row.name}]->(:ObjectType {name: row.to_type})
+    DELETE link
+    """,
+    'transformations': """
+    UNWIND $rows AS row
+    MATCH (t:Transformation {name: row.trans_name})
+    DETACH DELETE t
+    """,
+    'read_models': """
+    UNWIND $rows AS row
+    MATCH (rm:ReadModel {name: row.name})
+    DETACH DELETE rm
+    """,
+    'policies': """
+    UNWIND $rows AS row
+    MATCH (p:Policy {name: row.name})
+    DETACH DELETE p
+    """,
+}
+
+# 제거 대상 ObjectType 중 DynamicInstance 가 남아 있는 것
+OBJECT_TYPES_IN_USE_QUERY = """
+UNWIND $rows AS row
+MATCH (ot:ObjectType {name: row.name})
+WHERE EXISTS { (:DynamicInstance)-[:INSTANCE_OF]->(ot) }
+RETURN ot.name AS name
+"""
+
+# prune=true: ObjectType 과 함께 인스턴스, 이벤트 로그, 스냅샷까지 제거
+PRUNE_OBJECT_TYPES_QUERY = """
+UNWIND $rows AS row
+MATCH (ot:ObjectType {name: row.name})
+OPTIONAL MATCH (inst:DynamicInstance)-[:INSTANCE_OF]->(ot)
+OPTIONAL MATCH (inst)-[:EMITTED|HAS_SNAPSHOT]->(owned)
+DETACH DELETE owned, inst, ot
+"""
+
+# 이전 버전의 CREATE 로 중복 생성된 Transformation 정리
+DEDUPE_TRANSFORMATIONS_QUERY = """
+MATCH (t:Transformation)
+WITH t.name AS name, collect(t) AS nodes
+WHERE size(nodes) > 1
+UNWIND tail(nodes) AS dup
+DETACH DELETE dup
+"""
+
+# 단계별 (식별 키, 비교 값) 컬럼
+DIFF_FIELDS = {
+    'object_types': (('name',), ('properties_json', 'invariants')),
+    'commands': (('agg_name', 'cmd_name'), ('params_json',)),
+    'events': (('agg_name', 'evt_name'), ('data_json',)),
+    'link_types': (('name', 'from_type', 'to_type'), ('cardinality',)),
+    'transformations': (('trans_name',), ('agg_name', 'event_name', 'logic')),
+    'read_models': (('name',), ('source_events', 'projections_json')),
+    'policies': (('name',), ('trigger_event', 'actions', 'description')),
+}
+
+# 제거는 의존 관계 역순으로
+DELETE_ORDER = ['policies', 'read_models', 'link_types', 'transformations', 'commands', 'events', 'object_types']
+
+class ObjectTypeInUse(Exception):
+    """증분 빌드가 인스턴스가 남아 있는 ObjectType 을 제거하려 함 (prune=True 로만 허용)"""
+
+    def __init__(self, names: List[str]):
+        self.names = names
+        super().__init__(
+            f"ObjectType still has instances: {', '.join(names)} (pass prune=true to delete them)"
+        )
+
+
 class OntologyBuilder:
     """이벤트 스토밍 → Palantir 온톨로지 변환"""
     
-    def __init__(self, neo4j: Neo4jClient):
+    def __init__(
+        self,
+        neo4j: Neo4jClient,
+        command_registry: Optional[CommandRegistry] = None,
+        projection_engine: Optional[ProjectionEngine] = None,
+        saga_dispatcher: Optional[SagaDispatcher] = None,
+        transformation_engine: Optional[TransformationEngine] = None
+    ):
         self.neo4j = neo4j
+        self.command_registry = command_registry
+        self.projection_engine = projection_engine
+        self.saga_dispatcher = saga_dispatcher
+        self.transformation_engine = transformation_engine
     
-    async def build(self, event_storm: EventStormResult):
-        """3-Layer 온톨로지 생성"""
+    async def build(
+        self,
+        event_storm: EventStormResult,
+        bulk: bool = True,
+        incremental: bool = False,
+        prune: bool = False
+    ):
+        """3-Layer 온톨로지 생성
+
+        bulk=True 이면 모든 노드/관계를 파라미터 리스트로 모아
+        단일 트랜잭션 안에서 UNWIND 쿼리 몇 개로 기록한다.
+        incremental=True 이면 현재 온톨로지와 비교해 변경분만 반영한다.
+        인스턴스가 남은 ObjectType 의 제거는 ObjectTypeInUse 로 거부하며,
+        prune=True 일 때만 인스턴스/이벤트/스냅샷과 함께 지운다.
+        빌드 후 Command 레지스트리, Read Model, Policy, Transformation 을 다시 로드한다.
+        """
+        if self.command_registry:
+            self.command_registry.invalidate()
+
+        if incremental:
+            result = await self.build_incremental(event_storm, prune=prune)
+        elif bulk:
+            result = await self.build_bulk(event_storm)
+        else:
+            result = await self._build_per_element(event_storm)
+
+        # 인스턴스 keyset / filterable 필드 인덱스 (DDL 은 데이터 쓰기와 별도 트랜잭션)
+        created = []
+        for agg in event_storm.aggregates:
+            created += await ensure_instance_indexes(
+                self.neo4j,
+                agg.name,
+                [f for f in agg.filterable if f in agg.state]
+            )
+        result['indexes_created'] = created
+
+        if self.command_registry:
+            await self.command_registry.load(self.neo4j)
+        if self.projection_engine:
+            await self.projection_engine.load()
+        if self.saga_dispatcher:
+            await self.saga_dispatcher.load()
+        if self.transformation_engine:
+            await self.transformation_engine.load()
+        return result
+
+    async def _build_per_element(self, event_storm: EventStormResult):
+        """요소별 개별 쓰기 빌드"""
         logger.info("온톨로지 빌드 시작...")
         
         # 1. Semantic Layer: ObjectType 생성
@@ -30,24 +278,225 @@ class OntologyBuilder:
         for agg in event_storm.aggregates:
             await self._create_transformations(agg)
         
+        # 4. 읽기 모델 (CQRS) 정의
+        await self._create_read_models(event_storm.read_models)
+
+        # 5. Policy 정의 (saga 디스패처가 로드)
+        if event_storm.policies:
+            await self.neo4j.execute_write(BULK_POLICIES_QUERY, {
+                'rows': [self._policy_row(policy) for policy in event_storm.policies]
+            })
+
         logger.info("온톨로지 빌드 완료!")
         return {"status": "success", "aggregates": len(event_storm.aggregates)}
+
+    async def build_bulk(self, event_storm: EventStormResult):
+        """UNWIND 기반 벌크 빌드 (단계별 소요 시간 포함)"""
+        logger.info("온톨로지 벌크 빌드 시작...")
+        timings: Dict[str, float] = {}
+
+        started = time.perf_counter()
+        phases = self._collect_bulk_rows(event_storm)
+        timings['collect'] = _elapsed_ms(started)
+
+        statements = 0
+        async with self.neo4j.transaction() as tx:
+            for phase, query, rows in phases:
+                if not rows:
+                    timings[phase] = 0.0
+                    continue
+                phase_started = time.perf_counter()
+                result = await tx.run(query, {'rows': rows})
+                await result.consume()
+                timings[phase] = _elapsed_ms(phase_started)
+                statements += 1
+        timings['total'] = _elapsed_ms(started)
+
+        logger.info(f"온톨로지 벌크 빌드 완료: {statements}개 쿼리, {timings['total']}ms")
+        return {
+            "status": "success",
+            "mode": "bulk",
+            "aggregates": len(event_storm.aggregates),
+            "statements": statements,
+            "counts": {phase: len(rows) for phase, _, rows in phases},
+            "timings_ms": timings
+        }
+
+    async def build_incremental(self, event_storm: EventStormResult, prune: bool = False):
+        """현재 온톨로지와 diff 하여 추가/변경/제거분만 기록"""
+        logger.info("온톨로지 증분 빌드 시작...")
+        timings: Dict[str, float] = {}
+        started = time.perf_counter()
+
+        desired = {
+            phase: (query, rows)
+            for phase, query, rows in self._collect_bulk_rows(event_storm)
+        }
+        changes: Dict[str, Dict[str, List]] = {}
+        statements = 0
+
+        async with self.neo4j.transaction() as tx:
+            # 1. 현재 상태 스냅샷 (같은 트랜잭션 안에서 읽어 diff 와 쓰기가 일관되게)
+            snapshot_started = time.perf_counter()
+            current: Dict[str, List[Dict]] = {}
+            for phase, query in SNAPSHOT_QUERIES.items():
+                result = await tx.run(query)
+                current[phase] = await result.data()
+            timings['snapshot'] = _elapsed_ms(snapshot_started)
+
+            # 2. diff
+            diff_started = time.perf_counter()
+            plan: Dict[str, Tuple[List[Dict], List[Dict], List[Dict]]] = {}
+            for phase, (key_fields, value_fields) in DIFF_FIELDS.items():
+                plan[phase] = _diff_rows(current[phase], desired[phase][1], key_fields, value_fields)
+            has_duplicates = _has_duplicate_keys(current['transformations'], DIFF_FIELDS['transformations'][0])
+            timings['diff'] = _elapsed_ms(diff_started)
+
+            # 3. 인스턴스가 남은 ObjectType 제거는 prune 일 때만 (예외로 트랜잭션 롤백)
+            removed_types = plan['object_types'][2]
+            if removed_types and not prune:
+                result = await tx.run(OBJECT_TYPES_IN_USE_QUERY, {'rows': removed_types})
+                in_use = [record['name'] for record in await result.data()]
+                if in_use:
+                    raise ObjectTypeInUse(in_use)
+
+            # 4. 변경분 쓰기: 제거 → 추가/변경
+            write_started = time.perf_counter()
+            if has_duplicates:
+                result = await tx.run(DEDUPE_TRANSFORMATIONS_QUERY)
+                await result.consume()
+                statements += 1
+            for phase in DELETE_ORDER:
+                removed = plan[phase][2]
+                if removed:
+                    query = PRUNE_OBJECT_TYPES_QUERY if phase == 'object_types' and prune else DELETE_QUERIES[phase]
+                    result = await tx.run(query, {'rows': removed})
+                    await result.consume()
+                    statements += 1
+            for phase, (query, _) in desired.items():
+                added, updated, _ = plan[phase]
+                if added or updated:
+                    result = await tx.run(query, {'rows': added + updated})
+                    await result.consume()
+                    statements += 1
+            timings['write'] = _elapsed_ms(write_started)
+
+        for phase, (added, updated, removed) in plan.items():
+            key_fields = DIFF_FIELDS[phase][0]
+            changes[phase] = {
+                'added': [_row_label(row, key_fields) for row in added],
+                'updated': [_row_label(row, key_fields) for row in updated],
+                'removed': [_row_label(row, key_fields) for row in removed],
+            }
+        timings['total'] = _elapsed_ms(started)
+
+        changed = sum(len(names) for phase in changes.values() for names in phase.values())
+        logger.info(f"온톨로지 증분 빌드 완료: {changed}개 변경, {statements}개 쿼리, {timings['total']}ms")
+        return {
+            "status": "success",
+            "mode": "incremental",
+            "aggregates": len(event_storm.aggregates),
+            "statements": statements,
+            "changes": changes,
+            "timings_ms": timings
+        }
+
+    def _collect_bulk_rows(
+        self,
+        event_storm: EventStormResult
+    ) -> List[Tuple[str, str, List[Dict]]]:
+        """이벤트 스토밍 결과 → 단계별 UNWIND 파라미터 리스트"""
+        object_types, commands, events, transformations = [], [], [], []
+
+        for agg in event_storm.aggregates:
+            object_types.append({
+                'name': agg.name,
+                'properties_json': json.dumps(self._property_defs(agg)),
+                'invariants': agg.invariants
+            })
+            for cmd in agg.commands:
+                commands.append({
+                    'agg_name': agg.name,
+                    'cmd_name': cmd.name,
+                    'params_json': self._command_params_json(cmd)
+                })
+            for evt in agg.events:
+                events.append({
+                    'agg_name': agg.name,
+                    'evt_name': evt.name,
+                    'data_json': json.dumps(evt.data)
+                })
+                transformations.append({
+                    'agg_name': agg.name,
+                    'trans_name': f"{agg.name}_{evt.name}_handler",
+                    'event_name': evt.name,
+                    'logic': DEFAULT_TRANSFORMATION_LOGIC
+                })
+
+        links = []
+        for policy in event_storm.policies:
+            resolved = self._resolve_policy_link(policy, event_storm)
+            if resolved:
+                source_agg, target_agg = resolved
+                links.append({
+                    'name': policy.name.upper(),
+                    'from_type': source_agg.name,
+                    'to_type': target_agg.name,
+                    'cardinality': "1:N"
+                })
+
+        return [
+            ('object_types', BULK_OBJECT_TYPES_QUERY, object_types),
+            ('commands', BULK_COMMANDS_QUERY, commands),
+            ('events', BULK_EVENTS_QUERY, events),
+            ('link_types', BULK_LINK_TYPES_QUERY, links),
+            ('transformations', BULK_TRANSFORMATIONS_QUERY, transformations),
+            ('read_models', BULK_READ_MODELS_QUERY, [
+                self._read_model_row(rm) for rm in event_storm.read_models
+            ]),
+            ('policies', BULK_POLICIES_QUERY, [
+                self._policy_row(policy) for policy in event_storm.policies
+            ]),
+        ]
+
+    @staticmethod
+    def _property_defs(agg: Aggregate) -> Dict[str, Dict]:
+        """상태를 PropertyDef로 변환"""
+        defs = {}
+        for field, field_type in agg.state.items():
+            defs[field] = {'type': field_type, 'required': True}
+            if field in agg.filterable:
+                defs[field]['filterable'] = True
+        return defs
+
+    @staticmethod
+    def _policy_row(policy: Policy) -> Dict:
+        return {
+            'name': policy.name,
+            'trigger_event': policy.trigger_event,
+            'actions': policy.actions,
+            'description': policy.description
+        }
+
+    @staticmethod
+    def _read_model_row(read_model: ReadModel) -> Dict:
+        return {
+            'name': read_model.name,
+            'source_events': read_model.source_events,
+            'projections_json': json.dumps(read_model.projections, sort_keys=True)
+        }
+
+    @staticmethod
+    def _command_params_json(cmd: Command) -> str:
+        return json.dumps([p if isinstance(p, dict) else {"name": p, "type": "any"} for p in cmd.parameters])
     
     async def _create_object_type(self, agg: Aggregate):
         """Aggregate → Neo4j ObjectType"""
         
-        # 상태를 PropertyDef로 변환
-        properties = {}
-        for field, field_type in agg.state.items():
-            properties[field] = {
-                'type': field_type,
-                'required': True
-            }
-        
         # ObjectType 노드 생성
         await self.neo4j.create_object_type(
             name=agg.name,
-            properties=properties,
+            properties=self._property_defs(agg),
             invariants=agg.invariants
         )
         
@@ -62,7 +511,7 @@ class OntologyBuilder:
             await self.neo4j.execute_write(query, {
                 'agg_name': agg.name,
                 'cmd_name': cmd.name,
-                'params_json': json.dumps([p if isinstance(p, dict) else {"name": p, "type": "any"} for p in cmd.parameters])
+                'params_json': self._command_params_json(cmd)
             })
 
         # Events 저장
@@ -81,12 +530,12 @@ class OntologyBuilder:
         
         logger.info(f"ObjectType 생성: {agg.name}")
     
-    async def _create_link_from_policy(
-        self,
+    @staticmethod
+    def _resolve_policy_link(
         policy: Policy,
         event_storm: EventStormResult
-    ):
-        """Policy → LinkType"""
+    ) -> Optional[Tuple[Aggregate, Aggregate]]:
+        """Policy의 (트리거 이벤트 발행 Aggregate, 첫 액션 수신 Aggregate) 찾기"""
         # Policy: OrderPlaced → CreateShipment
         # 의미: Order -[TRIGGERS]-> Shipment
         
@@ -98,11 +547,11 @@ class OntologyBuilder:
                 break
         
         if not source_agg:
-            return
+            return None
         
         # 첫 번째 액션(Command)을 받는 Aggregate 찾기
         if not policy.actions:
-            return
+            return None
         
         target_cmd = policy.actions[0]
         target_agg = None
@@ -112,7 +561,20 @@ class OntologyBuilder:
                 break
         
         if not target_agg or source_agg.name == target_agg.name:
+            return None
+
+        return source_agg, target_agg
+
+    async def _create_link_from_policy(
+        self,
+        policy: Policy,
+        event_storm: EventStormResult
+    ):
+        """Policy → LinkType"""
+        resolved = self._resolve_policy_link(policy, event_storm)
+        if not resolved:
             return
+        source_agg, target_agg = resolved
         
         # LinkType 생성
         await self.neo4j.create_link_type(
@@ -131,17 +593,71 @@ class OntologyBuilder:
             # 기본 변환: 이벤트 발생 시 타임스탬프 업데이트
             query = """
             MATCH (ot:ObjectType {name: $agg_name})
-            CREATE (trans:Transformation {
-                name: $trans_name,
-                trigger: $event_name,
-                layer: 'kinetic',
-                logic: 'SET aggregate.last_event = $event_name, aggregate.updated_at = timestamp()'
-            })
-            CREATE (ot)-[:HAS_TRANSFORMATION]->(trans)
+            MERGE (trans:Transformation {name: $trans_name})
+            SET trans.trigger = $event_name,
+                trans.layer = 'kinetic',
+                trans.logic = $logic
+            MERGE (ot)-[:HAS_TRANSFORMATION]->(trans)
             """
             
             await self.neo4j.execute_write(query, {
                 'agg_name': agg.name,
                 'trans_name': f"{agg.name}_{evt.name}_handler",
-                'event_name': evt.name
+                'event_name': evt.name,
+                'logic': DEFAULT_TRANSFORMATION_LOGIC
             })
+
+    async def _create_read_models(self, read_models: List[ReadModel]):
+        """ReadModel → Neo4j ReadModel 정의 노드"""
+        if not read_models:
+            return
+        await self.neo4j.execute_write(BULK_READ_MODELS_QUERY, {
+            'rows': [self._read_model_row(rm) for rm in read_models]
+        })
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 2)
+
+
+def _row_key(row: Dict, key_fields: Tuple[str, ...]) -> Tuple:
+    return tuple(row.get(f) for f in key_fields)
+
+
+def _row_label(row: Dict, key_fields: Tuple[str, ...]) -> str:
+    return ".".join(str(v) for v in _row_key(row, key_fields))
+
+
+def _diff_rows(
+    current: List[Dict],
+    desired: List[Dict],
+    key_fields: Tuple[str, ...],
+    value_fields: Tuple[str, ...]
+) -> Tuple[List[Dict], List[Dict], List[Dict]]:
+    """(추가, 변경, 제거) 행 목록 계산"""
+    current_by_key = {_row_key(row, key_fields): row for row in current}
+    desired_by_key = {_row_key(row, key_fields): row for row in desired}
+
+    added, updated = [], []
+    for key, row in desired_by_key.items():
+        existing = current_by_key.get(key)
+        if existing is None:
+            added.append(row)
+        elif any(_normalize(existing.get(f)) != _normalize(row.get(f)) for f in value_fields):
+            updated.append(row)
+
+    removed = [row for key, row in current_by_key.items() if key not in desired_by_key]
+    return added, updated, removed
+
+
+def _has_duplicate_keys(rows: List[Dict], key_fields: Tuple[str, ...]) -> bool:
+    return len({_row_key(row, key_fields) for row in rows}) != len(rows)
+
+
+def _normalize(value):
+    # Neo4j 는 빈 리스트/None 을 구분하지 않고 돌려줄 수 있음
+    if value is None:
+        return []
+    if isinstance(value, tuple):
+        return list(value)
+    return value
@@ -0,0 +1,271 @@
+from typing import Any, Dict, List, Optional
+import asyncio
+import json
+import logging
+import time
+import zlib
+
+from app.db.neo4j_client import Neo4jClient
+
+logger = logging.getLogger(__name__)
+
+# 발행 대기 이벤트 (published 인덱스), Aggregate 타입은 EMITTED 로 연결된 인스턴스 라벨
+FETCH_UNPUBLISHED_QUERY = """
+MATCH (e:DomainEvent)
+WHERE e.published = false
+WITH e
+ORDER BY e.timestamp ASC, e.sequence ASC
+LIMIT $limit
+OPTIONAL MATCH (inst:DynamicInstance)-[:EMITTED]->(e)
+RETURN e, [label IN labels(inst) WHERE label <> 'DynamicInstance'][0] AS aggregate_type
+"""
+
+# (aggregate_id, sequence) 유니크 제약 인덱스로 찾아 발행 완료 표시
+MARK_PUBLISHED_QUERY = """
+UNWIND $keys AS key
+MATCH (e:DomainEvent {aggregate_id: key.aggregate_id, sequence: key.sequence})
+SET e.published = true,
+    e.published_at = timestamp()
+"""
+
+COUNT_UNPUBLISHED_QUERY = """
+MATCH (e:DomainEvent)
+WHERE e.published = false
+RETURN count(e) AS pending
+"""
+
+
+def outbox_message(event: Dict[str, Any], aggregate_type: Optional[str]) -> Dict[str, Any]:
+    """DomainEvent → 발행 메시지 (key = aggregate_id 로 파티션 고정)"""
+    payload = json.loads(event['payload_json']) if event.get('payload_json') else {}
+    return {
+        'key': event['aggregate_id'],
+        'value': {
+            'type': event['type'],
+            'aggregate_id': event['aggregate_id'],
+            'aggregate_type': aggregate_type,
+            'sequence': event['sequence'],
+            'timestamp': event.get('timestamp'),
+            'payload': payload
+        }
+    }
+
+
+class KafkaPublisher:
+    """aiokafka 프로듀서 (linger/배치 크기로 묶고 압축, 멱등 프로듀서로 파티션 내 순서 유지)"""
+
+    def __init__(
+        self,
+        bootstrap_servers: str,
+        topic: str,
+        compression_type: Optional[str] = "gzip",
+        linger_ms: int = 20,
+        max_batch_size: int = 65536
+    ):
+        self.bootstrap_servers = bootstrap_servers
+        self.topic = topic
+        self.compression_type = compression_type
+        self.linger_ms = linger_ms
+        self.max_batch_size = max_batch_size
+        self._producer = None
+
+    async def start(self):
+        from aiokafka import AIOKafkaProducer
+
+        self._producer = AIOKafkaProducer(
+            bootstrap_servers=self.bootstrap_servers,
+            compression_type=self.compression_type,
+            linger_ms=self.linger_ms,
+            max_batch_size=self.max_batch_size,
+            enable_idempotence=True,
+            acks='all'
+        )
+        await self._producer.start()
+
+    async def stop(self):
+        if self._producer:
+            await self._producer.stop()
+            self._producer = None
+
+    async def publish(self, messages: List[Dict[str, Any]]) -> List[Optional[Exception]]:
+        """배치 전송, 메시지별 실패 (성공이면 None)"""
+        futures = []
+        for message in messages:
+            futures.append(await self._producer.send(
+                self.topic,
+                value=json.dumps(message['value'], default=str).encode(),
+                key=message['key'].encode()
+            ))
+        results = await asyncio.gather(*futures, return_exceptions=True)
+        return [r if isinstance(r, Exception) else None for r in results]
+
+
+class InMemoryBroker:
+    """테스트용 프로세스 내 브로커 (key 해시 파티션, 파티션별 순서 보존)
+
+    fail_keys 에 넣은 key 의 메시지는 실패로 돌려준다. 멱등 프로듀서처럼 한 번의 publish 에서
+    key 하나가 실패하면 그 뒤의 같은 key 메시지도 쓰지 않고 실패로 돌려준다.
+    """
+
+    def __init__(self, topic: str = "domain-events", partitions: int = 3):
+        self.topic = topic
+        self.partitions: List[List[Dict[str, Any]]] = [[] for _ in range(partitions)]
+        self.fail_keys: set = set()
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    def partition_for(self, key: str) -> int:
+        return zlib.crc32(key.encode()) % len(self.partitions)
+
+    async def publish(self, messages: List[Dict[str, Any]]) -> List[Optional[Exception]]:
+        results: List[Optional[Exception]] = []
+        failed = set()
+        for message in messages:
+            if message['key'] in self.fail_keys or message['key'] in failed:
+                failed.add(message['key'])
+                results.append(RuntimeError(f"broker rejected {message['key']}"))
+                continue
+            self.partitions[self.partition_for(message['key'])].append(message)
+            results.append(None)
+        return results
+
+    def messages(self, key: Optional[str] = None) -> List[Dict[str, Any]]:
+        return [m for p in self.partitions for m in p if key is None or m['key'] == key]
+
+
+class OutboxMetrics:
+    def __init__(self):
+        self.published = 0
+        self.failed = 0
+        self.batches = 0
+        self.last_batch_ms: Optional[float] = None
+        self.last_lag_ms: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'published': self.published,
+            'failed': self.failed,
+            'batches': self.batches,
+            'last_batch_ms': self.last_batch_ms,
+            'last_lag_ms': self.last_lag_ms,
+            'last_error': self.last_error
+        }
+
+
+class OutboxRelay:
+    """published = false 인 DomainEvent 를 배치로 읽어 브로커에 발행하고 표시
+
+    브로커 확인 후에만 published = true 로 바꾸므로 최소 한 번 전달이다
+    (표시 전에 죽으면 재발행, 소비자는 (aggregate_id, sequence) 로 중복 제거).
+    Aggregate 별 순서: key = aggregate_id 로 같은 파티션에 보내고, 배치 전체를 Aggregate 마다
+    sequence 순으로 이어 붙여 브로커에 한 번에 보낸다 (멱등 프로듀서가 파티션 안 순서를 지킨다).
+    Aggregate 의 첫 실패 이후 이벤트는 성공으로 돌아와도 발행 표시하지 않으므로 다음 배치에서
+    실패한 이벤트부터 순서대로 다시 보낸다 (소비자는 중복 제거).
+    """
+
+    def __init__(
+        self,
+        neo4j: Neo4jClient,
+        publisher,
+        batch_size: int = 500,
+        poll_interval: float = 1.0
+    ):
+        self.neo4j = neo4j
+        self.publisher = publisher
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.metrics = OutboxMetrics()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._started = False
+
+    async def relay_once(self) -> int:
+        """한 배치 발행, 발행 완료 표시한 이벤트 수"""
+        records = await self.neo4j.execute(FETCH_UNPUBLISHED_QUERY, {'limit': self.batch_size})
+        if not records:
+            return 0
+        started = time.perf_counter()
+        events = [r['e'] for r in records]
+
+        # Aggregate 별 (sequence 순) 대기열
+        queues: Dict[str, List[Dict[str, Any]]] = {}
+        for record in records:
+            queues.setdefault(record['e']['aggregate_id'], []).append(record)
+        for queue in queues.values():
+            queue.sort(key=lambda r: r['e']['sequence'])
+
+        ordered = [record for queue in queues.values() for record in queue]
+        errors = await self.publisher.publish(
+            [outbox_message(r['e'], r['aggregate_type']) for r in ordered]
+        )
+
+        sent = []
+        failed = set()
+        for record, error in zip(ordered, errors):
+            event = record['e']
+            if event['aggregate_id'] in failed:
+                continue
+            if error is not None:
+                self.metrics.failed += 1
+                self.metrics.last_error = str(error)
+                failed.add(event['aggregate_id'])
+                continue
+            sent.append({'aggregate_id': event['aggregate_id'], 'sequence': event['sequence']})
+
+        if sent:
+            await self.neo4j.execute_write(MARK_PUBLISHED_QUERY, {'keys': sent})
+        self.metrics.published += len(sent)
+        self.metrics.batches += 1
+        self.metrics.last_batch_ms = round((time.perf_counter() - started) * 1000, 2)
+        if events[0].get('timestamp'):
+            self.metrics.last_lag_ms = round(max(0.0, time.time() * 1000 - events[0]['timestamp']), 2)
+        return len(sent)
+
+    async def handle(self, events: List[Dict[str, Any]]):
+        """EventPipeline 구독자: 새 이벤트가 커밋되면 폴링 대기 없이 릴레이를 깨운다"""
+        self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            try:
+                if not self._started:
+                    await self.publisher.start()
+                    self._started = True
+                relayed = await self.relay_once()
+                if relayed == self.batch_size:
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.metrics.last_error = str(e)
+                logger.error(f"아웃박스 릴레이 실패: {e}")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self):
+        self._task = asyncio.create_task(self._run(), name="outbox-relay")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._started:
+            await self.publisher.stop()
+            self._started = False
+
+    async def stats(self) -> Dict[str, Any]:
+        pending = await self.neo4j.execute(COUNT_UNPUBLISHED_QUERY)
+        return {
+            'running': self._task is not None and not self._task.done(),
+            'pending': pending[0]['pending'] if pending else 0,
+            **self.metrics.snapshot()
+        }
@@ -0,0 +1,236 @@
+from typing import Any, Callable, Dict, List, Optional
+import json
+import logging
+import re
+import time
+
+from app.db.neo4j_client import Neo4jClient
+from app.services.event_pipeline import event_payload
+
+logger = logging.getLogger(__name__)
+
+LOAD_READ_MODELS_QUERY = """
+MATCH (rm:ReadModel)
+RETURN rm.name AS name, rm.source_events AS source_events, rm.projections_json AS projections_json
+"""
+
+# 재구축: 원천 이벤트를 발생 순서대로 스트리밍
+REBUILD_EVENTS_QUERY = """
+MATCH (e:DomainEvent)
+WHERE e.type IN $types
+RETURN e
+ORDER BY e.timestamp ASC, e.sequence ASC
+"""
+
+# 이벤트 메타 필드 참조 ($aggregate_id 등)
+META_FIELDS = {'aggregate_id', 'aggregate_type', 'type', 'sequence', 'timestamp'}
+
+AGGREGATE_PATTERN = re.compile(r"^(count|sum)\((\w*)\)$")
+
+# (행, 이벤트, payload) → None
+Projector = Callable[[Dict[str, Any], Dict[str, Any], Dict[str, Any]], None]
+
+
+def compile_projection(field: str, expression: str) -> Projector:
+    """ReadModel.projections 의 식 하나 → 행 갱신 함수
+
+    - "key"          : payload[key] 가 있으면 복사
+    - "Event.key"    : 해당 이벤트일 때만 payload[key] 복사
+    - "$aggregate_id": 이벤트 메타 필드 ($type, $sequence, $timestamp ...)
+    - "count()"      : 적용된 이벤트 수
+    - "sum(key)"     : payload[key] 누적 합
+    """
+    expression = expression.strip()
+
+    match = AGGREGATE_PATTERN.match(expression)
+    if match:
+        func, key = match.groups()
+        if func == 'count':
+            def project(row, event, payload):
+                row[field] = row.get(field, 0) + 1
+        else:
+            def project(row, event, payload):
+                value = payload.get(key)
+                if isinstance(value, (int, float)):
+                    row[field] = row.get(field, 0) + value
+        return project
+
+    if expression.startswith('$') and expression[1:] in META_FIELDS:
+        meta = expression[1:]
+
+        def project(row, event, payload):
+            row[field] = event.get(meta)
+        return project
+
+    event_name, _, key = expression.rpartition('.')
+
+    def project(row, event, payload):
+        if event_name and event.get('type') != event_name:
+            return
+        if key in payload:
+            row[field] = payload[key]
+    return project
+
+
+class Projection:
+    """ReadModel 하나의 컴파일된 정의와 Aggregate 별 행 테이블"""
+
+    def __init__(self, name: str, source_events: List[str], projections: Dict[str, str]):
+        self.name = name
+        self.source_events = list(source_events)
+        self.projections = projections
+        self.projectors = [compile_projection(f, expr) for f, expr in projections.items()]
+        self.rows: Dict[str, Dict[str, Any]] = {}
+        # Aggregate 별 마지막 적용 sequence (중복 적용 방지)
+        self.positions: Dict[str, int] = {}
+
+    def apply(self, event: Dict[str, Any], payload: Dict[str, Any]) -> bool:
+        aggregate_id = event.get('aggregate_id')
+        sequence = event.get('sequence')
+        if sequence is not None and self.positions.get(aggregate_id, 0) >= sequence:
+            return False
+        row = self.rows.setdefault(aggregate_id, {'aggregate_id': aggregate_id})
+        for projector in self.projectors:
+            projector(row, event, payload)
+        if sequence is not None:
+            self.positions[aggregate_id] = sequence
+        return True
+
+    def reset(self):
+        self.rows = {}
+        self.positions = {}
+
+
+class ProjectionMetrics:
+    def __init__(self):
+        self.events_applied = 0
+        self.last_lag_ms: Optional[float] = None
+        self.max_lag_ms = 0.0
+        self.last_applied_at: Optional[float] = None
+        self.rebuilds: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, event: Dict[str, Any]):
+        self.events_applied += 1
+        now = time.time()
+        self.last_applied_at = now
+        if event.get('timestamp'):
+            # DomainEvent.timestamp 는 Neo4j timestamp() (epoch ms)
+            lag = max(0.0, now * 1000 - event['timestamp'])
+            self.last_lag_ms = round(lag, 2)
+            self.max_lag_ms = max(self.max_lag_ms, self.last_lag_ms)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'events_applied': self.events_applied,
+            'last_lag_ms': self.last_lag_ms,
+            'max_lag_ms': self.max_lag_ms,
+            'last_applied_at': self.last_applied_at,
+            'rebuilds': self.rebuilds
+        }
+
+
+class ProjectionEngine:
+    """ReadModel 을 프로세스 내 테이블로 물질화
+
+    DomainEvent 가 추가될 때마다(EventPipeline 구독) 원천 이벤트에 해당하는
+    ReadModel 만 증분 갱신하므로 조회는 그래프 탐색 없이 dict 조회다.
+    시작/온톨로지 빌드 시 정의를 로드하고, 정의가 바뀐 ReadModel 만 이벤트 로그에서 재구축한다.
+    """
+
+    def __init__(self, neo4j: Neo4jClient):
+        self.neo4j = neo4j
+        self.projections: Dict[str, Projection] = {}
+        self._by_event: Dict[str, List[Projection]] = {}
+        # 재구축 중 들어온 이벤트는 보류했다가 재구축 후 적용 (순서 보장)
+        self._rebuilding = False
+        self._pending: List[Dict[str, Any]] = []
+        self.metrics = ProjectionMetrics()
+
+    async def load(self):
+        """ReadModel 정의 로드 후 정의가 새로 생기거나 바뀐 것만 재구축
+
+        정의(source_events, projections)가 같은 Projection 은 객체를 그대로 유지하므로
+        온톨로지를 다시 빌드할 때마다 이벤트 로그 전체를 다시 읽지 않는다
+        (프로세스 시작 시에는 메모리 테이블이 비어 있으므로 전체를 물질화한다).
+        """
+        records = await self.neo4j.execute(LOAD_READ_MODELS_QUERY)
+        projections: Dict[str, Projection] = {}
+        changed: List[Projection] = []
+        for r in records:
+            source_events = list(r['source_events'] or [])
+            definitions = json.loads(r['projections_json']) if r['projections_json'] else {}
+            current = self.projections.get(r['name'])
+            if current and current.source_events == source_events and current.projections == definitions:
+                projections[r['name']] = current
+                continue
+            projection = Projection(r['name'], source_events, definitions)
+            projections[r['name']] = projection
+            changed.append(projection)
+
+        self.projections = projections
+        self.metrics.rebuilds = {
+            name: stats for name, stats in self.metrics.rebuilds.items() if name in projections
+        }
+        self._index()
+        await self._rebuild(changed)
+        logger.info(f"ReadModel 로드: {len(self.projections)}개, 재구축 {[p.name for p in changed]}")
+
+    def _index(self):
+        self._by_event = {}
+        for projection in self.projections.values():
+            for event_name in projection.source_events:
+                self._by_event.setdefault(event_name, []).append(projection)
+
+    async def rebuild(self, name: Optional[str] = None):
+        """이벤트 로그에서 처음부터 다시 물질화 (name 없으면 전체)"""
+        await self._rebuild([self.projections[name]] if name else list(self.projections.values()))
+
+    async def _rebuild(self, targets: List[Projection]):
+        if not targets:
+            return
+        started = time.perf_counter()
+        types = sorted({e for p in targets for e in p.source_events})
+        for projection in targets:
+            projection.reset()
+
+        count = 0
+        self._rebuilding = True
+        try:
+            async for record in self.neo4j.stream(REBUILD_EVENTS_QUERY, {'types': types}):
+                event = record['e']
+                payload = event_payload(event)
+                for projection in self._by_event.get(event.get('type'), []):
+                    if projection in targets:
+                        projection.apply(event, payload)
+                count += 1
+        finally:
+            self._rebuilding = False
+            pending, self._pending = self._pending, []
+            await self.handle(pending)
+
+        elapsed = round((time.perf_counter() - started) * 1000, 2)
+        for projection in targets:
+            self.metrics.rebuilds[projection.name] = {
+                'events': count,
+                'rows': len(projection.rows),
+                'elapsed_ms': elapsed,
+                'at': time.time()
+            }
+        logger.info(f"ReadModel 재구축: {[p.name for p in targets]}, 이벤트 {count}개, {elapsed}ms")
+
+    async def handle(self, events: List[Dict[str, Any]]):
+        """EventPipeline 구독자: 추가된 이벤트 증분 반영"""
+        if self._rebuilding:
+            self._pending.extend(events)
+            return
+        for event in events:
+            projections = self._by_event.get(event.get('type'))
+            if not projections:
+                continue
+            payload = event_payload(event)
+            for projection in projections:
+                if projection.apply(event, payload):
+                    self.metrics.record(event)
+
+    def get(self, name: str) -> Optional[Projection]:
+        return self.projections.get(name)
@@ -0,0 +1,276 @@
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from pathlib import Path
+import ast
+import logging
+import re
+import time
+
+import yaml
+
+from app.models.rule import (
+    Action,
+    GivenCondition,
+    NestedCondition,
+    Rule,
+    RuleExecutionContext,
+    RuleExecutionResult
+)
+
+logger = logging.getLogger(__name__)
+
+# 조건식에서 허용하는 AST 노드 (이름/상수 비교와 산술, 논리 연산만)
+ALLOWED_NODES = (
+    ast.Expression, ast.BoolOp, ast.And, ast.Or, ast.UnaryOp, ast.Not, ast.USub,
+    ast.Compare, ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.In, ast.NotIn,
+    ast.BinOp, ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Mod,
+    ast.Name, ast.Load, ast.Constant, ast.List, ast.Tuple,
+)
+
+# (현재 상태) → bool
+Predicate = Callable[[Dict[str, Any]], bool]
+
+# then 액션 실행기 (action 이름별 등록)
+ActionHandler = Callable[[Action, RuleExecutionContext], Awaitable[None]]
+
+
+class RuleCompileError(ValueError):
+    """허용되지 않는 조건식"""
+
+
+class _State(dict):
+    """없는 필드는 None"""
+
+    def __missing__(self, key):
+        return None
+
+
+def event_key(name: str) -> str:
+    """이벤트 이름 정규화: PAYMENT_COMPLETED == PaymentCompleted"""
+    return re.sub(r"[^a-z0-9]", "", name.lower())
+
+
+def compile_condition(expression: str) -> Predicate:
+    """조건식 하나를 한 번 컴파일해 상태 → bool 함수로
+
+    예: total > 1000000, state == "paid", status in ["a", "b"] and qty >= 1
+    비교할 수 없는 값(None > 1 등)은 거짓으로 본다.
+    """
+    try:
+        tree = ast.parse(expression.strip(), mode='eval')
+    except SyntaxError as e:
+        raise RuleCompileError(f"Invalid condition '{expression}': {e.msg}")
+    for node in ast.walk(tree):
+        if not isinstance(node, ALLOWED_NODES):
+            raise RuleCompileError(f"Unsupported syntax in condition '{expression}': {type(node).__name__}")
+    code = compile(tree, '<rule>', 'eval')
+
+    def predicate(state: Dict[str, Any]) -> bool:
+        try:
+            return bool(eval(code, {'__builtins__': {}}, _State(state)))
+        except (TypeError, ZeroDivisionError):
+            return False
+    return predicate
+
+
+def parse_rule(document: Dict[str, Any]) -> Rule:
+    """YAML 룰 문서 → Rule
+
+    rules/*.yml 형식(rule: 이름, when: {event: ...})과 Rule 모델 형식을 모두 받는다.
+    """
+    when = document['when']
+    then = []
+    for item in document.get('then', []):
+        if 'condition' in item:
+            then.append(NestedCondition(
+                condition=str(item['condition']),
+                then_actions=[Action(**a) for a in item.get('then_actions', [])]
+            ))
+        else:
+            then.append(Action(**item))
+    return Rule(
+        name=document.get('name') or document['rule'],
+        given=GivenCondition(**document.get('given', {})),
+        when=when['event'] if isinstance(when, dict) else when,
+        then=then,
+        enabled=document.get('enabled', True),
+        priority=document.get('priority', 0),
+        description=document.get('description')
+    )
+
+
+def load_rules(directory: str) -> List[Rule]:
+    """디렉터리의 *.yml / *.yaml (멀티 문서) 룰 로드"""
+    path = Path(directory)
+    if not path.is_dir():
+        logger.warning(f"룰 디렉터리 없음: {directory}")
+        return []
+    rules = []
+    for file in sorted(list(path.glob('*.yml')) + list(path.glob('*.yaml'))):
+        with open(file, encoding='utf-8') as f:
+            for document in yaml.safe_load_all(f):
+                if document:
+                    rules.append(parse_rule(document))
+    return rules
+
+
+class CompiledRule:
+    """given 조건과 then 분기를 미리 컴파일한 룰"""
+
+    def __init__(self, rule: Rule):
+        self.rule = rule
+        self.name = rule.name
+        self.aggregate = rule.given.aggregate
+        self.state = rule.given.state
+        self.conditions = [compile_condition(c) for c in rule.given.conditions]
+        # (분기 조건 또는 None, 실행할 액션들)
+        self.branches: List[Tuple[Optional[Predicate], List[Action]]] = []
+        for item in rule.then:
+            if isinstance(item, NestedCondition):
+                self.branches.append((compile_condition(item.condition), item.then_actions))
+            else:
+                self.branches.append((None, [item]))
+
+    def applies(self, context: RuleExecutionContext) -> bool:
+        if self.aggregate and self.aggregate != context.aggregate_type:
+            return False
+        state = context.current_state
+        if self.state is not None and state.get('state') != self.state:
+            return False
+        return all(predicate(state) for predicate in self.conditions)
+
+    def actions(self, state: Dict[str, Any]) -> List[Action]:
+        selected = []
+        for predicate, actions in self.branches:
+            if predicate is None or predicate(state):
+                selected.extend(actions)
+        return selected
+
+
+class RuleMetrics:
+    """룰별 평가 횟수 / 소요 시간"""
+
+    def __init__(self):
+        self.rules: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, name: str, status: str, elapsed_ms: float):
+        stats = self.rules.setdefault(name, {
+            'evaluations': 0, 'success': 0, 'failed': 0, 'skipped': 0,
+            'total_ms': 0.0, 'max_ms': 0.0
+        })
+        stats['evaluations'] += 1
+        stats[status] += 1
+        stats['total_ms'] += elapsed_ms
+        stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """총 소요 시간이 큰 룰부터"""
+        ordered = sorted(self.rules.items(), key=lambda item: item[1]['total_ms'], reverse=True)
+        return {
+            'rules': [
+                {
+                    'rule': name,
+                    **stats,
+                    'total_ms': round(stats['total_ms'], 3),
+                    'max_ms': round(stats['max_ms'], 3),
+                    'avg_ms': round(stats['total_ms'] / stats['evaluations'], 3)
+                }
+                for name, stats in ordered
+            ]
+        }
+
+
+class RuleEngine:
+    """Given-When-Then 룰 실행기
+
+    활성 룰을 when 이벤트별로 인덱싱하고 조건식은 로드 시 한 번만 컴파일한다.
+    이벤트 하나에 대해 해당 이벤트의 룰만 priority 내림차순으로 평가한다.
+    then 액션은 register_action 으로 등록된 실행기가 있으면 호출하고,
+    없으면 결과(actions_executed)로만 돌려준다.
+    """
+
+    def __init__(self, rules: Optional[List[Rule]] = None):
+        self._by_event: Dict[str, List[CompiledRule]] = {}
+        self._handlers: Dict[str, ActionHandler] = {}
+        self.metrics = RuleMetrics()
+        self.load(rules or [])
+
+    def load(self, rules: List[Rule]):
+        by_event: Dict[str, List[CompiledRule]] = {}
+        for rule in rules:
+            if not rule.enabled:
+                continue
+            try:
+                compiled = CompiledRule(rule)
+            except RuleCompileError as e:
+                logger.error(f"룰 컴파일 실패 ({rule.name}): {e}")
+                continue
+            by_event.setdefault(event_key(rule.when), []).append(compiled)
+        for compiled_rules in by_event.values():
+            # 정렬은 안정적이므로 같은 priority 는 로드 순서 유지
+            compiled_rules.sort(key=lambda r: r.rule.priority, reverse=True)
+        self._by_event = by_event
+        logger.info(f"룰 로드: {sum(len(r) for r in by_event.values())}개")
+
+    def load_directory(self, directory: str):
+        self.load(load_rules(directory))
+
+    def register_action(self, action: str, handler: ActionHandler):
+        self._handlers[action] = handler
+
+    def rules_for(self, event_type: str) -> List[Rule]:
+        return [compiled.rule for compiled in self._by_event.get(event_key(event_type), [])]
+
+    @property
+    def rule_count(self) -> int:
+        return sum(len(rules) for rules in self._by_event.values())
+
+    async def evaluate(self, context: RuleExecutionContext) -> List[RuleExecutionResult]:
+        """이벤트 하나에 매칭되는 룰 실행"""
+        results = []
+        for compiled in self._by_event.get(event_key(context.event.get('type', '')), []):
+            started = time.perf_counter()
+            result = await self._run(compiled, context)
+            self.metrics.record(compiled.name, result.status, (time.perf_counter() - started) * 1000)
+            results.append(result)
+        return results
+
+    async def evaluate_batch(
+        self,
+        contexts: List[RuleExecutionContext]
+    ) -> List[List[RuleExecutionResult]]:
+        """여러 이벤트를 입력 순서대로 평가 (이벤트별 결과 목록)"""
+        return [await self.evaluate(context) for context in contexts]
+
+    async def _run(self, compiled: CompiledRule, context: RuleExecutionContext) -> RuleExecutionResult:
+        executed: List[str] = []
+        try:
+            if not compiled.applies(context):
+                return RuleExecutionResult(rule_name=compiled.name, status='skipped', actions_executed=[])
+            for action in compiled.actions(context.current_state):
+                handler = self._handlers.get(action.action)
+                if handler:
+                    await handler(action, context)
+                executed.append(action.action)
+            return RuleExecutionResult(rule_name=compiled.name, status='success', actions_executed=executed)
+        except Exception as e:
+            logger.error(f"룰 실행 실패 ({compiled.name}): {e}")
+            return RuleExecutionResult(
+                rule_name=compiled.name,
+                status='failed',
+                actions_executed=executed,
+                error=str(e)
+            )
+
+
+def rule_context(
+    event: Dict[str, Any],
+    aggregate_type: str,
+    state: Optional[Dict[str, Any]] = None
+) -> RuleExecutionContext:
+    """커밋된 DomainEvent → 룰 실행 컨텍스트"""
+    return RuleExecutionContext(
+        aggregate_id=event['aggregate_id'],
+        aggregate_type=aggregate_type,
+        event=event,
+        current_state=state or {}
+    )
@@ -0,0 +1,305 @@
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple
+from collections import deque
+from contextvars import ContextVar
+import asyncio
+import logging
+import re
+import time
+import uuid
+
+from app.db.neo4j_client import ConcurrencyConflict, Neo4jClient
+from app.services.command_registry import CommandRegistry
+from app.services.event_pipeline import event_payload
+
+logger = logging.getLogger(__name__)
+
+LOAD_POLICIES_QUERY = """
+MATCH (p:Policy)
+RETURN p.name AS name, p.trigger_event AS trigger_event, p.actions AS actions
+"""
+
+# (command_name, aggregate_id, params, expected_version) → 실행 결과
+CommandExecutor = Callable[[str, str, Dict[str, Any], Optional[int]], Awaitable[Dict[str, Any]]]
+
+# 처리량 계산 구간 (초)
+THROUGHPUT_WINDOW = 60.0
+
+# saga 작업 id / 새 Aggregate id 네임스페이스
+SAGA_NAMESPACE = uuid.UUID('6f1c1f4e-4c5e-4d8e-9a37-0d5b3c2f7a10')
+
+
+# 지금 실행 중인 saga 작업까지의 Policy 경로 (워커가 Command 실행 동안 설정,
+# 그 Command 의 이벤트로 트리거된 작업이 이어받는다. HTTP Command 는 빈 경로)
+current_saga_path: ContextVar[Tuple[str, ...]] = ContextVar('current_saga_path', default=())
+
+
+def _snake(name: str) -> str:
+    return re.sub(r"(?<!^)(?=[A-Z])", "_", name).lower()
+
+
+class SagaJob:
+    """Policy 가 발행한 Command 하나"""
+
+    def __init__(
+        self,
+        policy: str,
+        command: str,
+        event: Dict[str, Any],
+        path: Tuple[str, ...] = ()
+    ):
+        self.policy = policy
+        self.command = command
+        self.event = event
+        self.path = path + (policy,)  # 이 작업을 낳은 Policy 연쇄 (자신 포함)
+        # 같은 이벤트 재전달 시 같은 id (대상 Aggregate 중복 생성 방지)
+        self.id = str(uuid.uuid5(
+            SAGA_NAMESPACE,
+            f"{policy}:{command}:{event.get('aggregate_id')}:{event.get('sequence')}"
+        ))
+        self.attempts = 0
+        self.last_error: Optional[str] = None
+        self.enqueued_at = time.time()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'id': self.id,
+            'policy': self.policy,
+            'command': self.command,
+            'trigger_event': self.event.get('type'),
+            'source_aggregate_id': self.event.get('aggregate_id'),
+            'source_sequence': self.event.get('sequence'),
+            'depth': len(self.path),
+            'path': list(self.path),
+            'attempts': self.attempts,
+            'last_error': self.last_error,
+            'enqueued_at': self.enqueued_at
+        }
+
+
+class SagaMetrics:
+    def __init__(self):
+        self.enqueued = 0
+        self.completed = 0
+        self.duplicates = 0
+        self.retried = 0
+        self.dead_lettered = 0
+        self.rejected = 0  # 큐가 가득 차 받지 못한 작업
+        self.cycles = 0  # 순환 / 깊이 초과로 막은 작업
+        self.max_queue_depth = 0
+        self.total_latency_ms = 0.0
+        self._completions: Deque[float] = deque()
+
+    def record_completion(self, job: SagaJob):
+        now = time.time()
+        self.completed += 1
+        self.total_latency_ms += (now - job.enqueued_at) * 1000
+        self._completions.append(now)
+        self._trim(now)
+
+    def _trim(self, now: float):
+        while self._completions and now - self._completions[0] > THROUGHPUT_WINDOW:
+            self._completions.popleft()
+
+    def snapshot(self) -> Dict[str, Any]:
+        self._trim(time.time())
+        return {
+            'enqueued': self.enqueued,
+            'completed': self.completed,
+            'duplicates': self.duplicates,
+            'retried': self.retried,
+            'dead_lettered': self.dead_lettered,
+            'rejected': self.rejected,
+            'cycles': self.cycles,
+            'max_queue_depth': self.max_queue_depth,
+            'avg_latency_ms': round(self.total_latency_ms / self.completed, 2) if self.completed else None,
+            'throughput_per_sec': round(len(self._completions) / THROUGHPUT_WINDOW, 2)
+        }
+
+
+class SagaDispatcher:
+    """DomainEvent → Policy → Command 비동기 실행
+
+    Policy 를 trigger_event 별로 인덱싱해 두고, EventPipeline 구독으로 받은 이벤트에
+    해당하는 Command 를 bounded 큐에 넣는다. 워커 풀이 큐를 소비하므로 Command
+    엔드포인트는 Policy 실행을 기다리지 않는다. 큐가 가득 차면 기다리지 않고 바로
+    dead letter 로 보낸다 (Command 응답과, 자기 큐에 넣는 워커가 막히지 않게).
+    실패한 작업은 지수 백오프로 max_retries 번 재시도 후 dead letter 로 보낸다.
+    Policy 연쇄가 max_depth 를 넘거나 같은 Policy 로 되돌아오면(순환) 실행하지 않고 dead letter.
+
+    대상 Aggregate: Command 가 트리거 이벤트와 같은 Aggregate 타입이면 그 인스턴스,
+    아니면 작업 id 로 새 인스턴스를 만든다 (재전달되어도 한 번만 생성).
+    """
+
+    def __init__(
+        self,
+        neo4j: Neo4jClient,
+        command_registry: CommandRegistry,
+        execute: CommandExecutor,
+        workers: int = 8,
+        queue_size: int = 1000,
+        max_retries: int = 3,
+        retry_backoff: float = 0.5,
+        max_depth: int = 10,
+        dead_letter_size: int = 1000
+    ):
+        self.neo4j = neo4j
+        self.command_registry = command_registry
+        self.execute = execute
+        self.workers = workers
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.max_depth = max_depth
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.dead_letters: Deque[SagaJob] = deque(maxlen=dead_letter_size)
+        self.metrics = SagaMetrics()
+        self.in_flight = 0
+        self._by_trigger: Dict[str, List[Dict[str, Any]]] = {}
+        self._workers: List[asyncio.Task] = []
+        self._retries: Set[asyncio.Task] = set()
+
+    async def load(self):
+        """Policy 정의 로드 → trigger_event 인덱스"""
+        records = await self.neo4j.execute(LOAD_POLICIES_QUERY)
+        by_trigger: Dict[str, List[Dict[str, Any]]] = {}
+        for record in records:
+            by_trigger.setdefault(record['trigger_event'], []).append(record)
+        self._by_trigger = by_trigger
+        logger.info(f"Policy 로드: {len(records)}개")
+
+    @property
+    def policy_count(self) -> int:
+        return sum(len(policies) for policies in self._by_trigger.values())
+
+    def start(self):
+        for i in range(self.workers):
+            self._workers.append(asyncio.create_task(self._work(), name=f"saga-worker-{i}"))
+
+    async def stop(self):
+        for task in self._workers + list(self._retries):
+            task.cancel()
+        await asyncio.gather(*self._workers, *self._retries, return_exceptions=True)
+        self._workers = []
+        self._retries = set()
+
+    async def handle(self, events: List[Dict[str, Any]]):
+        """EventPipeline 구독자: 트리거된 Policy 의 Command 를 큐에 넣는다 (대기 없음)"""
+        path = current_saga_path.get()
+        for event in events:
+            for policy in self._by_trigger.get(event.get('type'), []):
+                for command in policy['actions'] or []:
+                    job = SagaJob(policy['name'], command, event, path)
+                    if policy['name'] in path:
+                        self.metrics.cycles += 1
+                        self._dead_letter(job, f"policy cycle: {' → '.join(job.path)}")
+                    elif len(job.path) > self.max_depth:
+                        self.metrics.cycles += 1
+                        self._dead_letter(job, f"policy chain deeper than {self.max_depth}")
+                    else:
+                        self._enqueue(job)
+
+    def _enqueue(self, job: SagaJob):
+        try:
+            self.queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.metrics.rejected += 1
+            self._dead_letter(job, "queue full")
+            return
+        self.metrics.enqueued += 1
+        self.metrics.max_queue_depth = max(self.metrics.max_queue_depth, self.queue.qsize())
+
+    async def _work(self):
+        while True:
+            job = await self.queue.get()
+            self.in_flight += 1
+            token = current_saga_path.set(job.path)
+            try:
+                await self._run(job)
+            except Exception as e:
+                # 레지스트리 로드 실패 등 실행 전 오류
+                self._retry_or_dead_letter(job, str(e))
+            finally:
+                current_saga_path.reset(token)
+                self.in_flight -= 1
+                self.queue.task_done()
+
+    async def _run(self, job: SagaJob):
+        job.attempts += 1
+        await self.command_registry.ensure_loaded(self.neo4j)
+        route = self.command_registry.resolve(job.command)
+        if not route:
+            self._dead_letter(job, "Command not found")
+            return
+
+        source_type = job.event.get('aggregate_type')
+        same_aggregate = route.aggregate_type == source_type
+        params = event_payload(job.event)
+        if not same_aggregate and source_type:
+            params[f"{_snake(source_type)}_id"] = job.event.get('aggregate_id')
+
+        try:
+            if same_aggregate:
+                await self.execute(job.command, job.event['aggregate_id'], params, None)
+            else:
+                await self.execute(job.command, job.id, params, 0)
+        except ConcurrencyConflict as e:
+            if not same_aggregate and e.current_version:
+                # 이전 시도에서 이미 생성됨
+                self.metrics.duplicates += 1
+                self.metrics.record_completion(job)
+                return
+            self._retry_or_dead_letter(job, str(e))
+            return
+        except LookupError as e:
+            self._dead_letter(job, str(e))
+            return
+        except Exception as e:
+            self._retry_or_dead_letter(job, str(e))
+            return
+        self.metrics.record_completion(job)
+
+    def _retry_or_dead_letter(self, job: SagaJob, error: str):
+        job.last_error = error
+        if job.attempts > self.max_retries:
+            self._dead_letter(job, error)
+            return
+        self.metrics.retried += 1
+        delay = self.retry_backoff * (2 ** (job.attempts - 1))
+        task = asyncio.create_task(self._retry_later(job, delay))
+        self._retries.add(task)
+        task.add_done_callback(self._retries.discard)
+
+    async def _retry_later(self, job: SagaJob, delay: float):
+        await asyncio.sleep(delay)
+        try:
+            self.queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.metrics.rejected += 1
+            self._dead_letter(job, "queue full")
+
+    def _dead_letter(self, job: SagaJob, error: str):
+        job.last_error = error
+        self.dead_letters.append(job)
+        self.metrics.dead_lettered += 1
+        logger.error(f"Policy 실행 실패 → dead letter ({job.policy} → {job.command}): {error}")
+
+    async def redrive(self, job_id: str) -> bool:
+        """dead letter 작업을 다시 큐에 넣는다"""
+        for job in self.dead_letters:
+            if job.id == job_id:
+                self.dead_letters.remove(job)
+                job.attempts = 0
+                self._enqueue(job)
+                return True
+        return False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'policies': self.policy_count,
+            'workers': len(self._workers),
+            'queue_depth': self.queue.qsize(),
+            'queue_capacity': self.queue.maxsize,
+            'in_flight': self.in_flight,
+            'retry_pending': len(self._retries),
+            'dead_letter_size': len(self.dead_letters),
+            **self.metrics.snapshot()
+        }
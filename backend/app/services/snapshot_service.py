@@ -0,0 +1,165 @@
+from typing import Any, Callable, Dict, Optional
+import json
+import logging
+import time
+
+from app.db.neo4j_client import Neo4jClient, UnitOfWork
+
+logger = logging.getLogger(__name__)
+
+LATEST_SNAPSHOT_QUERY = """
+MATCH (s:AggregateSnapshot)
+WHERE s.aggregate_id = $aggregate_id AND s.sequence >= 0
+RETURN s.sequence AS sequence, s.state_json AS state_json
+ORDER BY s.sequence DESC
+LIMIT 1
+"""
+
+TAIL_EVENTS_QUERY = """
+MATCH (e:DomainEvent)
+WHERE e.aggregate_id = $aggregate_id AND e.sequence > $after
+RETURN e.sequence AS sequence, e.type AS type, e.payload_json AS payload_json
+ORDER BY e.sequence ASC
+LIMIT $limit
+"""
+
+SAVE_SNAPSHOT_QUERY = """
+MATCH (inst:DynamicInstance {id: $aggregate_id})
+MERGE (s:AggregateSnapshot {aggregate_id: $aggregate_id, sequence: $sequence})
+ON CREATE SET s.state_json = $state_json,
+              s.created_at = timestamp()
+MERGE (inst)-[:HAS_SNAPSHOT]->(s)
+"""
+
+# 꼬리 이벤트를 읽는 페이지 크기
+TAIL_PAGE_SIZE = 1000
+
+# 재생 길이 히스토그램 구간 (상한)
+REPLAY_BUCKETS = [0, 10, 100, 1000]
+
+
+def merge_payload(state: Dict[str, Any], event: Dict[str, Any]) -> Dict[str, Any]:
+    """기본 리듀서: 이벤트 payload 를 상태에 덮어쓴다 (Command 실행 시 인스턴스 갱신과 같은 규칙)"""
+    payload = json.loads(event['payload_json']) if event.get('payload_json') else {}
+    state.update(payload)
+    state['last_event'] = event['type']
+    return state
+
+
+class ReplayMetrics:
+    """재수화 시 재생한 이벤트 수 집계"""
+
+    def __init__(self):
+        self.rehydrations = 0
+        self.total_replayed = 0
+        self.max_replayed = 0
+        self.snapshots_taken = 0
+        self.buckets = {f"le_{b}": 0 for b in REPLAY_BUCKETS}
+        self.buckets['gt_' + str(REPLAY_BUCKETS[-1])] = 0
+
+    def record(self, replayed: int):
+        self.rehydrations += 1
+        self.total_replayed += replayed
+        self.max_replayed = max(self.max_replayed, replayed)
+        for bound in REPLAY_BUCKETS:
+            if replayed <= bound:
+                self.buckets[f"le_{bound}"] += 1
+                return
+        self.buckets['gt_' + str(REPLAY_BUCKETS[-1])] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'rehydrations': self.rehydrations,
+            'snapshots_taken': self.snapshots_taken,
+            'avg_replayed': round(self.total_replayed / self.rehydrations, 2) if self.rehydrations else 0.0,
+            'max_replayed': self.max_replayed,
+            'replay_histogram': dict(self.buckets)
+        }
+
+
+class SnapshotService:
+    """Aggregate 스냅샷 저장 및 "최신 스냅샷 + 꼬리 이벤트" 재수화
+
+    frequency 개 이벤트마다 상태를 AggregateSnapshot 으로 저장하므로
+    재수화 시 재생하는 이벤트 수는 frequency 를 넘지 않는다.
+    """
+
+    def __init__(
+        self,
+        neo4j: Neo4jClient,
+        frequency: int = 100,
+        reducer: Callable[[Dict[str, Any], Dict[str, Any]], Dict[str, Any]] = merge_payload
+    ):
+        self.neo4j = neo4j
+        self.frequency = frequency
+        self.reducer = reducer
+        self.metrics = ReplayMetrics()
+
+    async def rehydrate(self, aggregate_id: str) -> Dict[str, Any]:
+        """현재 상태 복원"""
+        started = time.perf_counter()
+
+        async def work(uow: UnitOfWork) -> Dict[str, Any]:
+            snapshot = await uow.execute(LATEST_SNAPSHOT_QUERY, {'aggregate_id': aggregate_id})
+            state: Dict[str, Any] = {}
+            version = 0
+            if snapshot:
+                state = json.loads(snapshot[0]['state_json'])
+                version = snapshot[0]['sequence']
+            snapshot_version = version
+
+            replayed = 0
+            while True:
+                events = await uow.execute(TAIL_EVENTS_QUERY, {
+                    'aggregate_id': aggregate_id,
+                    'after': version,
+                    'limit': TAIL_PAGE_SIZE
+                })
+                for event in events:
+                    state = self.reducer(state, event)
+                    version = event['sequence']
+                replayed += len(events)
+                if len(events) < TAIL_PAGE_SIZE:
+                    break
+
+            return {
+                'aggregate_id': aggregate_id,
+                'state': state,
+                'version': version,
+                'snapshot_version': snapshot_version if snapshot else None,
+                'replayed': replayed
+            }
+
+        result = await self.neo4j.run_transaction(work, write=False)
+        self.metrics.record(result['replayed'])
+        result['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 2)
+        return result
+
+    async def take_snapshot(self, aggregate_id: str) -> Optional[int]:
+        """현재 상태를 스냅샷으로 저장, 저장한 버전 반환"""
+        rehydrated = await self.rehydrate(aggregate_id)
+        if rehydrated['version'] == 0 or rehydrated['replayed'] == 0:
+            return None
+        await self.neo4j.execute_write(SAVE_SNAPSHOT_QUERY, {
+            'aggregate_id': aggregate_id,
+            'sequence': rehydrated['version'],
+            'state_json': json.dumps(rehydrated['state'], default=str)
+        })
+        self.metrics.snapshots_taken += 1
+        logger.info(f"스냅샷 저장: {aggregate_id} v{rehydrated['version']}")
+        return rehydrated['version']
+
+    def should_snapshot(self, previous_version: int, new_version: int) -> bool:
+        """이번 쓰기로 frequency 경계를 넘었는지"""
+        if self.frequency <= 0:
+            return False
+        return new_version // self.frequency > previous_version // self.frequency
+
+    async def maybe_snapshot(self, aggregate_id: str, previous_version: int, new_version: int):
+        """경계를 넘었으면 스냅샷 저장 (실패해도 Command 결과에는 영향 없음)"""
+        if not self.should_snapshot(previous_version, new_version):
+            return
+        try:
+            await self.take_snapshot(aggregate_id)
+        except Exception as e:
+            logger.error(f"스냅샷 저장 실패 ({aggregate_id}): {e}")
@@ -0,0 +1,270 @@
+from typing import Any, Dict, List, Tuple
+import logging
+import re
+import time
+
+from app.db.neo4j_client import Neo4jClient, UnitOfWork
+from app.services.event_pipeline import event_payload
+
+logger = logging.getLogger(__name__)
+
+LOAD_TRANSFORMATIONS_QUERY = """
+MATCH (ot:ObjectType)-[:HAS_TRANSFORMATION]->(t:Transformation)
+RETURN t.name AS name, t.trigger AS trigger, t.logic AS logic, ot.name AS aggregate_type
+"""
+
+# 컴파일된 SET 절을 이벤트 배치에 적용
+APPLY_TRANSFORMATION_QUERY = """
+UNWIND $rows AS row
+MATCH (inst:DynamicInstance {{id: row.aggregate_id}})
+SET {assignments}
+"""
+
+# 지연 히스토그램 구간 (ms 상한)
+LATENCY_BUCKETS = [1, 5, 10, 50, 100, 500]
+
+# logic DSL 토큰
+#   aggregate.field          → 인스턴스 속성
+#   $event_name, $aggregate_id, $aggregate_type, $sequence, $timestamp → 이벤트 메타
+#   $payload.field           → 이벤트 payload 값
+#   숫자, '문자열', true/false/null, timestamp(), coalesce(...), + - * /, 괄호
+TOKEN_PATTERN = re.compile(r"""
+    \s*(?:
+        (?P<property>aggregate\.[A-Za-z_][A-Za-z0-9_]*)
+      | (?P<payload>\$payload\.[A-Za-z_][A-Za-z0-9_]*)
+      | (?P<param>\$[A-Za-z_][A-Za-z0-9_]*)
+      | (?P<number>\d+(?:\.\d+)?)
+      | (?P<string>'[^'\\]*'|"[^"\\]*")
+      | (?P<function>(?:timestamp|coalesce)(?=\s*\())
+      | (?P<keyword>true|false|null)\b
+      | (?P<symbol>[()+\-*/,])
+    )""", re.VERBOSE | re.IGNORECASE)
+
+EVENT_PARAMS = {'event_name', 'aggregate_id', 'aggregate_type', 'sequence', 'timestamp'}
+
+ASSIGNMENT_PATTERN = re.compile(r"^\s*aggregate\.([A-Za-z_][A-Za-z0-9_]*)\s*=(.*)$", re.DOTALL)
+
+
+class TransformationCompileError(ValueError):
+    """허용되지 않는 logic"""
+
+
+def _split_assignments(body: str) -> List[str]:
+    """최상위 콤마로 할당 분리 (괄호/따옴표 안의 콤마는 무시)"""
+    parts, depth, quote, current = [], 0, None, ''
+    for ch in body:
+        if quote:
+            quote = None if ch == quote else quote
+        elif ch in ('"', "'"):
+            quote = ch
+        elif ch == '(':
+            depth += 1
+        elif ch == ')':
+            depth -= 1
+        elif ch == ',' and depth == 0:
+            parts.append(current)
+            current = ''
+            continue
+        current += ch
+    parts.append(current)
+    return parts
+
+
+def _compile_expression(expression: str) -> str:
+    """값 식 → Cypher 식 (토큰 화이트리스트로 검증하며 변수 이름을 치환)"""
+    compiled, position, depth = [], 0, 0
+    expression = expression.rstrip()
+    while position < len(expression):
+        match = TOKEN_PATTERN.match(expression, position)
+        if not match or match.end() == position:
+            raise TransformationCompileError(f"Unexpected token at '{expression[position:].strip()}'")
+        position = match.end()
+        kind = match.lastgroup
+        token = match.group(kind)
+        if kind == 'property':
+            compiled.append(f"inst.`{token.split('.', 1)[1]}`")
+        elif kind == 'payload':
+            compiled.append(f"row.payload.`{token.split('.', 1)[1]}`")
+        elif kind == 'param':
+            name = token[1:]
+            if name not in EVENT_PARAMS:
+                raise TransformationCompileError(f"Unknown parameter '{token}'")
+            compiled.append(f"row.{name}")
+        elif kind == 'symbol':
+            depth += token == '('
+            depth -= token == ')'
+            if depth < 0:
+                raise TransformationCompileError("Unbalanced parentheses")
+            compiled.append(token)
+        else:
+            compiled.append(token.lower() if kind in ('function', 'keyword') else token)
+    if not compiled or depth != 0:
+        raise TransformationCompileError(f"Invalid expression '{expression.strip()}'")
+    return _join(compiled)
+
+
+def _join(tokens: List[str]) -> str:
+    """토큰 사이 공백 (함수 호출/괄호/콤마 주변은 붙인다)"""
+    text = ''
+    for i, token in enumerate(tokens):
+        previous = tokens[i - 1] if i else None
+        if previous is None or previous == '(' or token in (')', ',') \
+                or (token == '(' and previous in ('timestamp', 'coalesce')):
+            text += token
+        else:
+            text += ' ' + token
+    return text
+
+
+def compile_logic(logic: str) -> str:
+    """Transformation.logic (SET 절 DSL) → 배치 적용 Cypher
+
+    예: SET aggregate.last_event = $event_name, aggregate.total = coalesce(aggregate.total, 0) + $payload.amount
+    할당 대상은 aggregate.field 만, 값은 토큰 화이트리스트 안의 식만 허용하므로
+    다른 노드를 읽거나 쓰는 Cypher 는 만들어지지 않는다.
+    """
+    body = logic.strip()
+    if body[:4].upper() == 'SET ':
+        body = body[4:]
+    assignments = []
+    for part in _split_assignments(body):
+        match = ASSIGNMENT_PATTERN.match(part)
+        if not match:
+            raise TransformationCompileError(f"Invalid assignment '{part.strip()}'")
+        field, expression = match.groups()
+        assignments.append(f"inst.`{field}` = {_compile_expression(expression)}")
+    return APPLY_TRANSFORMATION_QUERY.format(assignments=',\n    '.join(assignments))
+
+
+class CompiledTransformation:
+    def __init__(self, name: str, trigger: str, aggregate_type: str, logic: str):
+        self.name = name
+        self.trigger = trigger
+        self.aggregate_type = aggregate_type
+        self.logic = logic
+        self.query = compile_logic(logic)
+
+
+class LatencyHistogram:
+    def __init__(self):
+        self.count = 0
+        self.events = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = {f"le_{b}": 0 for b in LATENCY_BUCKETS}
+        self.buckets['gt_' + str(LATENCY_BUCKETS[-1])] = 0
+
+    def record(self, elapsed_ms: float, events: int):
+        self.count += 1
+        self.events += events
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        for bound in LATENCY_BUCKETS:
+            if elapsed_ms <= bound:
+                self.buckets[f"le_{bound}"] += 1
+                return
+        self.buckets['gt_' + str(LATENCY_BUCKETS[-1])] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'executions': self.count,
+            'events': self.events,
+            'avg_ms': round(self.total_ms / self.count, 3) if self.count else 0.0,
+            'max_ms': round(self.max_ms, 3),
+            'histogram_ms': dict(self.buckets)
+        }
+
+
+class TransformationEngine:
+    """Kinetic Layer: 트리거 이벤트에 Transformation 적용
+
+    Transformation 을 한 번 로드해 (trigger, Aggregate 타입) 별로 인덱싱하고
+    logic 은 파라미터화된 UNWIND 문으로 미리 컴파일한다. 이벤트 배치 하나에
+    해당하는 모든 Transformation 을 한 쓰기 트랜잭션에서 실행한다.
+    """
+
+    def __init__(self, neo4j: Neo4jClient):
+        self.neo4j = neo4j
+        self._by_trigger: Dict[Tuple[str, str], List[CompiledTransformation]] = {}
+        self.rejected: Dict[str, str] = {}  # 컴파일 실패: 이름 → 사유
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.failures = 0
+
+    async def load(self):
+        records = await self.neo4j.execute(LOAD_TRANSFORMATIONS_QUERY)
+        by_trigger: Dict[Tuple[str, str], List[CompiledTransformation]] = {}
+        rejected: Dict[str, str] = {}
+        for record in records:
+            try:
+                compiled = CompiledTransformation(
+                    record['name'], record['trigger'], record['aggregate_type'], record['logic'] or ''
+                )
+            except TransformationCompileError as e:
+                logger.error(f"Transformation 컴파일 실패 ({record['name']}): {e}")
+                rejected[record['name']] = str(e)
+                continue
+            by_trigger.setdefault((compiled.trigger, compiled.aggregate_type), []).append(compiled)
+        self._by_trigger = by_trigger
+        self.rejected = rejected
+        logger.info(f"Transformation 로드: {len(records) - len(rejected)}개 (거부 {len(rejected)}개)")
+
+    @property
+    def transformation_count(self) -> int:
+        return sum(len(t) for t in self._by_trigger.values())
+
+    def plan(
+        self,
+        events: List[Dict[str, Any]]
+    ) -> List[Tuple[CompiledTransformation, List[Dict[str, Any]]]]:
+        """이벤트 배치 → (Transformation, UNWIND 행) 목록 (처음 매칭된 순서)"""
+        batches: Dict[str, Tuple[CompiledTransformation, List[Dict[str, Any]]]] = {}
+        for event in events:
+            key = (event.get('type'), event.get('aggregate_type'))
+            for transformation in self._by_trigger.get(key, []):
+                _, rows = batches.setdefault(transformation.name, (transformation, []))
+                rows.append({
+                    'aggregate_id': event['aggregate_id'],
+                    'aggregate_type': event.get('aggregate_type'),
+                    'event_name': event.get('type'),
+                    'sequence': event.get('sequence'),
+                    'timestamp': event.get('timestamp'),
+                    'payload': event_payload(event)
+                })
+        return list(batches.values())
+
+    async def apply(self, events: List[Dict[str, Any]]) -> Dict[str, int]:
+        """배치에 매칭되는 Transformation 을 한 트랜잭션으로 실행, 이름 → 적용 이벤트 수"""
+        planned = self.plan(events)
+        if not planned:
+            return {}
+        timings: Dict[str, float] = {}
+
+        async def work(uow: UnitOfWork):
+            # 재시도되면 마지막 시도의 시간만 남긴다
+            for transformation, rows in planned:
+                started = time.perf_counter()
+                await uow.execute(transformation.query, {'rows': rows})
+                timings[transformation.name] = (time.perf_counter() - started) * 1000
+
+        await self.neo4j.run_transaction(work, write=True)
+        for transformation, rows in planned:
+            self.histograms.setdefault(transformation.name, LatencyHistogram()).record(
+                timings[transformation.name], len(rows)
+            )
+        return {transformation.name: len(rows) for transformation, rows in planned}
+
+    async def handle(self, events: List[Dict[str, Any]]):
+        """EventPipeline 구독자"""
+        try:
+            await self.apply(events)
+        except Exception:
+            self.failures += 1
+            raise
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'loaded': self.transformation_count,
+            'rejected': self.rejected,
+            'failures': self.failures,
+            'transformations': {name: h.snapshot() for name, h in self.histograms.items()}
+        }
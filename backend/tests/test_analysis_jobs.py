@@ -0,0 +1,212 @@
+import asyncio
+import time
+
+from app.services.analysis_jobs import (
+    CANCELLED, QUEUED, RUNNING, SUCCEEDED, AnalysisJob, AnalysisJobQueue, MemoryJobStore, Neo4jJobStore
+)
+
+
+class GatedRunner:
+    """작업별로 release 될 때까지 멈춰 있는 runner (실행 순서 기록)"""
+
+    def __init__(self):
+        self.order = []
+        self.gates = {}
+        self.cancelled = []
+
+    async def __call__(self, kind, params):
+        name = params['name']
+        self.order.append(name)
+        gate = self.gates.setdefault(name, asyncio.Event())
+        try:
+            await gate.wait()
+        except asyncio.CancelledError:
+            self.cancelled.append(name)
+            raise
+        return {'name': name}
+
+    def release(self, name):
+        self.gates.setdefault(name, asyncio.Event()).set()
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def _queue(runner, workers=1):
+    queue = AnalysisJobQueue(MemoryJobStore(), runner, workers=workers)
+    await queue.start()
+    return queue
+
+
+async def test_tenants_are_served_round_robin():
+    runner = GatedRunner()
+    for name in ('a1', 'a2', 'a3', 'b1', 'c1', 'c2'):
+        runner.release(name)
+    queue = AnalysisJobQueue(MemoryJobStore(), runner, workers=1)
+    for name in ('a1', 'a2', 'a3', 'b1', 'c1', 'c2'):
+        await queue.submit('analyze', name[0], {'name': name})
+    await queue.start()
+    try:
+        for _ in range(50):
+            if len(runner.order) == 6:
+                break
+            await asyncio.sleep(0)
+    finally:
+        await queue.stop()
+
+    assert runner.order == ['a1', 'b1', 'c1', 'a2', 'c2', 'a3']
+
+
+async def test_cancel_queued_job_removes_tenant_turn():
+    runner = GatedRunner()
+    queue = await _queue(runner)
+    try:
+        blocker = await queue.submit('analyze', 'a', {'name': 'a1'})
+        await _settle()
+        b1 = await queue.submit('analyze', 'b', {'name': 'b1'})
+        cancelled = await queue.cancel(b1.id)
+        assert cancelled.status == CANCELLED
+        assert 'b' not in queue._ready and 'b' not in queue._pending
+
+        # 다시 넣은 테넌트는 한 번만 순서를 받는다
+        await queue.submit('analyze', 'b', {'name': 'b2'})
+        await queue.submit('analyze', 'c', {'name': 'c1'})
+        await queue.submit('analyze', 'b', {'name': 'b3'})
+        assert list(queue._ready) == ['b', 'c']
+
+        for name in ('a1', 'b2', 'c1', 'b3'):
+            runner.release(name)
+        for _ in range(50):
+            if len(runner.order) == 4:
+                break
+            await asyncio.sleep(0)
+        assert runner.order == ['a1', 'b2', 'c1', 'b3']
+        assert (await queue.get(blocker.id)).status == SUCCEEDED
+    finally:
+        await queue.stop()
+
+
+async def test_cancel_running_job_waits_for_cancellation():
+    runner = GatedRunner()
+    queue = await _queue(runner)
+    try:
+        job = await queue.submit('analyze', 'a', {'name': 'a1'})
+        await _settle()
+        cancelled = await queue.cancel(job.id)
+
+        assert cancelled.status == CANCELLED
+        assert runner.cancelled == ['a1']
+        assert (await queue.store.get(job.id)).status == CANCELLED
+    finally:
+        await queue.stop()
+
+
+async def test_cancel_job_popped_before_it_started():
+    runner = GatedRunner()
+    queue = AnalysisJobQueue(MemoryJobStore(), runner, workers=1)
+    job = await queue.submit('analyze', 'a', {'name': 'a1'})
+    await queue.start()
+    try:
+        # 워커가 꺼내 태스크를 만들었지만 아직 한 번도 실행되지 않은 상태
+        await asyncio.sleep(0)
+        assert job.status == QUEUED and job.id in queue._running
+        cancelled = await queue.cancel(job.id)
+        assert cancelled.status == CANCELLED
+        assert runner.order == []
+    finally:
+        await queue.stop()
+
+
+class FakeNeo4j:
+    """CLAIM/RENEW 쿼리의 임대 조건만 흉내 내는 저장소"""
+
+    def __init__(self, jobs):
+        self.jobs = {job['id']: job for job in jobs}
+
+    async def execute(self, query, params=None):
+        job = self.jobs.get(params['id'])
+        return [{'j': dict(job)}] if job else []
+
+    async def execute_write(self, query, params=None):
+        if 'UNWIND $ids' in query:
+            renewed = []
+            for job_id in params['ids']:
+                job = self.jobs.get(job_id)
+                if job and job.get('owner') == params['owner']:
+                    job['lease_until'] = params['lease_until']
+                    renewed.append({'id': job_id})
+            return renewed
+        if 'lease_until, 0) < $now' in query:
+            claimed = []
+            for job in self.jobs.values():
+                if job['status'] in (QUEUED, RUNNING) and (job.get('lease_until') or 0) < params['now']:
+                    job.update(owner=params['owner'], lease_until=params['lease_until'])
+                    claimed.append({'j': dict(job)})
+            return claimed
+        self.jobs[params['job']['id']] = dict(params['job'])
+        return []
+
+
+def _record(name, status, owner=None, lease_until=None):
+    job = AnalysisJob('analyze', 'a', {'name': name}, job_id=name)
+    job.status = status
+    job.owner = owner
+    job.lease_until = lease_until
+    return job.to_record()
+
+
+async def test_start_requeues_only_jobs_with_expired_leases():
+    neo4j = FakeNeo4j([
+        _record('live', RUNNING, owner='other', lease_until=time.time() + 60),
+        _record('dead', RUNNING, owner='other', lease_until=time.time() - 1),
+        _record('orphan', QUEUED),
+        _record('done', SUCCEEDED, owner='other', lease_until=None),
+    ])
+    runner = GatedRunner()
+    queue = AnalysisJobQueue(Neo4jJobStore(neo4j), runner, workers=2)
+    await queue.start()
+    try:
+        await _settle()
+        assert sorted(runner.order) == ['dead', 'orphan']
+        assert neo4j.jobs['live']['owner'] == 'other'
+        assert neo4j.jobs['dead']['owner'] == queue.owner
+        assert neo4j.jobs['orphan']['owner'] == queue.owner
+
+        # 두 번째 프로세스는 이미 임대된 작업을 가져가지 않는다
+        other = AnalysisJobQueue(Neo4jJobStore(neo4j), GatedRunner(), workers=1)
+        assert await other.store.claim_expired(other.owner, time.time() + 60) == []
+    finally:
+        await queue.stop()
+
+
+async def test_heartbeat_renews_owned_leases_and_drops_lost_jobs():
+    neo4j = FakeNeo4j([])
+    runner = GatedRunner()
+    queue = AnalysisJobQueue(Neo4jJobStore(neo4j), runner, workers=1, lease_ttl=30)
+    await queue.start()
+    try:
+        running = await queue.submit('analyze', 'a', {'name': 'a1'})
+        await _settle()
+        queued = await queue.submit('analyze', 'b', {'name': 'b1'})
+        assert neo4j.jobs[queued.id]['owner'] == queue.owner
+
+        # 하트비트가 끊긴 사이 다른 프로세스가 대기 작업을 가져갔다
+        neo4j.jobs[queued.id]['owner'] = 'other'
+        before = running.lease_until
+        await asyncio.sleep(0.01)
+        await queue.renew_leases()
+
+        assert running.lease_until > before
+        assert neo4j.jobs[running.id]['lease_until'] == running.lease_until
+        assert queue.pending_count == 0
+        assert await queue.get(queued.id) is not None  # 저장소에서는 여전히 조회된다
+        assert queued.id not in queue._jobs
+
+        runner.release('a1')
+        await _settle()
+        assert running.status == SUCCEEDED
+        assert neo4j.jobs[running.id]['lease_until'] is None
+    finally:
+        await queue.stop()
@@ -0,0 +1,155 @@
+import asyncio
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import app.dependencies as deps
+from app.api import command_routes
+from app.services.command_registry import CommandRegistry, CommandRoute
+from app.services.event_pipeline import EventPipeline
+from app.services.rule_engine import RuleEngine
+
+
+class FakeNeo4j:
+    """execute_command_batch 만 흉내 (Aggregate 별 sequence 증가)"""
+
+    def __init__(self):
+        self.sequences = {}
+        self.batches = []
+
+    async def execute_command_batch(self, groups):
+        self.batches.append(groups)
+        written = {}
+        for type_name, rows in groups.items():
+            for row in rows:
+                sequence = self.sequences.get(row['instance_id'], 0) + 1
+                self.sequences[row['instance_id']] = sequence
+                written[row['index']] = {
+                    'event': {
+                        'type': row['event_type'],
+                        'aggregate_id': row['instance_id'],
+                        'sequence': sequence,
+                        'payload_json': row['payload_json']
+                    },
+                    'instance': row['properties']
+                }
+        return written
+
+
+class FakeSnapshots:
+    async def maybe_snapshot(self, aggregate_id, from_version, to_version):
+        pass
+
+
+@pytest.fixture
+def client(monkeypatch):
+    registry = CommandRegistry()
+    registry._routes = {'PlaceOrder': CommandRoute('PlaceOrder', 'Order', ['OrderPlaced'])}
+    registry.loaded = True
+    neo4j = FakeNeo4j()
+    monkeypatch.setattr(deps, 'neo4j_client', neo4j)
+    monkeypatch.setattr(deps, 'command_registry', registry)
+    monkeypatch.setattr(deps, 'snapshot_service', FakeSnapshots())
+    monkeypatch.setattr(deps, 'event_pipeline', EventPipeline())
+    monkeypatch.setattr(deps, 'rule_engine', RuleEngine())
+
+    app = FastAPI()
+    app.include_router(command_routes.router, prefix="/api/commands")
+    test_client = TestClient(app)
+    test_client.neo4j = neo4j
+    return test_client
+
+
+def _records(n):
+    return [
+        json.dumps({'command': 'PlaceOrder', 'aggregate_id': f'o-{i % 7}', 'params': {'total': i}})
+        for i in range(n)
+    ]
+
+
+def _lines(response):
+    return [json.loads(line) for line in response.text.splitlines() if line]
+
+
+def test_bulk_plain_body_returns_per_record_results(client):
+    body = "\n".join(_records(3)) + "\n"
+    response = client.post("/api/commands/bulk", content=body, timeout=5)
+
+    assert response.status_code == 200
+    *results, summary = _lines(response)
+    assert [r['index'] for r in results] == [0, 1, 2]
+    assert all(r['status'] == 'success' and r['event'] == 'OrderPlaced' for r in results)
+    assert summary['summary']['total'] == 3
+    assert summary['summary']['success'] == 3
+
+
+def test_bulk_chunked_body_batches_and_reports_errors(client):
+    records = _records(500)
+    records.insert(10, '{"command": "Unknown", "params": {}}')
+    records.insert(20, 'not json')
+
+    def chunks():
+        payload = ("\n".join(records) + "\n").encode()
+        # 줄 경계와 무관한 청크
+        for i in range(0, len(payload), 97):
+            yield payload[i:i + 97]
+
+    response = client.post("/api/commands/bulk?batch_size=100", content=chunks(), timeout=5)
+
+    *results, summary = _lines(response)
+    assert len(results) == 502
+    by_index = {r['index']: r for r in results}
+    assert by_index[10]['error'] == "Command not found"
+    assert by_index[20]['error'].startswith("invalid record")
+    assert summary['summary'] == {**summary['summary'], 'total': 502, 'success': 500, 'error': 2}
+    assert len(client.neo4j.batches) == 5
+
+
+def test_bulk_line_over_limit_stops_ingest(client, monkeypatch):
+    monkeypatch.setattr(command_routes.settings, 'command_bulk_max_line_bytes', 200)
+    body = "\n".join([_records(1)[0], '{"command": "PlaceOrder", "params": {"x": "' + 'a' * 300 + '"}}'] + _records(2))
+    response = client.post("/api/commands/bulk", content=body, timeout=5)
+
+    *results, summary = _lines(response)
+    assert sorted((r['index'], r['status']) for r in results) == [(0, 'success'), (1, 'error')]
+    assert results[0]['error'] == "record exceeds 200 bytes"
+    assert summary['summary']['total'] == 2
+
+
+async def test_bulk_results_stream_before_body_ends(client):
+    """첫 배치 결과가 본문 마지막 청크를 받기 전에 나간다 (본문 전체를 버퍼링하지 않음)"""
+    app = client.app
+    first = ("\n".join(_records(4)) + "\n").encode()
+    rest = ("\n".join(_records(2)) + "\n").encode()
+    sent = []
+    first_batch_sent = asyncio.Event()
+
+    async def receive():
+        if not sent_chunks:
+            sent_chunks.append(first)
+            return {'type': 'http.request', 'body': first, 'more_body': True}
+        if len(sent_chunks) == 1:
+            await asyncio.wait_for(first_batch_sent.wait(), timeout=2)
+            sent_chunks.append(rest)
+            return {'type': 'http.request', 'body': rest, 'more_body': False}
+        await asyncio.Event().wait()
+
+    async def send(message):
+        sent.append(message)
+        if message['type'] == 'http.response.body' and message.get('body'):
+            first_batch_sent.set()
+
+    sent_chunks = []
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'POST',
+        'scheme': 'http', 'path': '/api/commands/bulk', 'raw_path': b'/api/commands/bulk',
+        'query_string': b'batch_size=2', 'headers': [(b'content-type', b'application/x-ndjson')],
+        'server': ('test', 80), 'client': ('test', 1234), 'root_path': ''
+    }
+    await app(scope, receive, send)
+
+    body = b''.join(m.get('body', b'') for m in sent if m['type'] == 'http.response.body')
+    *results, summary = [json.loads(line) for line in body.decode().splitlines()]
+    assert len(results) == 6 and summary['summary']['success'] == 6
@@ -0,0 +1,62 @@
+import pytest
+
+from app.services.command_registry import CommandRegistry, match_events
+
+EVENTS = [
+    'OrderPlaced', 'OrderCancelled', 'OrderPaid', 'OrderShipped', 'InvoiceSent',
+    'ProductBought', 'LimitSet', 'PaymentCreated', 'OrderApplied', 'StockReserved',
+]
+
+
+@pytest.mark.parametrize("command, expected", [
+    # 규칙 과거형: +ed, +d, 자음 반복 +ed, y → ied
+    ('ReserveStock', ['StockReserved']),
+    ('CreatePayment', ['PaymentCreated']),
+    ('CancelOrder', ['OrderCancelled']),
+    ('ShipOrder', ['OrderShipped']),
+    ('ApplyOrder', ['OrderApplied']),
+    # 불규칙 과거형
+    ('PayOrder', ['OrderPaid']),
+    ('SendInvoice', ['InvoiceSent']),
+    ('BuyProduct', ['ProductBought']),
+    ('SetLimit', ['LimitSet']),
+])
+def test_match_events_by_past_tense(command, expected):
+    assert match_events(command, EVENTS) == expected
+
+
+def test_match_events_prefers_events_sharing_the_object():
+    events = ['InvoicePaid', 'OrderPaid']
+    assert match_events('PayOrder', events) == ['OrderPaid']
+    # 목적어가 같은 이벤트가 없으면 동사만 맞는 이벤트 전부
+    assert match_events('PayFee', events) == ['InvoicePaid', 'OrderPaid']
+
+
+@pytest.mark.parametrize("command, expected", [
+    ('PlaceOrder', ['PlacedOrder']),
+    ('CreateUser', ['CreatedUser']),
+    ('ArchiveOrder', ['ArchiveOrder']),
+    ('archive', ['archive']),
+])
+def test_match_events_without_match_falls_back_to_naming_rule(command, expected):
+    assert match_events(command, ['OrderPaid', 'UserDeleted']) == expected
+
+
+class FakeNeo4j:
+    def __init__(self, records):
+        self.records = records
+
+    async def execute(self, query, params=None):
+        return self.records
+
+
+async def test_load_resolves_routes_and_keeps_first_aggregate():
+    registry = CommandRegistry()
+    await registry.load(FakeNeo4j([
+        {'command': 'PayOrder', 'aggregate_type': 'Order', 'events': ['OrderPlaced', 'OrderPaid', None]},
+        {'command': 'PayOrder', 'aggregate_type': 'Refund', 'events': ['RefundPaid']},
+    ]))
+
+    route = registry.resolve('PayOrder')
+    assert (route.aggregate_type, route.event) == ('Order', 'OrderPaid')
+    assert registry.loaded and len(registry.routes()) == 1
@@ -0,0 +1,89 @@
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import app.dependencies as deps
+from app.api import feed_routes
+from app.services.event_feed import EventFeed
+
+
+def _event(aggregate_id='o-1', aggregate_type='Order', event_type='OrderPlaced', sequence=1):
+    return {'aggregate_id': aggregate_id, 'aggregate_type': aggregate_type, 'type': event_type,
+            'sequence': sequence, 'payload_json': '{}'}
+
+
+def _drain(subscription):
+    messages = []
+    while not subscription.queue.empty():
+        messages.append(subscription.queue.get_nowait())
+    return messages
+
+
+async def test_fan_out_applies_all_filters():
+    feed = EventFeed()
+    everything = feed.subscribe()
+    by_id = feed.subscribe(aggregate_ids=['o-1'])
+    by_id_and_type = feed.subscribe(aggregate_ids=['o-1'], event_types=['OrderPaid'])
+    by_aggregate_type = feed.subscribe(aggregate_types=['Payment'])
+
+    await feed.handle([_event(), _event(event_type='OrderPaid', sequence=2), _event('p-1', 'Payment', 'PaymentDone')])
+
+    assert [m.id for m in _drain(everything)] == ['o-1:1', 'o-1:2', 'p-1:1']
+    assert [m.id for m in _drain(by_id)] == ['o-1:1', 'o-1:2']
+    assert [m.type for m in _drain(by_id_and_type)] == ['OrderPaid']
+    assert [m.id for m in _drain(by_aggregate_type)] == ['p-1:1']
+    assert feed.delivered == 7
+
+
+async def test_subscription_is_indexed_by_most_selective_filter():
+    feed = EventFeed()
+    subscription = feed.subscribe(aggregate_ids=['o-1'], aggregate_types=['Order'], event_types=['OrderPlaced'])
+    assert feed._by_aggregate == {'o-1': {subscription.id}}
+    assert feed._by_event_type == {} and feed._by_aggregate_type == {}
+    # 다른 인스턴스의 이벤트는 후보에도 오르지 않는다
+    assert feed._candidates(_event('o-2')) == set()
+
+    feed.unsubscribe(subscription)
+    assert feed._by_aggregate == {} and feed.stats()['subscribers'] == 0
+
+
+async def test_slow_consumer_is_evicted_without_blocking_others():
+    feed = EventFeed(buffer_size=2)
+    slow = feed.subscribe()
+    fast = feed.subscribe()
+
+    await feed.handle([_event(sequence=1), _event(sequence=2)])
+    _drain(fast)
+    await feed.handle([_event(sequence=3)])
+
+    assert slow.evicted and not fast.evicted
+    assert await slow.get() is None
+    assert [m.id for m in _drain(fast)] == ['o-1:3']
+    assert feed.stats()['subscribers'] == 1 and feed.evicted == 1
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(deps, 'event_feed', EventFeed())
+    app = FastAPI()
+    app.include_router(feed_routes.router, prefix="/api/feed")
+    return TestClient(app)
+
+
+def test_websocket_disconnect_unsubscribes_without_events(client):
+    with client.websocket_connect("/api/feed/ws?aggregate_id=never") as websocket:
+        websocket.send_text("ping")
+        assert deps.event_feed.stats()['subscribers'] == 1
+    for _ in range(100):
+        if deps.event_feed.stats()['subscribers'] == 0:
+            break
+        time.sleep(0.01)
+    assert deps.event_feed.stats()['subscribers'] == 0
+
+
+def test_websocket_receives_matching_events(client):
+    with client.websocket_connect("/api/feed/ws?aggregate_type=Order") as websocket:
+        websocket.portal.call(deps.event_feed.handle, [_event('p-1', 'Payment'), _event()])
+        assert '"aggregate_id": "o-1"' in websocket.receive_text()
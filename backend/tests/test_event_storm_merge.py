@@ -0,0 +1,146 @@
+import asyncio
+
+import pytest
+
+from app.models.event_storm import EventStormResult
+from app.services import llm_service
+from app.services.event_storm_merge import merge_results, split_sections
+from app.services.llm_service import LLMService
+
+
+def _result(aggregates=(), policies=(), read_models=()) -> EventStormResult:
+    return EventStormResult.model_validate({
+        "aggregates": list(aggregates), "policies": list(policies), "read_models": list(read_models)
+    })
+
+
+def _aggregate(name, commands=(), events=(), state=None):
+    return {"name": name, "commands": [{"name": c} for c in commands],
+            "events": [{"name": e} for e in events], "state": state or {}}
+
+
+def test_split_sections_keeps_short_text():
+    assert split_sections("짧은 설명", 100) == ["짧은 설명"]
+
+
+def test_split_sections_prefers_headings_and_respects_limit():
+    text = "\n".join([
+        "# 주문", "주문 설명 " * 5,
+        "# 결제", "결제 설명 " * 5,
+        "2.1 배송", "배송 설명 " * 5,
+    ])
+    sections = split_sections(text, 40)
+    assert all(len(s) <= 40 for s in sections)
+    assert [s.splitlines()[0] for s in sections] == ["# 주문", "# 결제", "2.1 배송"]
+    assert "\n".join(sections) == text
+
+
+def test_split_sections_cuts_oversized_lines():
+    sections = split_sections("a" * 25, 10)
+    assert sections == ["a" * 10, "a" * 10, "a" * 5]
+
+
+def test_split_sections_force_splits_short_text():
+    text = "# 주문\n주문 설명\n# 결제\n결제 설명"
+    assert split_sections(text, 1000) == [text]
+    assert split_sections(text, 1000, force=True) == ["# 주문\n주문 설명", "# 결제\n결제 설명"]
+    # 제목이 없으면 문단마다, 문단도 하나면 그대로
+    assert split_sections("주문\n\n결제\n\n", 1000, force=True) == ["주문", "결제"]
+    assert split_sections("주문 설명", 1000, force=True) == ["주문 설명"]
+
+
+def test_merge_results_dedupes_by_name_in_input_order():
+    merged = merge_results([
+        _result([_aggregate("Order", ["PlaceOrder"], ["OrderPlaced"], {"total": "number"})]),
+        _result([
+            _aggregate("ORDER", ["PLACEORDER", "CancelOrder"], ["OrderPlaced"], {"total": "string", "status": "enum"}),
+            _aggregate("Payment", ["PlaceOrder"], ["PaymentCompleted"])
+        ])
+    ])
+
+    order, payment = merged.aggregates
+    assert order.name == "Order"
+    assert [c.name for c in order.commands] == ["PlaceOrder", "CancelOrder"]
+    assert order.state == {"total": "number", "status": "enum"}
+    # Command 는 먼저 선언한 Aggregate 에만 속한다
+    assert [c.name for c in payment.commands] == []
+
+
+def test_merge_results_dedupes_policy_actions_case_insensitively():
+    merged = merge_results([
+        _result(policies=[{"name": "ship", "trigger_event": "OrderPaid", "actions": ["Ship"]}]),
+        _result(policies=[{"name": "SHIP", "trigger_event": "OrderPaid", "actions": ["ship", "Notify"]}]),
+        _result(policies=[{"name": "other_name", "trigger_event": "orderpaid", "actions": ["notify", "SHIP"]}])
+    ])
+
+    assert len(merged.policies) == 1
+    assert merged.policies[0].actions == ["Ship", "Notify"]
+
+
+def test_merge_results_is_deterministic():
+    parts = [
+        _result([_aggregate("Order", ["PlaceOrder"])],
+                read_models=[{"name": "OrderList", "source_events": ["OrderPlaced"], "projections": {"id": "id"}}]),
+        _result(read_models=[{"name": "orderlist", "source_events": ["orderplaced", "OrderPaid"],
+                              "projections": {"id": "other", "total": "total"}}])
+    ]
+    merged = merge_results(parts)
+    assert merged == merge_results(parts)
+    assert merged.read_models[0].source_events == ["OrderPlaced", "OrderPaid"]
+    assert merged.read_models[0].projections == {"id": "id", "total": "total"}
+
+
+class SectionLLM(LLMService):
+    """첫 섹션은 실패, 나머지는 끝나지 않는 호출"""
+
+    def __init__(self):
+        self.cancelled = 0
+
+    async def _generate(self, prompt, bypass_cache=False, system_prompt=None, response_model=None):
+        if "FAIL" in prompt:
+            await asyncio.sleep(0)
+            raise RuntimeError("section failed")
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+
+
+async def test_map_reduce_cancels_siblings_on_failure(monkeypatch):
+    monkeypatch.setattr(llm_service.settings, "llm_section_max_chars", 30)
+    llm = SectionLLM()
+    description = "\n".join(["# A", "FAIL " * 4, "# B", "wait " * 4, "# C", "wait " * 4])
+
+    with pytest.raises(RuntimeError, match="section failed"):
+        await asyncio.wait_for(llm.analyze_map_reduce(description, concurrency=3), timeout=2)
+    assert llm.cancelled == 2
+
+
+class RecordingLLM(LLMService):
+    """섹션 프롬프트와 단일 분석 호출 기록"""
+
+    def __init__(self):
+        self.sections = 0
+        self.single = 0
+
+    async def _generate(self, prompt, bypass_cache=False, system_prompt=None, response_model=None):
+        self.sections += 1
+        return _result([_aggregate("Order")])
+
+    async def analyze_business(self, description, examples=None, bypass_cache=False):
+        self.single += 1
+        return _result([_aggregate("Order")])
+
+
+async def test_map_reduce_mode_splits_short_documents():
+    description = "# 주문\n주문을 받는다\n# 결제\n결제한다"
+
+    auto = RecordingLLM()
+    await auto.analyze_map_reduce(description, max_section_chars=1000)
+    assert (auto.single, auto.sections) == (1, 0)
+
+    forced = RecordingLLM()
+    result = await forced.analyze_map_reduce(description, max_section_chars=1000, force_split=True)
+    assert (forced.single, forced.sections) == (0, 2)
+    assert [a.name for a in result.aggregates] == ["Order"]
@@ -0,0 +1,98 @@
+import json
+
+import pytest
+from pydantic import ValidationError
+
+from app.models.event_storm import EventStormPatch, EventStormResult
+from app.services.event_storm_patch import PatchError, apply_patch
+from app.services.llm_service import LLMService
+
+
+def _result() -> EventStormResult:
+    return EventStormResult.model_validate({
+        "aggregates": [
+            {"name": "Order", "commands": [{"name": "PlaceOrder"}],
+             "events": [{"name": "OrderPlaced"}, {"name": "OrderArchived"}], "state": {"total": "number"}},
+            {"name": "Shipment", "commands": [{"name": "CreateShipment"}],
+             "events": [{"name": "ShipmentCreated"}], "state": {}}
+        ],
+        "policies": [{"name": "ship_on_order", "trigger_event": "OrderPlaced", "actions": ["CreateShipment"]}]
+    })
+
+
+def _patch(*operations) -> EventStormPatch:
+    return EventStormPatch.model_validate({"operations": list(operations)})
+
+
+def test_operations_apply_to_a_copy():
+    current = _result()
+    patched = apply_patch(current, _patch(
+        {"op": "add", "target": "command", "aggregate": "Order", "name": "CancelOrder"},
+        {"op": "remove", "target": "event", "name": "orderarchived"},
+        {"op": "modify", "target": "aggregate", "name": "Order",
+         "value": {"state": {"status": "enum", "total": None}}}
+    ))
+
+    order = patched.aggregates[0]
+    assert [c.name for c in order.commands] == ["PlaceOrder", "CancelOrder"]
+    assert [e.name for e in order.events] == ["OrderPlaced"]
+    assert order.state == {"status": "enum"}
+    assert current.aggregates[0].state == {"total": "number"}
+
+
+@pytest.mark.parametrize("operation", [
+    {"op": "add", "target": "aggregate", "name": "Order", "value": {"commands": [], "events": [], "state": {}}},
+    {"op": "remove", "target": "policy", "name": "missing"},
+    {"op": "add", "target": "event", "name": "Orphan"},
+])
+def test_inapplicable_operations_raise_patch_error(operation):
+    with pytest.raises(PatchError):
+        apply_patch(_result(), _patch(operation))
+
+
+def test_invalid_result_raises_validation_error():
+    with pytest.raises(ValidationError):
+        apply_patch(_result(), _patch({"op": "add", "target": "command", "aggregate": "Order", "name": "lower"}))
+
+
+@pytest.mark.parametrize("operation", [
+    {"op": "remove", "target": "event", "aggregate": "Order", "name": "OrderPlaced"},
+    {"op": "remove", "target": "aggregate", "name": "Shipment"},
+    {"op": "modify", "target": "policy", "name": "ship_on_order", "value": {"actions": ["NotifyCustomer"]}},
+])
+def test_dangling_references_are_rejected(operation):
+    with pytest.raises(PatchError, match="dangling references"):
+        apply_patch(_result(), _patch(operation))
+
+
+def test_existing_dangling_references_are_tolerated():
+    data = _result().model_dump()
+    data["policies"] = [{"name": "notify", "trigger_event": "PaymentCompleted", "actions": ["PlaceOrder"]}]
+    current = EventStormResult.model_validate(data)
+    patched = apply_patch(current, _patch({"op": "remove", "target": "event", "name": "OrderArchived"}))
+    assert patched.policies[0].trigger_event == "PaymentCompleted"
+
+
+class FakeLLM(LLMService):
+    def __init__(self, raw_patch: str):
+        self.raw_patch = raw_patch
+        self.refined = 0
+
+    async def _generate(self, prompt, bypass_cache=False, system_prompt=None, response_model=None):
+        return response_model.model_validate(json.loads(self.raw_patch))
+
+    async def refine_result(self, current_result, feedback, bypass_cache=False):
+        self.refined += 1
+        return current_result
+
+
+@pytest.mark.parametrize("raw_patch", [
+    "not json",
+    '{"operations": [{"op": "rename", "target": "event", "name": "X"}]}',
+    '{"operations": [{"op": "remove", "target": "event", "name": "OrderPlaced"}]}',
+])
+async def test_refine_delta_falls_back_to_full_refine(raw_patch):
+    llm = FakeLLM(raw_patch)
+    current = _result()
+    assert await llm.refine_delta(current, "주문 이벤트 정리") is current
+    assert llm.refined == 1
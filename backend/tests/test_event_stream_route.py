@@ -0,0 +1,50 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import app.dependencies as deps
+from app.api import query_routes
+
+
+class FakeNeo4j:
+    def __init__(self, sequences):
+        self.sequences = sequences
+
+    async def get_event_stream(self, aggregate_id, limit=100, after=None, before=None):
+        if after is not None:
+            selected = [s for s in sorted(self.sequences) if s > after]
+        else:
+            bound = before if before is not None else float('inf')
+            selected = [s for s in sorted(self.sequences, reverse=True) if s < bound]
+        return [{'e': {'aggregate_id': aggregate_id, 'sequence': s}} for s in selected[:limit]]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(deps, 'neo4j_client', FakeNeo4j(range(1, 6)))
+    app = FastAPI()
+    app.include_router(query_routes.router, prefix="/api/queries")
+    return TestClient(app)
+
+
+def test_default_response_is_the_record_list(client):
+    response = client.get("/api/queries/events/o-1", params={'limit': 2})
+    assert response.json() == [
+        {'e': {'aggregate_id': 'o-1', 'sequence': 5}},
+        {'e': {'aggregate_id': 'o-1', 'sequence': 4}}
+    ]
+
+
+def test_page_envelope_walks_history(client):
+    first = client.get("/api/queries/events/o-1", params={'limit': 2, 'page': True}).json()
+    assert [e['sequence'] for e in first['events']] == [5, 4]
+    assert (first['direction'], first['has_more'], first['next_cursor']) == ('backward', True, 4)
+
+    last = client.get("/api/queries/events/o-1", params={'limit': 3, 'page': True, 'after': 2}).json()
+    assert [e['sequence'] for e in last['events']] == [3, 4, 5]
+    assert (last['direction'], last['has_more'], last['next_cursor']) == ('forward', False, None)
+
+
+def test_after_and_before_are_exclusive(client):
+    response = client.get("/api/queries/events/o-1", params={'after': 1, 'before': 3})
+    assert response.status_code == 400
@@ -0,0 +1,73 @@
+import itertools
+import re
+
+import pytest
+
+from app.services.instance_query import (
+    BUILTIN_FIELDS,
+    InstanceQueryError,
+    _keyset_condition,
+    compile_instance_query,
+    encode_cursor,
+)
+
+
+def _evaluate(condition, params, row):
+    """keyset 조건 Cypher → 파이썬 식으로 바꿔 한 행에 평가"""
+    expression = re.sub(r"inst\.`(\w+)`", r"row['\1']", condition)
+    expression = re.sub(r"\$(k\d+)", r"params['\1']", expression)
+    expression = expression.replace(" = ", " == ").replace(" AND ", " and ").replace(" OR ", " or ")
+    return eval(expression, {}, {'row': row, 'params': params})
+
+
+def _sort_key(row, order_fields):
+    # 숫자 필드만 쓰므로 desc 는 부호 반전
+    return tuple(-row[f] if d == 'desc' else row[f] for f, d in order_fields)
+
+
+@pytest.mark.parametrize("order_fields", [
+    [('created_at', 'asc'), ('id', 'asc')],
+    [('version', 'desc'), ('created_at', 'asc'), ('id', 'asc')],
+    [('version', 'asc'), ('created_at', 'asc'), ('id', 'asc')],
+])
+def test_keyset_condition_matches_rows_after_cursor(order_fields):
+    # id 는 유일 (마지막 정렬 키)
+    rows = [
+        {'version': v, 'created_at': c, 'id': i}
+        for i, (v, c, _) in enumerate(itertools.product(range(3), range(3), range(2)))
+    ]
+    ordered = sorted(rows, key=lambda r: _sort_key(r, order_fields))
+    for position, cursor_row in enumerate(ordered):
+        params = {}
+        condition = _keyset_condition(order_fields, [cursor_row[f] for f, _ in order_fields], params)
+        after = [r for r in ordered if _evaluate(condition, params, r)]
+        assert after == ordered[position + 1:]
+
+
+def test_keyset_condition_has_sargable_leading_bound():
+    params = {}
+    condition = _keyset_condition([('version', 'desc'), ('created_at', 'asc'), ('id', 'asc')], [3, 1, 'a'], params)
+    assert condition.startswith("inst.`version` <= $k0 AND (")
+    params = {}
+    condition = _keyset_condition([('created_at', 'asc'), ('id', 'asc')], [1, 'a'], params)
+    assert condition.startswith("inst.`created_at` >= $k0 AND (")
+
+
+def test_compile_rejects_unknown_field_and_bad_cursor():
+    schema = dict(BUILTIN_FIELDS)
+    with pytest.raises(InstanceQueryError):
+        compile_instance_query('Order', schema, ['status:eq:paid'])
+    with pytest.raises(InstanceQueryError):
+        compile_instance_query('Order', schema, [], cursor=encode_cursor([1]))
+    with pytest.raises(InstanceQueryError):
+        compile_instance_query('Order', schema, [], sort='id:sideways')
+
+
+def test_compile_parameterizes_filter_values():
+    query, params, key_fields = compile_instance_query(
+        'Order', dict(BUILTIN_FIELDS), ["id:eq:x') DETACH DELETE inst //", 'version:in:1,2'], limit=10
+    )
+    assert "DETACH" not in query
+    assert params['f0'] == "x') DETACH DELETE inst //"
+    assert params['f1'] == [1, 2]
+    assert key_fields == ['created_at', 'id']
@@ -0,0 +1,45 @@
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import app.dependencies as deps
+from app.api import query_routes
+
+
+class FakeNeo4j:
+    def __init__(self, types, instances):
+        self.types = types
+        self.instances = instances
+
+    async def execute(self, query, params=None):
+        if 'ObjectType' in query:
+            name = params['name']
+            return [{'properties_json': json.dumps(self.types[name])}] if name in self.types else []
+        return [{'inst': inst} for inst in self.instances[:params['limit']]]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    instances = [{'id': f'o-{i}', 'created_at': i} for i in range(3)]
+    monkeypatch.setattr(deps, 'neo4j_client', FakeNeo4j({'Order': {'status': 'string'}}, instances))
+    app = FastAPI()
+    app.include_router(query_routes.router, prefix="/api/queries")
+    return TestClient(app)
+
+
+def test_default_response_is_the_record_list(client):
+    response = client.get("/api/queries/instances/Order", params={'limit': 2})
+    assert response.json() == [{'inst': {'id': 'o-0', 'created_at': 0}}, {'inst': {'id': 'o-1', 'created_at': 1}}]
+
+
+def test_unknown_type_is_an_empty_list_by_default(client):
+    assert client.get("/api/queries/instances/Missing").json() == []
+    assert client.get("/api/queries/instances/Missing", params={'page': True}).status_code == 404
+
+
+def test_page_envelope(client):
+    body = client.get("/api/queries/instances/Order", params={'limit': 2, 'page': True}).json()
+    assert [item['id'] for item in body['items']] == ['o-0', 'o-1']
+    assert body['has_more'] is True and body['next_cursor']
@@ -0,0 +1,51 @@
+import json
+
+from app.services.json_stream import IncrementalArrayParser
+
+DOCUMENT = {
+    "aggregates": [
+        {"name": "Order", "invariants": ["total >= 0", "brace } in [string]"]},
+        {"name": "Payment", "state": {"note": "escaped \" quote {"}}
+    ],
+    "other": [{"name": "ignored"}],
+    "policies": [{"name": "ship_on_pay", "actions": ["Ship"]}]
+}
+
+
+def _feed_all(parser, text, size):
+    completed = []
+    for i in range(0, len(text), size):
+        completed.extend(parser.feed(text[i:i + size]))
+    return completed
+
+
+def test_elements_are_emitted_in_order_for_any_chunking():
+    text = "```json\n" + json.dumps(DOCUMENT, ensure_ascii=False) + "\n```"
+    expected = [
+        ('aggregates', DOCUMENT['aggregates'][0]),
+        ('aggregates', DOCUMENT['aggregates'][1]),
+        ('policies', DOCUMENT['policies'][0])
+    ]
+    for size in (1, 2, 3, 7, 64, len(text)):
+        parser = IncrementalArrayParser(("aggregates", "policies"))
+        completed = _feed_all(parser, text, size)
+        assert [(field, json.loads(element)) for field, element in completed] == expected
+        assert json.loads(parser.document) == DOCUMENT
+
+
+def test_element_is_emitted_as_soon_as_it_closes():
+    parser = IncrementalArrayParser(("aggregates",))
+    assert parser.feed('{"aggregates": [{"name": "Order"') == []
+    assert parser.feed('}, {"name"') == [('aggregates', '{"name": "Order"}')]
+
+
+def test_keys_split_across_chunks_are_recognised():
+    parser = IncrementalArrayParser(("policies",))
+    completed = _feed_all(parser, '{"poli' + 'cies": [{"a": 1}]}', 3)
+    assert completed == [('policies', '{"a": 1}')]
+
+
+def test_incomplete_document_returns_remaining_text():
+    parser = IncrementalArrayParser(("aggregates",))
+    parser.feed('설명입니다 {"aggregates": [')
+    assert parser.document == '{"aggregates": ['
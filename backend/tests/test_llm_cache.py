@@ -0,0 +1,120 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import llm_cache
+from app.services.llm_cache import (
+    DiskCacheBackend,
+    LLMCache,
+    MemoryCacheBackend,
+    cache_key,
+    normalize_prompt,
+)
+
+
+class Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(llm_cache, 'time', SimpleNamespace(time=clock.time))
+    return clock
+
+
+@pytest.mark.parametrize("prompt, expected", [
+    ("  주문을   분석해\n\n줘 ", "주문을 분석해 줘"),
+    ("a\tb\r\nc", "a b c"),
+    # NFD 로 분해된 한글 → NFC
+    ("\u1100\u1161 \u1102\u1161", "\uac00 \ub098"),
+    ("", ""),
+])
+def test_normalize_prompt(prompt, expected):
+    assert normalize_prompt(prompt) == expected
+
+
+def test_cache_key_ignores_whitespace_but_not_model_settings():
+    base = cache_key('anthropic', 'model-a', 0.0, 'system', 'Place  order\n')
+
+    assert base == cache_key('anthropic', 'model-a', 0.0, 'system', ' Place order')
+    assert len({
+        base,
+        cache_key('openai', 'model-a', 0.0, 'system', 'Place order'),
+        cache_key('anthropic', 'model-b', 0.0, 'system', 'Place order'),
+        cache_key('anthropic', 'model-a', 0.7, 'system', 'Place order'),
+        cache_key('anthropic', 'model-a', 0.0, 'other system', 'Place order'),
+        cache_key('anthropic', 'model-a', 0.0, 'system', 'Cancel order'),
+    }) == 6
+
+
+async def test_memory_backend_evicts_least_recently_used():
+    backend = MemoryCacheBackend(max_entries=2, ttl=0)
+    await backend.set('a', '1')
+    await backend.set('b', '2')
+    assert await backend.get('a') == '1'  # a 가 최근 사용
+
+    await backend.set('c', '3')
+
+    assert await backend.get('b') is None
+    assert await backend.get('a') == '1'
+    assert await backend.get('c') == '3'
+    assert backend.size() == 2
+
+
+async def test_memory_backend_expires_after_ttl(clock):
+    backend = MemoryCacheBackend(ttl=10)
+    await backend.set('a', '1')
+
+    clock.now += 10
+    assert await backend.get('a') == '1'
+    clock.now += 0.5
+    assert await backend.get('a') is None
+    assert backend.size() == 0
+
+
+async def test_disk_backend_round_trip_and_ttl(tmp_path, clock):
+    backend = DiskCacheBackend(str(tmp_path / "cache"), ttl=10)
+    await backend.set('k', '{"응답": 1}')
+
+    # 다른 인스턴스(재시작)에서도 읽힌다
+    reopened = DiskCacheBackend(str(tmp_path / "cache"), ttl=10)
+    assert await reopened.get('k') == '{"응답": 1}'
+    assert await reopened.get('missing') is None
+    assert reopened.size() == 1
+    assert not list((tmp_path / "cache").glob("*.tmp"))
+
+    clock.now += 11
+    assert await reopened.get('k') is None
+    assert reopened.size() == 0
+
+    await backend.set('k', 'v')
+    await backend.clear()
+    assert backend.size() == 0
+
+
+async def test_disk_backend_ignores_corrupt_files(tmp_path):
+    backend = DiskCacheBackend(str(tmp_path))
+    (tmp_path / "k.json").write_text("{not json", encoding="utf-8")
+
+    assert await backend.get('k') is None
+
+
+async def test_cache_counts_hits_and_survives_backend_errors():
+    class BrokenBackend(MemoryCacheBackend):
+        async def get(self, key):
+            raise OSError("disk gone")
+
+    cache = LLMCache(MemoryCacheBackend())
+    await cache.set('k', 'v')
+    assert await cache.get('k') == 'v'
+    assert await cache.get('other') is None
+    assert cache.stats()['hit_ratio'] == 0.5
+
+    broken = LLMCache(BrokenBackend())
+    assert await broken.get('k') is None
+    assert (broken.errors, broken.misses) == (1, 1)
@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import event_storm_routes
+from app.services.llm_pool import LLMClientPool, LLMPoolBusy
+
+
+def _pool(max_concurrency=2, queue_timeout=0.05):
+    # start() 없이: 슬롯 제어만 검사 (client 는 None)
+    return LLMClientPool("anthropic", None, max_concurrency=max_concurrency, queue_timeout=queue_timeout)
+
+
+async def _hold(pool, release: asyncio.Event):
+    async with pool.slot():
+        await release.wait()
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def test_saturated_pool_rejects_after_queue_timeout():
+    pool = _pool()
+    release = asyncio.Event()
+    holders = [asyncio.create_task(_hold(pool, release)) for _ in range(2)]
+    await _settle()
+    assert (pool.metrics.in_flight, pool.metrics.waiting) == (2, 0)
+
+    waiter = asyncio.create_task(_hold(pool, asyncio.Event()))
+    await _settle()
+    assert (pool.metrics.in_flight, pool.metrics.waiting) == (2, 1)
+
+    with pytest.raises(LLMPoolBusy):
+        await waiter
+    assert (pool.metrics.in_flight, pool.metrics.waiting, pool.metrics.rejected) == (2, 0, 1)
+
+    release.set()
+    await asyncio.gather(*holders)
+    stats = pool.stats()
+    assert (stats['in_flight'], stats['max_in_flight'], stats['requests']) == (0, 2, 2)
+
+    # 자리가 비면 다시 바로 얻는다
+    async with pool.slot():
+        assert pool.metrics.in_flight == 1
+    assert pool.metrics.requests == 3
+
+
+async def test_waiter_gets_slot_released_within_timeout():
+    pool = _pool(max_concurrency=1, queue_timeout=1.0)
+    release = asyncio.Event()
+    holder = asyncio.create_task(_hold(pool, release))
+    await _settle()
+
+    waiter = asyncio.create_task(_hold(pool, asyncio.Event()))
+    await _settle()
+    assert pool.metrics.waiting == 1
+
+    release.set()
+    await holder
+    await _settle()
+    assert (pool.metrics.waiting, pool.metrics.in_flight) == (0, 1)
+    waiter.cancel()
+    await asyncio.gather(waiter, return_exceptions=True)
+    assert pool.metrics.in_flight == 0
+    assert pool.metrics.max_wait_ms > 0
+
+
+async def test_failed_call_releases_slot_and_counts_failure():
+    pool = _pool(max_concurrency=1)
+
+    with pytest.raises(ValueError):
+        async with pool.slot():
+            raise ValueError("bad response")
+
+    assert (pool.metrics.failures, pool.metrics.in_flight) == (1, 0)
+    async with pool.slot():
+        pass
+
+
+def test_busy_pool_maps_to_503():
+    pool = _pool(max_concurrency=0, queue_timeout=0.01)
+
+    class SaturatedService:
+        async def analyze_map_reduce(self, description, examples, bypass_cache, force_split=False):
+            async with pool.slot():
+                raise AssertionError("slot should not be granted")
+
+    app = FastAPI()
+    app.include_router(event_storm_routes.router, prefix="/api/event-storm")
+    app.dependency_overrides[event_storm_routes.get_llm_service] = SaturatedService
+
+    response = TestClient(app).post("/api/event-storm/analyze", json={"description": "주문을 받고 결제한 뒤 배송한다"})
+
+    assert response.status_code == 503
+    assert "동시 실행 한도(0)" in response.json()["detail"]
+    assert (pool.metrics.rejected, pool.metrics.waiting) == (1, 0)
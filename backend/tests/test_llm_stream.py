@@ -0,0 +1,46 @@
+import json
+
+import httpx
+
+from app.services.llm_pool import LLMClientPool
+from app.services.llm_service import LLMService
+
+SSE_EVENTS = [
+    ('message_start', {'type': 'message_start', 'message': {
+        'id': 'msg_1', 'type': 'message', 'role': 'assistant', 'model': 'claude-3-sonnet-20240229',
+        'content': [], 'stop_reason': None, 'stop_sequence': None,
+        'usage': {'input_tokens': 10, 'output_tokens': 1}
+    }}),
+    ('content_block_start', {'type': 'content_block_start', 'index': 0,
+                             'content_block': {'type': 'text', 'text': ''}}),
+    ('content_block_delta', {'type': 'content_block_delta', 'index': 0,
+                             'delta': {'type': 'text_delta', 'text': '{"aggregates": '}}),
+    ('content_block_delta', {'type': 'content_block_delta', 'index': 0,
+                             'delta': {'type': 'text_delta', 'text': '[]}'}}),
+    ('content_block_stop', {'type': 'content_block_stop', 'index': 0}),
+    ('message_delta', {'type': 'message_delta', 'delta': {'stop_reason': 'end_turn', 'stop_sequence': None},
+                       'usage': {'output_tokens': 5}}),
+    ('message_stop', {'type': 'message_stop'}),
+]
+
+
+def _sse(request: httpx.Request) -> httpx.Response:
+    assert request.url.path == '/v1/messages'
+    assert json.loads(request.content)['stream'] is True
+    body = ''.join(f"event: {name}\ndata: {json.dumps(data)}\n\n" for name, data in SSE_EVENTS)
+    return httpx.Response(200, headers={'content-type': 'text/event-stream'}, content=body.encode())
+
+
+async def test_anthropic_stream_yields_content_block_deltas():
+    pool = LLMClientPool('anthropic', 'test-key', http2=False)
+    pool.start()
+    # 풀의 httpx 클라이언트를 SDK 에 주입하는 경로 그대로, 전송만 가짜로 교체
+    await pool.http_client.aclose()
+    pool.http_client = httpx.AsyncClient(transport=httpx.MockTransport(_sse))
+    pool.client = pool.client.with_options(http_client=pool.http_client)
+    try:
+        chunks = [chunk async for chunk in LLMService(pool)._stream("주문 도메인")]
+    finally:
+        await pool.close()
+
+    assert chunks == ['{"aggregates": ', '[]}']
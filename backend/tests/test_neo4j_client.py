@@ -0,0 +1,47 @@
+import pytest
+from neo4j.exceptions import ConstraintError
+
+from app.db.neo4j_client import ConcurrencyConflict, Neo4jClient
+
+
+class ConflictingClient(Neo4jClient):
+    """쓰기 트랜잭션은 유일성 위반으로 실패, 충돌 조회 결과는 conflicts"""
+
+    def __init__(self, conflicts):
+        super().__init__("bolt://localhost:7687", "neo4j", "password")
+        self.conflicts = conflicts
+        self.lookups = []
+
+    async def run_transaction(self, work, write=True):
+        raise ConstraintError("Node already exists with label `DynamicInstance` and property `id`")
+
+    async def execute(self, query, params=None):
+        self.lookups.append(params)
+        return self.conflicts
+
+
+async def test_instance_id_collision_is_a_concurrency_conflict():
+    client = ConflictingClient([{'instance_id': 'x-1', 'version': 3}])
+    with pytest.raises(ConcurrencyConflict) as info:
+        await client.execute_command('Order', 'x-1', 'OrderPlaced', {}, {}, expected_version=0)
+
+    assert (info.value.aggregate_id, info.value.expected_version, info.value.current_version) == ('x-1', 0, 3)
+    assert client.lookups == [{'rows': [{'instance_id': 'x-1', 'type_name': 'Order'}]}]
+
+
+async def test_batch_instance_id_collision_is_a_concurrency_conflict():
+    client = ConflictingClient([{'instance_id': 'x-2', 'version': 1}])
+    groups = {'Order': [
+        {'index': 0, 'instance_id': 'x-1', 'event_type': 'OrderPlaced', 'properties': {}, 'payload_json': '{}'},
+        {'index': 1, 'instance_id': 'x-2', 'event_type': 'OrderPlaced', 'properties': {}, 'payload_json': '{}'}
+    ]}
+    with pytest.raises(ConcurrencyConflict) as info:
+        await client.execute_command_batch(groups)
+
+    assert info.value.aggregate_id == 'x-2'
+
+
+async def test_other_constraint_errors_propagate():
+    client = ConflictingClient([])
+    with pytest.raises(ConstraintError):
+        await client.execute_command('Order', 'x-1', 'OrderPlaced', {}, {})
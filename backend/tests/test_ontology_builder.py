@@ -0,0 +1,149 @@
+from contextlib import asynccontextmanager
+
+import pytest
+
+from app.models.event_storm import EventStormResult
+from app.services.ontology_builder import (
+    DELETE_QUERIES,
+    DIFF_FIELDS,
+    OBJECT_TYPES_IN_USE_QUERY,
+    PRUNE_OBJECT_TYPES_QUERY,
+    SNAPSHOT_QUERIES,
+    ObjectTypeInUse,
+    OntologyBuilder,
+    _diff_rows,
+    _has_duplicate_keys,
+    _normalize,
+)
+
+KEYS = ('name',)
+VALUES = ('cardinality', 'actions')
+
+
+@pytest.mark.parametrize("current, desired, expected", [
+    # 추가
+    ([], [{'name': 'A', 'cardinality': '1:N'}], (['A'], [], [])),
+    # 변경
+    ([{'name': 'A', 'cardinality': '1:1'}], [{'name': 'A', 'cardinality': '1:N'}], ([], ['A'], [])),
+    # 제거
+    ([{'name': 'A', 'cardinality': '1:N'}], [], ([], [], ['A'])),
+    # 변화 없음 (비교하지 않는 필드 차이는 무시)
+    ([{'name': 'A', 'cardinality': '1:N', 'other': 1}], [{'name': 'A', 'cardinality': '1:N', 'other': 2}],
+     ([], [], [])),
+    # Neo4j 가 빈 리스트를 None 으로 돌려줘도 변화 없음
+    ([{'name': 'A', 'cardinality': '1:N', 'actions': None}], [{'name': 'A', 'cardinality': '1:N', 'actions': []}],
+     ([], [], [])),
+    # 섞인 경우
+    ([{'name': 'A', 'cardinality': '1:N'}, {'name': 'B', 'cardinality': '1:N'}],
+     [{'name': 'B', 'cardinality': '1:1'}, {'name': 'C', 'cardinality': '1:N'}],
+     (['C'], ['B'], ['A'])),
+])
+def test_diff_rows(current, desired, expected):
+    added, updated, removed = _diff_rows(current, desired, KEYS, VALUES)
+    assert tuple([row['name'] for row in rows] for rows in (added, updated, removed)) == expected
+
+
+def test_diff_rows_uses_composite_keys():
+    key_fields, value_fields = DIFF_FIELDS['commands']
+    current = [{'agg_name': 'Order', 'cmd_name': 'Place', 'params_json': '[]'}]
+    desired = [{'agg_name': 'Invoice', 'cmd_name': 'Place', 'params_json': '[]'}]
+
+    added, updated, removed = _diff_rows(current, desired, key_fields, value_fields)
+
+    assert (added, updated, removed) == (desired, [], current)
+
+
+@pytest.mark.parametrize("value, expected", [
+    (None, []),
+    ((1, 2), [1, 2]),
+    ([], []),
+    (['a'], ['a']),
+    ('1:N', '1:N'),
+    (0, 0),
+])
+def test_normalize(value, expected):
+    assert _normalize(value) == expected
+
+
+@pytest.mark.parametrize("rows, expected", [
+    ([], False),
+    ([{'trans_name': 'a'}, {'trans_name': 'b'}], False),
+    ([{'trans_name': 'a'}, {'trans_name': 'a'}], True),
+])
+def test_has_duplicate_keys(rows, expected):
+    assert _has_duplicate_keys(rows, DIFF_FIELDS['transformations'][0]) == expected
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def data(self):
+        return self.rows
+
+    async def consume(self):
+        pass
+
+
+class FakeNeo4j:
+    """현재 온톨로지 스냅샷과 인스턴스가 남은 ObjectType 만 흉내"""
+
+    def __init__(self, object_types, in_use):
+        self.object_types = object_types
+        self.in_use = in_use
+        self.queries = []
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield self
+
+    async def run(self, query, params=None):
+        self.queries.append(query)
+        if query == SNAPSHOT_QUERIES['object_types']:
+            return FakeResult(self.object_types)
+        if query == OBJECT_TYPES_IN_USE_QUERY:
+            return FakeResult([{'name': row['name']} for row in params['rows'] if row['name'] in self.in_use])
+        return FakeResult([])
+
+
+def _object_type(name):
+    return {'name': name, 'properties_json': '{}', 'invariants': []}
+
+
+def _event_storm():
+    return EventStormResult(
+        aggregates=[{'name': 'Order', 'commands': [], 'events': [], 'state': {}}],
+        policies=[]
+    )
+
+
+async def test_removing_object_type_with_instances_is_refused():
+    neo4j = FakeNeo4j([_object_type('Order'), _object_type('Legacy')], in_use={'Legacy'})
+
+    with pytest.raises(ObjectTypeInUse) as error:
+        await OntologyBuilder(neo4j).build_incremental(_event_storm())
+
+    assert error.value.names == ['Legacy']
+    assert DELETE_QUERIES['object_types'] not in neo4j.queries
+    assert PRUNE_OBJECT_TYPES_QUERY not in neo4j.queries
+
+
+async def test_removing_unused_object_type_deletes_only_the_type():
+    neo4j = FakeNeo4j([_object_type('Order'), _object_type('Legacy')], in_use=set())
+
+    result = await OntologyBuilder(neo4j).build_incremental(_event_storm())
+
+    assert result['changes']['object_types']['removed'] == ['Legacy']
+    assert DELETE_QUERIES['object_types'] in neo4j.queries
+    assert PRUNE_OBJECT_TYPES_QUERY not in neo4j.queries
+
+
+async def test_prune_deletes_object_type_with_its_instances():
+    neo4j = FakeNeo4j([_object_type('Order'), _object_type('Legacy')], in_use={'Legacy'})
+
+    result = await OntologyBuilder(neo4j).build_incremental(_event_storm(), prune=True)
+
+    assert result['changes']['object_types']['removed'] == ['Legacy']
+    assert OBJECT_TYPES_IN_USE_QUERY not in neo4j.queries
+    assert PRUNE_OBJECT_TYPES_QUERY in neo4j.queries
+    assert DELETE_QUERIES['object_types'] not in neo4j.queries
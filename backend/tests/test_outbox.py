@@ -0,0 +1,114 @@
+import pytest
+
+from app.services.outbox import InMemoryBroker, OutboxRelay
+
+
+class FakeNeo4j:
+    """published = false 이벤트 목록과 발행 완료 표시만 흉내"""
+
+    def __init__(self, events):
+        self.events = events
+
+    async def execute(self, query, params=None):
+        pending = [e for e in self.events if not e['published']]
+        pending.sort(key=lambda e: (e['timestamp'], e['sequence']))
+        return [{'e': e, 'aggregate_type': 'Order'} for e in pending[:params['limit']]]
+
+    async def execute_write(self, query, params=None):
+        keys = {(k['aggregate_id'], k['sequence']) for k in params['keys']}
+        for event in self.events:
+            if (event['aggregate_id'], event['sequence']) in keys:
+                event['published'] = True
+
+
+class FlakyBroker(InMemoryBroker):
+    """지정한 (key, sequence) 를 처음 한 번만 거부 (그 뒤의 같은 key 는 같은 호출에서 함께 실패)"""
+
+    def __init__(self, fail_once):
+        super().__init__()
+        self.fail_once = set(fail_once)
+        self.calls = []
+
+    async def publish(self, messages):
+        self.calls.append([(m['key'], m['value']['sequence']) for m in messages])
+        results = []
+        failed = set()
+        for message in messages:
+            key = (message['key'], message['value']['sequence'])
+            if key in self.fail_once or message['key'] in failed:
+                self.fail_once.discard(key)
+                failed.add(message['key'])
+                results.append(RuntimeError("broker rejected"))
+                continue
+            self.partitions[self.partition_for(message['key'])].append(message)
+            results.append(None)
+        return results
+
+
+def _events():
+    events = []
+    for sequence in range(1, 5):
+        for aggregate_id in ('o-1', 'o-2'):
+            events.append({
+                'type': 'OrderUpdated',
+                'aggregate_id': aggregate_id,
+                'sequence': sequence,
+                'timestamp': sequence * 10,
+                'payload_json': '{}',
+                'published': False
+            })
+    return events
+
+
+def _sequences(broker, key):
+    return [m['value']['sequence'] for m in broker.messages(key)]
+
+
+async def test_failure_stops_later_events_of_same_aggregate():
+    neo4j = FakeNeo4j(_events())
+    broker = FlakyBroker(fail_once={('o-1', 2)})
+    relay = OutboxRelay(neo4j, broker, batch_size=100)
+
+    assert await relay.relay_once() == 5
+    # o-1 은 실패한 2 이후를 브로커에 보내지 않았다
+    assert _sequences(broker, 'o-1') == [1]
+    assert _sequences(broker, 'o-2') == [1, 2, 3, 4]
+    assert relay.metrics.failed == 1
+
+    assert await relay.relay_once() == 3
+    assert _sequences(broker, 'o-1') == [1, 2, 3, 4]
+    assert all(e['published'] for e in neo4j.events)
+
+
+async def test_batch_is_sent_in_one_call_ordered_per_aggregate():
+    neo4j = FakeNeo4j(_events())
+    broker = FlakyBroker(fail_once=())
+    relay = OutboxRelay(neo4j, broker, batch_size=100)
+
+    assert await relay.relay_once() == 8
+
+    assert len(broker.calls) == 1
+    for key in ('o-1', 'o-2'):
+        assert [s for k, s in broker.calls[0] if k == key] == [1, 2, 3, 4]
+        assert _sequences(broker, key) == [1, 2, 3, 4]
+
+
+async def test_successes_after_a_failure_are_not_marked_published():
+    neo4j = FakeNeo4j(_events())
+
+    class PartialBroker(FlakyBroker):
+        """실패 뒤의 같은 key 메시지도 써 버리는 브로커"""
+
+        async def publish(self, messages):
+            self.calls.append([(m['key'], m['value']['sequence']) for m in messages])
+            return [
+                RuntimeError("broker rejected") if (m['key'], m['value']['sequence']) == ('o-1', 2) else None
+                for m in messages
+            ]
+
+    relay = OutboxRelay(neo4j, PartialBroker(fail_once=()), batch_size=100)
+
+    assert await relay.relay_once() == 5
+    unpublished = sorted(e['sequence'] for e in neo4j.events if not e['published'])
+    assert unpublished == [2, 3, 4]
+    assert relay.metrics.failed == 1
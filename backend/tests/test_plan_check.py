@@ -0,0 +1,12 @@
+from app.db.plan_check import INTENTIONAL_FULL_READS, hot_queries
+
+
+def test_hot_queries_cover_routes_and_services():
+    queries = hot_queries()
+    for name in ('ontology.schema', 'instances.object_type_properties', 'versions.link_parent',
+                 'snapshots.tail', 'jobs.get', 'ontology_builder.delete_object_types'):
+        assert name in queries
+    assert all(query.strip() for query in queries.values())
+    assert not set(queries) & set(INTENTIONAL_FULL_READS)
+    # 없는 라벨 문법이 남아 있지 않다 (format 누락)
+    assert not any('{type_name}' in query for query in queries.values())
@@ -0,0 +1,127 @@
+import json
+
+import pytest
+
+from app.services.projection_engine import Projection, ProjectionEngine, compile_projection
+
+
+def _event(event_type, sequence, aggregate_id='o-1', **payload):
+    return {
+        'type': event_type, 'aggregate_id': aggregate_id, 'aggregate_type': 'Order',
+        'sequence': sequence, 'timestamp': 1000 + sequence, 'payload_json': json.dumps(payload)
+    }
+
+
+def _definition(name, source_events, projections):
+    return {'name': name, 'source_events': source_events, 'projections_json': json.dumps(projections)}
+
+
+class FakeNeo4j:
+    def __init__(self, definitions, events):
+        self.definitions = definitions
+        self.events = events
+        self.streamed = []
+        self.on_stream = None
+
+    async def execute(self, query, params=None):
+        return self.definitions
+
+    async def stream(self, query, params=None):
+        self.streamed.append(params['types'])
+        for event in self.events:
+            if event['type'] in params['types']:
+                yield {'e': event}
+                if self.on_stream:
+                    await self.on_stream(event)
+
+
+@pytest.mark.parametrize("expression, events, expected", [
+    ("amount", [_event('OrderPlaced', 1, amount=10)], 10),
+    ("amount", [_event('OrderPlaced', 1)], None),
+    ("OrderPaid.amount", [_event('OrderPlaced', 1, amount=10), _event('OrderPaid', 2, amount=7)], 7),
+    ("OrderPaid.amount", [_event('OrderPlaced', 1, amount=10)], None),
+    ("$sequence", [_event('OrderPlaced', 1), _event('OrderPaid', 2)], 2),
+    ("$type", [_event('OrderPlaced', 1)], 'OrderPlaced'),
+    ("count()", [_event('OrderPlaced', 1), _event('OrderPaid', 2)], 2),
+    ("sum(amount)", [_event('OrderPlaced', 1, amount=10), _event('OrderPaid', 2, amount=2.5)], 12.5),
+    ("sum(amount)", [_event('OrderPlaced', 1, amount='10')], None),
+    (" count() ", [_event('OrderPlaced', 1)], 1),
+])
+def test_compile_projection(expression, events, expected):
+    project = compile_projection('value', expression)
+    row = {}
+    for event in events:
+        project(row, event, json.loads(event['payload_json']))
+
+    assert row.get('value') == expected
+
+
+def test_apply_skips_already_applied_sequences():
+    projection = Projection('Orders', ['OrderPlaced'], {'placed': 'count()'})
+
+    assert projection.apply(_event('OrderPlaced', 1), {})
+    assert projection.apply(_event('OrderPlaced', 2), {})
+    assert not projection.apply(_event('OrderPlaced', 2), {})
+    assert not projection.apply(_event('OrderPlaced', 1), {})
+    # 다른 Aggregate 는 위치가 따로
+    assert projection.apply(_event('OrderPlaced', 1, aggregate_id='o-2'), {})
+
+    assert projection.rows['o-1']['placed'] == 2
+    assert projection.rows['o-2']['placed'] == 1
+    assert projection.positions == {'o-1': 2, 'o-2': 1}
+
+
+async def test_events_during_rebuild_are_applied_after_it_in_order():
+    neo4j = FakeNeo4j(
+        [_definition('Orders', ['OrderPlaced', 'OrderPaid'], {'last': '$type', 'events': 'count()'})],
+        [_event('OrderPlaced', 1), _event('OrderPaid', 2)]
+    )
+    engine = ProjectionEngine(neo4j)
+    seen_during = []
+
+    async def live_commit(event):
+        # 재구축 도중 커밋된 이벤트: 보류되어야 한다
+        if event['sequence'] == 1:
+            await engine.handle([_event('OrderPaid', 3), _event('OrderPlaced', 2)])
+            seen_during.append(dict(engine.get('Orders').rows['o-1']))
+
+    neo4j.on_stream = live_commit
+    await engine.load()
+
+    assert seen_during == [{'aggregate_id': 'o-1', 'last': 'OrderPlaced', 'events': 1}]
+    assert engine._pending == []
+    # 보류된 sequence 2 는 로그에서 이미 반영되어 건너뛰고, 3 만 추가 적용
+    assert engine.get('Orders').rows['o-1'] == {'aggregate_id': 'o-1', 'last': 'OrderPaid', 'events': 3}
+    assert engine.metrics.events_applied == 1
+
+
+async def test_load_rebuilds_only_changed_definitions():
+    neo4j = FakeNeo4j(
+        [
+            _definition('Orders', ['OrderPlaced'], {'placed': 'count()'}),
+            _definition('Payments', ['OrderPaid'], {'paid': 'sum(amount)'}),
+        ],
+        [_event('OrderPlaced', 1), _event('OrderPaid', 2, amount=5)]
+    )
+    engine = ProjectionEngine(neo4j)
+    await engine.load()
+    orders = engine.get('Orders')
+    assert neo4j.streamed == [['OrderPaid', 'OrderPlaced']]
+
+    neo4j.definitions = [
+        _definition('Orders', ['OrderPlaced'], {'placed': 'count()'}),
+        _definition('Payments', ['OrderPaid'], {'paid': 'sum(amount)', 'payments': 'count()'}),
+    ]
+    await engine.load()
+
+    assert neo4j.streamed[1:] == [['OrderPaid']]
+    assert engine.get('Orders') is orders
+    assert engine.get('Payments').rows['o-1'] == {'aggregate_id': 'o-1', 'paid': 5, 'payments': 1}
+
+    # 정의가 그대로면 로그를 읽지 않고, 삭제된 ReadModel 은 지표에서도 빠진다
+    neo4j.definitions = neo4j.definitions[:1]
+    await engine.load()
+
+    assert len(neo4j.streamed) == 2
+    assert list(engine.projections) == ['Orders']
+    assert list(engine.metrics.rebuilds) == ['Orders']
@@ -0,0 +1,34 @@
+import pytest
+
+from app.services.rule_engine import RuleCompileError, compile_condition, event_key
+
+
+@pytest.mark.parametrize("expression, state, expected", [
+    ("total > 1000000", {'total': 2000000}, True),
+    ('state == "paid"', {'state': 'paid'}, True),
+    ('status in ["a", "b"] and qty >= 1', {'status': 'b', 'qty': 0}, False),
+    ("not (total - discount) % 2", {'total': 10, 'discount': 4}, True),
+    ("missing > 1", {}, False),
+    ("total / qty > 1", {'total': 5, 'qty': 0}, False),
+])
+def test_conditions_evaluate_against_state(expression, state, expected):
+    assert compile_condition(expression)(state) is expected
+
+
+@pytest.mark.parametrize("expression", [
+    "__import__('os').system('id')",
+    "total.__class__",
+    "[x for x in items]",
+    "lambda: 1",
+    "items[0]",
+    "len(items) > 0",
+    "total if flag else 0",
+    "total > 1 ==",
+])
+def test_syntax_outside_the_whitelist_is_rejected(expression):
+    with pytest.raises(RuleCompileError):
+        compile_condition(expression)
+
+
+def test_event_key_normalises_naming_styles():
+    assert event_key("PAYMENT_COMPLETED") == event_key("PaymentCompleted") == "paymentcompleted"
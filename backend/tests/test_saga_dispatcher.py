@@ -0,0 +1,98 @@
+import asyncio
+
+from app.services.command_registry import CommandRegistry, CommandRoute
+from app.services.saga_dispatcher import SagaDispatcher
+
+
+def _registry(routes):
+    registry = CommandRegistry()
+    registry._routes = {command: CommandRoute(command, 'Order', [event]) for command, event in routes.items()}
+    registry.loaded = True
+    return registry
+
+
+def _dispatcher(policies, routes, execute=None, **kwargs):
+    async def noop(command, aggregate_id, params, expected_version):
+        return {}
+
+    dispatcher = SagaDispatcher(None, _registry(routes), execute or noop, **kwargs)
+    dispatcher._by_trigger = {}
+    for name, trigger, actions in policies:
+        dispatcher._by_trigger.setdefault(trigger, []).append(
+            {'name': name, 'trigger_event': trigger, 'actions': actions}
+        )
+    return dispatcher
+
+
+def _event(event_type, sequence=1):
+    return {'type': event_type, 'aggregate_id': 'o-1', 'aggregate_type': 'Order', 'sequence': sequence}
+
+
+async def test_full_queue_dead_letters_without_waiting():
+    dispatcher = _dispatcher(
+        [('notify', 'OrderPlaced', ['Notify', 'Audit', 'Bill'])],
+        {'Notify': 'Notified', 'Audit': 'Audited', 'Bill': 'Billed'},
+        queue_size=1
+    )
+
+    # 워커 없이 큐가 가득 차도 handle 은 바로 돌아온다
+    await asyncio.wait_for(dispatcher.handle([_event('OrderPlaced')]), timeout=0.1)
+
+    assert dispatcher.queue.qsize() == 1
+    assert dispatcher.metrics.rejected == 2
+    assert [job.command for job in dispatcher.dead_letters] == ['Audit', 'Bill']
+
+
+async def test_policy_cycle_is_dead_lettered():
+    sequences = {}
+    dispatcher = None
+
+    async def execute(command, aggregate_id, params, expected_version):
+        # run_command 처럼 커밋된 이벤트를 같은 태스크에서 파이프라인으로 발행
+        event_type = dispatcher.command_registry.resolve(command).event
+        sequences[aggregate_id] = sequences.get(aggregate_id, 1) + 1
+        await dispatcher.handle([_event(event_type, sequences[aggregate_id])])
+
+    dispatcher = _dispatcher(
+        [('confirm', 'OrderPlaced', ['Confirm']), ('replace', 'OrderConfirmed', ['Place'])],
+        {'Confirm': 'OrderConfirmed', 'Place': 'OrderPlaced'},
+        execute=execute,
+        workers=2
+    )
+    dispatcher.start()
+    try:
+        await dispatcher.handle([_event('OrderPlaced')])
+        await asyncio.wait_for(dispatcher.queue.join(), timeout=1)
+    finally:
+        await dispatcher.stop()
+
+    assert dispatcher.metrics.completed == 2
+    assert dispatcher.metrics.cycles == 1
+    (job,) = dispatcher.dead_letters
+    assert job.path == ('confirm', 'replace', 'confirm')
+    assert job.last_error.startswith("policy cycle")
+
+
+async def test_chain_deeper_than_max_depth_is_dead_lettered():
+    dispatcher = None
+    chain = [f'Step{i}' for i in range(5)]
+
+    async def execute(command, aggregate_id, params, expected_version):
+        await dispatcher.handle([_event(f'{command}Done')])
+
+    dispatcher = _dispatcher(
+        [(f'p{i}', f'{chain[i - 1]}Done' if i else 'Start', [chain[i]]) for i in range(5)],
+        {command: f'{command}Done' for command in chain},
+        execute=execute,
+        max_depth=3
+    )
+    dispatcher.start()
+    try:
+        await dispatcher.handle([_event('Start')])
+        await asyncio.wait_for(dispatcher.queue.join(), timeout=1)
+    finally:
+        await dispatcher.stop()
+
+    assert dispatcher.metrics.completed == 3
+    (job,) = dispatcher.dead_letters
+    assert job.path == ('p0', 'p1', 'p2', 'p3')
@@ -0,0 +1,105 @@
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+
+from app.db.schema import (
+    CREATE_INSTANCE_ID_CONSTRAINT,
+    CREATE_INSTANCE_ID_INDEX,
+    DROP_INSTANCE_ID_INDEX,
+    ensure_instance_id_constraint,
+    ensure_instance_indexes
+)
+
+
+class FakeResult:
+    async def consume(self):
+        return SimpleNamespace(counters=SimpleNamespace(indexes_added=1))
+
+
+class FakeTx:
+    def __init__(self, client):
+        self.client = client
+
+    async def run(self, statement):
+        self.client.statements.append(statement)
+        if any(bad in statement for bad in self.client.failing):
+            raise RuntimeError("invalid index")
+        return FakeResult()
+
+
+class FakeNeo4j:
+    def __init__(self, failing=()):
+        self.failing = failing
+        self.statements = []
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield FakeTx(self)
+
+
+async def test_label_is_quoted():
+    neo4j = FakeNeo4j()
+    created = await ensure_instance_indexes(neo4j, 'Order', ['status'])
+    assert created == ['instance_Order_keyset', 'instance_Order_status']
+    assert all('FOR (n:`Order`)' in s for s in neo4j.statements)
+
+
+async def test_invalid_type_name_is_skipped():
+    neo4j = FakeNeo4j()
+    created = await ensure_instance_indexes(neo4j, 'Order) DETACH DELETE n //', ['status'])
+    assert created == []
+    assert neo4j.statements == []
+
+
+async def test_failed_statement_does_not_abort_the_rest():
+    neo4j = FakeNeo4j(failing=('n.`status`',))
+    created = await ensure_instance_indexes(neo4j, 'Order', ['status', 'total'])
+    assert created == ['instance_Order_keyset', 'instance_Order_total']
+    assert len(neo4j.statements) == 3
+
+
+class InstanceIdNeo4j(FakeNeo4j):
+    def __init__(self, constraint_exists=False, duplicates=(), failing=()):
+        super().__init__(failing)
+        self.constraint_exists = constraint_exists
+        self.duplicates = list(duplicates)
+
+    async def execute(self, query, params=None):
+        if 'SHOW CONSTRAINTS' in query:
+            return [{'name': 'dynamic_instance_id_unique'}] if self.constraint_exists else []
+        return self.duplicates
+
+
+def _report():
+    return {'created': [], 'existing': [], 'failed': {}}
+
+
+async def test_instance_id_constraint_replaces_range_index():
+    neo4j = InstanceIdNeo4j()
+    report = _report()
+    await ensure_instance_id_constraint(neo4j, report)
+    assert neo4j.statements == [DROP_INSTANCE_ID_INDEX, CREATE_INSTANCE_ID_CONSTRAINT]
+    assert report['created'] == ['dynamic_instance_id_unique']
+
+
+async def test_duplicate_instance_ids_keep_the_range_index():
+    neo4j = InstanceIdNeo4j(duplicates=[{'id': 'o-1', 'copies': 2}])
+    report = _report()
+    await ensure_instance_id_constraint(neo4j, report)
+    assert neo4j.statements == [CREATE_INSTANCE_ID_INDEX]
+    assert 'o-1 x2' in report['failed']['dynamic_instance_id_unique']
+
+
+async def test_failed_constraint_restores_the_range_index():
+    neo4j = InstanceIdNeo4j(failing=('CREATE CONSTRAINT',))
+    with pytest.raises(RuntimeError):
+        await ensure_instance_id_constraint(neo4j, _report())
+    assert neo4j.statements == [DROP_INSTANCE_ID_INDEX, CREATE_INSTANCE_ID_CONSTRAINT, CREATE_INSTANCE_ID_INDEX]
+
+
+async def test_existing_constraint_is_left_alone():
+    neo4j = InstanceIdNeo4j(constraint_exists=True)
+    report = _report()
+    await ensure_instance_id_constraint(neo4j, report)
+    assert neo4j.statements == [] and report['existing'] == ['dynamic_instance_id_unique']
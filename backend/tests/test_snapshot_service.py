@@ -0,0 +1,127 @@
+import json
+
+import pytest
+
+from app.services import snapshot_service
+from app.services.snapshot_service import (
+    LATEST_SNAPSHOT_QUERY,
+    SAVE_SNAPSHOT_QUERY,
+    TAIL_EVENTS_QUERY,
+    SnapshotService,
+)
+
+
+class FakeNeo4j:
+    """DomainEvent 꼬리와 AggregateSnapshot 만 흉내"""
+
+    def __init__(self, events=(), snapshots=()):
+        self.events = list(events)
+        self.snapshots = list(snapshots)
+        self.tail_reads = 0
+
+    async def execute(self, query, params=None):
+        if query == LATEST_SNAPSHOT_QUERY:
+            latest = sorted(
+                (s for s in self.snapshots if s['aggregate_id'] == params['aggregate_id']),
+                key=lambda s: s['sequence']
+            )
+            return latest[-1:]
+        if query == TAIL_EVENTS_QUERY:
+            self.tail_reads += 1
+            tail = [
+                e for e in self.events
+                if e['aggregate_id'] == params['aggregate_id'] and e['sequence'] > params['after']
+            ]
+            return tail[:params['limit']]
+        raise AssertionError(query)
+
+    async def execute_write(self, query, params=None):
+        assert query == SAVE_SNAPSHOT_QUERY
+        self.snapshots.append(dict(params))
+
+    async def run_transaction(self, work, write=True):
+        return await work(self)
+
+
+def _events(count, aggregate_id='o-1'):
+    return [
+        {
+            'aggregate_id': aggregate_id,
+            'sequence': sequence,
+            'type': 'OrderUpdated',
+            'payload_json': json.dumps({'step': sequence})
+        }
+        for sequence in range(1, count + 1)
+    ]
+
+
+@pytest.mark.parametrize("previous, new, expected", [
+    (0, 1, False),
+    (98, 99, False),
+    (99, 100, True),
+    (100, 101, False),
+    # 한 배치로 경계를 넘는 경우
+    (95, 105, True),
+    (90, 100, True),
+    (100, 199, False),
+    (150, 320, True),
+    (100, 100, False),
+])
+def test_should_snapshot_on_frequency_boundary(previous, new, expected):
+    assert SnapshotService(None, frequency=100).should_snapshot(previous, new) == expected
+
+
+def test_should_snapshot_disabled_with_zero_frequency():
+    assert not SnapshotService(None, frequency=0).should_snapshot(0, 1000)
+
+
+async def test_rehydrate_without_snapshot_replays_every_event():
+    service = SnapshotService(FakeNeo4j(_events(5)))
+
+    result = await service.rehydrate('o-1')
+
+    assert result['state'] == {'step': 5, 'last_event': 'OrderUpdated'}
+    assert (result['version'], result['snapshot_version'], result['replayed']) == (5, None, 5)
+    assert service.metrics.snapshot()['replay_histogram']['le_10'] == 1
+
+
+async def test_rehydrate_applies_tail_on_top_of_latest_snapshot():
+    neo4j = FakeNeo4j(
+        _events(7),
+        snapshots=[
+            {'aggregate_id': 'o-1', 'sequence': 2, 'state_json': json.dumps({'step': 2, 'old': True})},
+            {'aggregate_id': 'o-1', 'sequence': 5, 'state_json': json.dumps({'step': 5, 'kept': True})},
+        ]
+    )
+    service = SnapshotService(neo4j)
+
+    result = await service.rehydrate('o-1')
+
+    assert result['state'] == {'step': 7, 'kept': True, 'last_event': 'OrderUpdated'}
+    assert (result['version'], result['snapshot_version'], result['replayed']) == (7, 5, 2)
+
+
+async def test_rehydrate_pages_through_long_tails(monkeypatch):
+    monkeypatch.setattr(snapshot_service, 'TAIL_PAGE_SIZE', 2)
+    neo4j = FakeNeo4j(_events(5))
+
+    result = await SnapshotService(neo4j).rehydrate('o-1')
+
+    assert (result['version'], result['replayed']) == (5, 5)
+    assert neo4j.tail_reads == 3
+
+
+async def test_batch_crossing_boundary_snapshots_latest_version():
+    neo4j = FakeNeo4j(_events(12))
+    service = SnapshotService(neo4j, frequency=10)
+
+    # 8 → 12 로 한 번에 쓰면 10 경계를 넘었으므로 12 에서 저장
+    await service.maybe_snapshot('o-1', 8, 12)
+    assert [s['sequence'] for s in neo4j.snapshots] == [12]
+
+    result = await service.rehydrate('o-1')
+    assert (result['snapshot_version'], result['replayed']) == (12, 0)
+
+    # 경계를 넘지 않으면 저장하지 않는다
+    await service.maybe_snapshot('o-1', 12, 13)
+    assert len(neo4j.snapshots) == 1
@@ -0,0 +1,37 @@
+import pytest
+
+from app.services.transformation_engine import TransformationCompileError, compile_logic
+
+
+def _set_clause(logic: str) -> str:
+    return compile_logic(logic).split('SET ', 1)[1].strip()
+
+
+def test_assignments_compile_to_parameterised_cypher():
+    clause = _set_clause(
+        "SET aggregate.last_event = $event_name, "
+        "aggregate.total = coalesce(aggregate.total, 0) + $payload.amount, "
+        "aggregate.note = 'a, b', aggregate.updated = timestamp()"
+    )
+    assert clause.split(',\n    ') == [
+        "inst.`last_event` = row.event_name",
+        "inst.`total` = coalesce(inst.`total`, 0) + row.payload.`amount`",
+        "inst.`note` = 'a, b'",
+        "inst.`updated` = timestamp()"
+    ]
+
+
+@pytest.mark.parametrize("logic", [
+    "SET aggregate.x = 1 MATCH (n) DETACH DELETE n",
+    "SET aggregate.x = 1} DETACH DELETE inst //",
+    "SET other.x = 1",
+    "SET aggregate.x = $password",
+    "SET aggregate.x = toUpper('a')",
+    "SET aggregate.x = (1",
+    "SET aggregate.x = 1)",
+    "SET aggregate.x =",
+    "SET aggregate.`x` = 1",
+])
+def test_logic_outside_the_whitelist_is_rejected(logic):
+    with pytest.raises(TransformationCompileError):
+        compile_logic(logic)